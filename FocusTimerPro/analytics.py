@@ -0,0 +1,111 @@
+"""
+Vectorized statistics over arbitrary day ranges, for month and year views.
+Days are numbered like DataManager rollups: whole days since 1970-01-01.
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from session_store import SessionStore, FOCUS, SHORT_BREAK, LONG_BREAK
+
+_EPOCH_DATE = date(1970, 1, 1)
+
+def month_range(year: int, month: int) -> Tuple[int, int]:
+    """First and last day numbers of a calendar month"""
+    first = date(year, month, 1)
+    following = date(year + month // 12, month % 12 + 1, 1)
+    return (first - _EPOCH_DATE).days, (following - _EPOCH_DATE).days - 1
+
+def year_range(year: int) -> Tuple[int, int]:
+    """First and last day numbers of a calendar year"""
+    return (date(year, 1, 1) - _EPOCH_DATE).days, (date(year, 12, 31) - _EPOCH_DATE).days
+
+def day_number(day: date) -> int:
+    """Day number of a calendar date"""
+    return (day - _EPOCH_DATE).days
+
+def day_arrays(store: SessionStore, first_day: int, last_day: int,
+               boundaries: List[float] = None) -> Dict[str, np.ndarray]:
+    """
+    Per-day focus counts, focus seconds and break seconds for [first_day, last_day].
+    `boundaries` are the epochs starting each day and ending the last, from
+    DayBuckets.boundaries; without them days are server-local.
+    """
+    lo = store.bisect(first_day * 86400 if boundaries is None else boundaries[0])
+    hi = store.bisect((last_day + 1) * 86400 if boundaries is None else boundaries[-1])
+    n_days = last_day - first_day + 1
+
+    # Slicing copies the columns, so no buffer export blocks later inserts
+    start = np.frombuffer(store.start[lo:hi], dtype=np.float64)
+    kind = np.frombuffer(store.kind[lo:hi], dtype=np.int8)
+    duration = np.frombuffer(store.duration[lo:hi], dtype=np.intc)
+    if boundaries is None:
+        days = (start // 86400).astype(np.int64) - first_day
+    else:
+        days = np.searchsorted(np.asarray(boundaries), start, side='right') - 1
+
+    focus = kind == FOCUS
+    breaks = (kind == SHORT_BREAK) | (kind == LONG_BREAK)
+    return {
+        'focus_sessions': np.bincount(days[focus], minlength=n_days),
+        'focus_seconds': np.bincount(days[focus], weights=duration[focus], minlength=n_days).astype(np.int64),
+        'break_seconds': np.bincount(days[breaks], weights=duration[breaks], minlength=n_days).astype(np.int64)
+    }
+
+def arrays_from_buckets(first_day: int, last_day: int, buckets: Dict[int, Dict[str, int]]) -> Dict[str, np.ndarray]:
+    """Per-day arrays from rollup buckets keyed by day number"""
+    n_days = last_day - first_day + 1
+    arrays = {field: np.zeros(n_days, dtype=np.int64) for field in ('focus_sessions', 'focus_seconds', 'break_seconds')}
+    for day, bucket in buckets.items():
+        if first_day <= day <= last_day:
+            for field, values in arrays.items():
+                values[day - first_day] = bucket[field]
+    return arrays
+
+def longest_run(active: np.ndarray) -> int:
+    """Length of the longest run of True values"""
+    edges = np.diff(np.concatenate(([0], active.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return int((ends - starts).max()) if starts.size else 0
+
+def summarize_range(first_day: int, arrays: Dict[str, np.ndarray], daily_goals: Dict[str, int]) -> Dict[str, Any]:
+    """Turn per-day arrays into range statistics with a daily breakdown"""
+    focus_sessions = arrays['focus_sessions']
+    total_focus_time = arrays['focus_seconds'] // 60
+    total_break_time = arrays['break_seconds'] // 60
+
+    goal_sessions = daily_goals['focus_sessions']
+    goal_minutes = daily_goals['focus_minutes']
+    session_score = np.minimum(100, focus_sessions / goal_sessions * 100) if goal_sessions > 0 else np.zeros(len(focus_sessions))
+    time_score = np.minimum(100, total_focus_time / goal_minutes * 100) if goal_minutes > 0 else np.zeros(len(focus_sessions))
+    productivity_score = (session_score + time_score) / 2
+
+    dates = (np.datetime64('1970-01-01') + np.arange(first_day, first_day + len(focus_sessions))).astype(str).tolist()
+    daily_breakdown = [
+        {
+            'date': dates[i],
+            'focus_sessions': int(focus_sessions[i]),
+            'total_focus_time': int(total_focus_time[i]),
+            'total_break_time': int(total_break_time[i]),
+            'productivity_score': float(productivity_score[i])
+        }
+        for i in range(len(focus_sessions))
+    ]
+
+    return {
+        'daily_breakdown': daily_breakdown,
+        'total_focus_sessions': int(focus_sessions.sum()),
+        'total_focus_time': int(total_focus_time.sum()),
+        'average_productivity': float(productivity_score.mean()),
+        'active_days': int(np.count_nonzero(focus_sessions)),
+        'longest_streak': longest_run(focus_sessions > 0),
+        'most_productive_day': dates[int(np.argmax(productivity_score))]
+    }
+
+def range_stats(store: SessionStore, first_day: int, last_day: int, daily_goals: Dict[str, int],
+                boundaries: List[float] = None) -> Dict[str, Any]:
+    """Statistics for every day in [first_day, last_day]"""
+    return summarize_range(first_day, day_arrays(store, first_day, last_day, boundaries), daily_goals)
@@ -0,0 +1,385 @@
+"""
+Asyncio HTTP/JSON API for timers and statistics, for clients outside Streamlit.
+Run from this directory: python api.py [--host 127.0.0.1] [--port 8765]
+
+    GET  /api/timer                                timer state
+    POST /api/timer/start                          start or resume; a JSON body overrides settings
+    POST /api/timer/pause | stop | reset | next    next skips to the following session
+    GET  /api/stats/daily[?date=YYYY-MM-DD]
+    GET  /api/stats/weekly
+    GET  /api/sessions/recent[?limit=10]
+    GET  /api/streaks
+    GET  /api/export[?format=json|jsonl|csv&compression=gzip|zstd]
+
+Every route takes ?user= to pick the timer and history, as the app does.
+JSON responses carry an ETag; a GET whose If-None-Match matches it gets
+304 Not Modified. Timers complete at their deadlines through a
+TimerScheduler, which logs the session and auto-starts the next one.
+
+The API shares state with a Streamlit app run on the same config, so it
+needs the sqlite engine: the memory engine's session log has a single
+writer. Both front ends read and write the one database, and each keeps
+its own copy of a user's timer. With checkpoints on, the checkpoint is the
+shared copy: each front end reloads it before acting on or completing a
+timer, so a pause or stop in one reaches the other, and the timer runs with
+the settings it was last started with. A session completed by both anyway
+is stored once, as the database skips a second session with the same user,
+start and type.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from config import load_config, resolve_path, CONFIG_PATH
+from exporter import iter_export, export_file_info
+from scheduler import ScheduledTimer, TimerScheduler
+from timer_manager import TimerManager, TimerState, DEFAULT_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY = 1 << 16
+
+MAX_RECENT = 1000
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+class Response:
+    """A complete body, or byte chunks sent with chunked transfer encoding"""
+
+    def __init__(self, status: HTTPStatus = HTTPStatus.OK, body: bytes = b'',
+                 headers: Dict[str, str] = None, chunks: Iterator[bytes] = None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.chunks = chunks
+
+def json_response(payload: Any, status: HTTPStatus = HTTPStatus.OK) -> Response:
+    """Serialize a payload, tagged with a hash of its bytes"""
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return Response(status, body, {
+        'Content-Type': 'application/json',
+        'ETag': f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"',
+        'Cache-Control': 'no-cache'
+    })
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag, comparing weakly"""
+    if header.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+def timer_state(timer: TimerManager) -> Dict[str, Any]:
+    """Describe a timer without advancing it; completion is the scheduler's job"""
+    remaining = timer.seconds_until_deadline()
+    if remaining is None:
+        remaining = timer.get_remaining_time()
+    return {
+        'state': timer.state.value,
+        'session_type': timer.current_session.value,
+        'session_count': timer.session_count,
+        'duration': timer.duration,
+        'remaining_seconds': round(remaining, 3)
+    }
+
+def parse_settings(body: bytes) -> Dict[str, Any]:
+    """Validate timer setting overrides sent as a JSON object"""
+    try:
+        settings = json.loads(body)
+    except ValueError as error:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {error}") from error
+    if not isinstance(settings, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Settings must be a JSON object")
+    for name, value in settings.items():
+        if name not in DEFAULT_SETTINGS:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Unknown setting: {name}")
+        expected = type(DEFAULT_SETTINGS[name])
+        if expected is bool:
+            valid = isinstance(value, bool)
+        else:
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0
+        if not valid:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid value for {name}: {value!r}")
+    return settings
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """Read one request as (method, target, headers, body); None once the client is done"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, separator, value = line.decode('latin-1').partition(':')
+        if not separator:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed header")
+        headers[name.strip().lower()] = value.strip()
+    if version == 'HTTP/1.0' and headers.get('connection', '').lower() != 'keep-alive':
+        headers['connection'] = 'close'
+
+    length = headers.get('content-length', '0')
+    if not length.isdigit():
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if int(length) > MAX_BODY:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    body = await reader.readexactly(int(length)) if int(length) else b''
+    return method, target, headers, body
+
+async def write_response(writer: asyncio.StreamWriter, response: Response, keep_alive: bool):
+    """Send a response, streaming chunked bodies with backpressure"""
+    headers = dict(response.headers)
+    if response.chunks is not None:
+        headers['Transfer-Encoding'] = 'chunked'
+    elif response.status != HTTPStatus.NOT_MODIFIED:
+        headers['Content-Length'] = str(len(response.body))
+    headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+
+    head = [f'HTTP/1.1 {response.status.value} {response.status.phrase}']
+    head.extend(f'{name}: {value}' for name, value in headers.items())
+    writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+    if response.chunks is None:
+        writer.write(response.body)
+    else:
+        for chunk in response.chunks:
+            if chunk:
+                writer.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                await writer.drain()
+        writer.write(b'0\r\n\r\n')
+    await writer.drain()
+
+class FocusTimerAPI:
+    """
+    Routes requests to per-user timers and data managers. Everything runs on
+    the event loop's thread; data manager calls are short and run inline.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None, clock=time.monotonic_ns):
+        self.config = config or load_config()
+        if self.config['storage']['engine'] != 'sqlite':
+            raise ValueError('The API needs engine = "sqlite" in [focus_timer.storage]; '
+                             'the memory engine\'s session log allows only one process to write it')
+        self.scheduler = TimerScheduler(clock, refresh=self.refresh_timer)
+        self._managers: Dict[str, Any] = {}
+        self._checkpoints = None
+        checkpoint_dir = self.config['storage']['checkpoint_dir']
+        if checkpoint_dir:
+            from checkpoints import CheckpointStore
+            self._checkpoints = CheckpointStore(resolve_path(checkpoint_dir))
+
+        self.routes = {
+            ('GET', '/api/timer'): self.get_timer,
+            ('POST', '/api/timer/start'): self.start_timer,
+            ('POST', '/api/timer/pause'): self.pause_timer,
+            ('POST', '/api/timer/stop'): self.stop_timer,
+            ('POST', '/api/timer/reset'): self.reset_timer,
+            ('POST', '/api/timer/next'): self.next_session,
+            ('GET', '/api/stats/daily'): self.daily_stats,
+            ('GET', '/api/stats/weekly'): self.weekly_stats,
+            ('GET', '/api/sessions/recent'): self.recent_sessions,
+            ('GET', '/api/streaks'): self.streaks,
+            ('GET', '/api/export'): self.export
+        }
+        self._paths = {path for _, path in self.routes}
+
+    def data_manager(self, user: str):
+        """Get the data manager for a user, creating it on first use"""
+        manager = self._managers.get(user)
+        if manager is None:
+            from data_manager import create_data_manager
+            manager = create_data_manager(self.config, user)
+            if self.config['cache']['enabled']:
+                from stats_cache import CachedDataManager
+                manager = CachedDataManager(manager, self.config['cache']['max_entries'])
+            self._managers[user] = manager
+        return manager
+
+    def timer(self, user: str) -> ScheduledTimer:
+        """Get a user's scheduled timer, up to date with its checkpoint"""
+        entry = self.scheduler.timers.get(user)
+        if entry is None:
+            if self._checkpoints is not None:
+                timer = self._checkpoints.timer(user, self.scheduler.clock)
+            else:
+                timer = TimerManager(self.scheduler.clock)
+            self._schedule(user, timer)
+        else:
+            self.refresh_timer(user)
+        return self.scheduler.timers[user]
+
+    def refresh_timer(self, user: str) -> bool:
+        """Swap in the checkpointed timer if another process changed it; True if it did"""
+        entry = self.scheduler.timers.get(user)
+        if self._checkpoints is None or entry is None:
+            return False
+        timer = self._checkpoints.refresh(user, entry.timer, self.scheduler.clock)
+        if timer is entry.timer:
+            return False
+        self._schedule(user, timer)
+        return True
+
+    def _schedule(self, user: str, timer: TimerManager):
+        """Hand a timer to the scheduler with the settings it last started with"""
+        settings = dict(DEFAULT_SETTINGS)
+        settings.update(timer.settings or {})
+        self.scheduler.add(user, timer, settings, self.data_manager(user))
+
+    def get_timer(self, user: str, query: Dict[str, str], body: bytes) -> Response:
+        return json_response(timer_state(self.timer(user).timer))
+
+    def start_timer(self, user: str, query: Dict[str, str], body: bytes) -> Response:
+        entry = self.timer(user)
+        if entry.timer.is_running():
+            raise HTTPError(HTTPStatus.CONFLICT, "Timer is already running")
+        if body:
+            entry.settings.update(parse_settings(body))
+        self.scheduler.start(user)
+        return json_response(timer_state(entry.timer))
+
+    def pause_timer(self, user: str, query: Dict[str, str], body: bytes) -> Response:
+        entry = self.timer(user)
+        self.scheduler.pause(user)
+        return json_response(timer_state(entry.timer))
+
+    def stop_timer(self, user: str, query: Dict[str, str], body: bytes) -> Response:
+        entry = self.timer(user)
+        if entry.timer.state in (TimerState.RUNNING, TimerState.PAUSED):
+            self.scheduler.stop(user)
+        return json_response(timer_state(entry.timer))
+
+    def reset_timer(self, user: str, query: Dict[str, str], body: bytes) -> Response:
+        entry = self.timer(user)
+        self.scheduler.reset(user)
+        return json_response(timer_state(entry.timer))
+
+    def next_session(self, user: str, query: Dict[str, str], body: bytes) -> Response:
+        entry = self.timer(user)
+        self.scheduler.skip(user)
+        return json_response(timer_state(entry.timer))
+
+    def daily_stats(self, user: str, query: Dict[str, str], body: bytes) -> Response:
+        date = query.get('date')
+        try:
+            date = datetime.fromisoformat(date) if date else None
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid date: {date}")
+        return json_response(self.data_manager(user).get_daily_stats(date))
+
+    def weekly_stats(self, user: str, query: Dict[str, str], body: bytes) -> Response:
+        return json_response(self.data_manager(user).get_weekly_stats())
+
+    def recent_sessions(self, user: str, query: Dict[str, str], body: bytes) -> Response:
+        limit = query.get('limit', '10')
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_RECENT:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"limit must be between 1 and {MAX_RECENT}")
+        return json_response(self.data_manager(user).get_recent_sessions(int(limit)))
+
+    def streaks(self, user: str, query: Dict[str, str], body: bytes) -> Response:
+        return json_response(self.data_manager(user).get_streak_data())
+
+    def export(self, user: str, query: Dict[str, str], body: bytes) -> Response:
+        fmt = query.get('format', 'json')
+        compression = query.get('compression') or None
+        chunks = iter_export(self.data_manager(user), fmt, compression)
+        info = export_file_info(fmt, compression)
+        return Response(headers={
+            'Content-Type': info['mime'],
+            'Content-Disposition': f'attachment; filename="focus_timer_data.{info["extension"]}"'
+        }, chunks=chunks)
+
+    def dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Response:
+        """Route one request, turning errors into JSON error responses"""
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        handler = self.routes.get((method, url.path))
+        try:
+            if handler is None:
+                if url.path in self._paths:
+                    raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+                raise HTTPError(HTTPStatus.NOT_FOUND)
+            response = handler(query.get('user') or self.config['storage']['user'], query, body)
+        except HTTPError as error:
+            return json_response({'error': str(error)}, error.status)
+        except ValueError as error:
+            return json_response({'error': str(error)}, HTTPStatus.BAD_REQUEST)
+        except Exception:
+            logger.exception("%s %s failed", method, target)
+            return json_response({'error': 'Internal Server Error'}, HTTPStatus.INTERNAL_SERVER_ERROR)
+
+        etag = response.headers.get('ETag')
+        if method == 'GET' and etag and etag_matches(headers.get('if-none-match', ''), etag):
+            return Response(HTTPStatus.NOT_MODIFIED, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+        return response
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve keep-alive requests on one connection until it closes"""
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as error:
+                    await write_response(writer, json_response({'error': str(error)}, error.status), False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await write_response(writer, self.dispatch(method, target, headers, body), keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            # Dropped connections and oversized lines end the connection quietly
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int):
+        """Serve until cancelled, with the scheduler completing timers meanwhile"""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        scheduler_task = asyncio.create_task(self.scheduler.run())
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"Serving on http://{host}:{port}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            scheduler_task.cancel()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--config', default=CONFIG_PATH, help='config.toml to read [focus_timer.*] from')
+    parser.add_argument('--host', help='overrides [focus_timer.api] host')
+    parser.add_argument('--port', type=int, help='overrides [focus_timer.api] port; 0 picks a free one')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    config = load_config(args.config)
+    host = args.host or config['api']['host']
+    port = args.port if args.port is not None else config['api']['port']
+    try:
+        api = FocusTimerAPI(config)
+    except ValueError as error:
+        parser.error(str(error))
+    try:
+        asyncio.run(api.serve(host, port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
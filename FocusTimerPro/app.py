@@ -1,407 +1,374 @@
-import streamlit as st
-import time
-import json
-from datetime import datetime, timedelta
-from timer_manager import TimerManager
-from data_manager import DataManager
-from themes import THEMES
-
-if 'timer_manager' not in st.session_state:
-    st.session_state.timer_manager = TimerManager()
-if 'data_manager' not in st.session_state:
-    st.session_state.data_manager = DataManager()
-if 'current_theme' not in st.session_state:
-    st.session_state.current_theme = 'Ocean Blue'
-if 'settings' not in st.session_state:
-    st.session_state.settings = {
-        'focus_duration': 25,
-        'short_break': 5,
-        'long_break': 15,
-        'sessions_until_long_break': 4,
-        'auto_start_breaks': False,
-        'auto_start_focus': False,
-        'notifications_enabled': True
-    }
-
-def apply_custom_css():
-    """Apply custom CSS for the selected theme"""
-    theme = THEMES[st.session_state.current_theme]
-    css = f"""
-    <style>
-    /* Mobile-first responsive design */
-    .timer-display {{
-        text-align: center;
-        font-size: clamp(2.5rem, 8vw, 4rem);
-        font-weight: bold;
-        color: {theme['primary']};
-        margin: 1rem 0 2rem 0;
-        font-family: 'Courier New', monospace;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        line-height: 1.2;
-    }}
-    
-    .session-type {{
-        text-align: center;
-        font-size: clamp(1rem, 4vw, 1.5rem);
-        color: {theme['secondary']};
-        margin-bottom: 1rem;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-        word-wrap: break-word;
-    }}
-    
-    .progress-bar {{
-        width: 100%;
-        height: 20px;
-        background-color: {theme['background']};
-        border-radius: 10px;
-        margin: 1rem 0;
-        overflow: hidden;
-        box-shadow: inset 0 2px 4px rgba(0,0,0,0.2);
-        touch-action: none;
-    }}
-    
-    .progress-fill {{
-        height: 100%;
-        background: linear-gradient(90deg, {theme['primary']}, {theme['accent']});
-        border-radius: 10px;
-        transition: width 0.3s ease;
-    }}
-    
-    .stats-card {{
-    background: {theme['background']};
-    color: {theme['text']};
-    padding: 1rem;
-    border-radius: 10px;
-    margin: 0.5rem 0;
-    border-left: 4px solid {theme['primary']};
-    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-    word-wrap: break-word;
-}}
-    
-    .control-button {{
-        margin: 0.25rem;
-        padding: 0.75rem 1rem;
-        border-radius: 8px;
-        border: none;
-        font-weight: bold;
-        cursor: pointer;
-        transition: all 0.3s ease;
-        min-height: 44px;
-        touch-action: manipulation;
-        font-size: 0.9rem;
-    }}
-    
-    .start-button {{
-        background: {theme['success']};
-        color: white;
-    }}
-    
-    .pause-button {{
-        background: {theme['warning']};
-        color: white;
-    }}
-    
-    .stop-button {{
-        background: {theme['danger']};
-        color: white;
-    }}
-    
-    .metric-value {{
-        font-size: clamp(1.2rem, 4vw, 2rem);
-        font-weight: bold;
-        color: {theme['primary']};
-    }}
-    
-    .session-history {{
-        max-height: 300px;
-        overflow-y: auto;
-        background: {theme['background']};
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 1rem 0;
-        -webkit-overflow-scrolling: touch;
-    }}
-    
-    /* Mobile specific adjustments */
-    @media (max-width: 768px) {{
-        .timer-display {{
-            margin: 0.5rem 0 1.5rem 0;
-        }}
-        
-        .session-type {{
-            font-size: 1.1rem;
-            letter-spacing: 0.5px;
-            margin-bottom: 0.75rem;
-        }}
-        
-        .control-button {{
-            padding: 0.875rem 0.75rem;
-            font-size: 0.85rem;
-            margin: 0.125rem;
-        }}
-        
-        .stats-card {{
-            padding: 0.75rem;
-            margin: 0.25rem 0;
-        }}
-        
-        .session-history {{
-            max-height: 250px;
-            padding: 0.75rem;
-        }}
-        
-        /* Ensure proper spacing on mobile */
-        .stButton > button {{
-            width: 100% !important;
-            margin: 0.125rem 0 !important;
-            min-height: 44px !important;
-            font-size: 0.9rem !important;
-        }}
-        
-        /* Improve metric display on mobile */
-        .metric-value {{
-            font-size: 1.5rem;
-        }}
-        
-        /* Better sidebar on mobile */
-        .css-1d391kg {{
-            padding: 1rem 0.5rem;
-        }}
-    }}
-    
-    /* Very small mobile devices */
-    @media (max-width: 480px) {{
-        .timer-display {{
-            font-size: 2rem;
-            margin: 0.25rem 0 1rem 0;
-        }}
-        
-        .session-type {{
-            font-size: 0.95rem;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .control-button {{
-            font-size: 0.8rem;
-            padding: 0.75rem 0.5rem;
-        }}
-        
-        .stats-card {{
-            padding: 0.5rem;
-            font-size: 0.9rem;
-        }}
-    }}
-    
-    /* Tablet adjustments */
-    @media (min-width: 769px) and (max-width: 1024px) {{
-        .timer-display {{
-            font-size: 3.5rem;
-        }}
-        
-        .session-type {{
-            font-size: 1.3rem;
-        }}
-    }}
-    
-    /* Touch-friendly improvements */
-    button {{
-        touch-action: manipulation;
-        -webkit-tap-highlight-color: transparent;
-    }}
-    
-    /* Prevent zoom on input focus for iOS */
-    input, select, textarea {{
-        font-size: 16px !important;
-    }}
-    
-    /* Smooth scrolling */
-    html {{
-        scroll-behavior: smooth;
-    }}
-    </style>
-    """
-    st.markdown(css, unsafe_allow_html=True)
-
-def format_time(seconds):
-    """Format seconds into MM:SS format"""
-    minutes = int(seconds // 60)
-    seconds = int(seconds % 60)
-    return f"{minutes:02d}:{seconds:02d}"
-
-def main():
-    st.set_page_config(
-        page_title="Focus Timer Pro",
-        page_icon="⏰",
-        layout="wide",
-        initial_sidebar_state="expanded"
-    )
-    
-    apply_custom_css()
-    
-    with st.sidebar:
-        st.title("⚙️ Settings")
-        
-        st.subheader("🎨 Theme")
-        new_theme = st.selectbox(
-            "Choose Theme",
-            options=list(THEMES.keys()),
-            index=list(THEMES.keys()).index(st.session_state.current_theme)
-        )
-        if new_theme != st.session_state.current_theme:
-            st.session_state.current_theme = new_theme
-            st.rerun()
-        
-        st.divider()
-        
-        st.subheader("⏱️ Timer Settings")
-        st.session_state.settings['focus_duration'] = st.slider(
-            "Focus Duration (minutes)", 1, 60, st.session_state.settings['focus_duration']
-        )
-        st.session_state.settings['short_break'] = st.slider(
-            "Short Break (minutes)", 1, 30, st.session_state.settings['short_break']
-        )
-        st.session_state.settings['long_break'] = st.slider(
-            "Long Break (minutes)", 1, 60, st.session_state.settings['long_break']
-        )
-        st.session_state.settings['sessions_until_long_break'] = st.slider(
-            "Sessions until Long Break", 2, 10, st.session_state.settings['sessions_until_long_break']
-        )
-        
-        st.divider()
-        
-        st.subheader("🔄 Auto-start")
-        st.session_state.settings['auto_start_breaks'] = st.checkbox(
-            "Auto-start breaks", st.session_state.settings['auto_start_breaks']
-        )
-        st.session_state.settings['auto_start_focus'] = st.checkbox(
-            "Auto-start focus after breaks", st.session_state.settings['auto_start_focus']
-        )
-        
-        st.divider()
-        
-        st.subheader("📊 Data Export")
-        if st.button("Export Session Data"):
-            data = st.session_state.data_manager.export_data()
-            st.download_button(
-                label="Download JSON",
-                data=json.dumps(data, indent=2),
-                file_name=f"focus_timer_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                mime="application/json"
-            )
-    
-    st.title("🎯 Focus Timer Pro")
-    st.markdown("*Boost your productivity with customizable focus sessions*")
-    
-    if st.session_state.get('mobile_layout', False) or True:
-
-        st.markdown('<div class="timer-container">', unsafe_allow_html=True)
-        
-        session_type = st.session_state.timer_manager.get_session_type_display()
-        st.markdown(f'<div class="session-type">{session_type}</div>', unsafe_allow_html=True)
-        
-        remaining_time = st.session_state.timer_manager.get_remaining_time()
-        time_display = format_time(remaining_time)
-        st.markdown(f'<div class="timer-display">{time_display}</div>', unsafe_allow_html=True)
-        
-        progress = st.session_state.timer_manager.get_progress()
-        st.markdown(f"""
-        <div class="progress-bar">
-            <div class="progress-fill" style="width: {progress * 100}%"></div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        button_col1, button_col2 = st.columns(2)
-        
-        with button_col1:
-            if st.button("▶️ Start", use_container_width=True, key="start_btn"):
-                st.session_state.timer_manager.start_timer(st.session_state.settings)
-                st.rerun()
-            
-            if st.button("⏹️ Stop", use_container_width=True, key="stop_btn"):
-                st.session_state.timer_manager.stop_timer()
-                st.rerun()
-        
-        with button_col2:
-            if st.button("⏸️ Pause", use_container_width=True, key="pause_btn"):
-                st.session_state.timer_manager.pause_timer()
-                st.rerun()
-            
-            if st.button("🔄 Reset", use_container_width=True, key="reset_btn"):
-                st.session_state.timer_manager.reset_timer()
-                st.rerun()
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    st.divider()
-    st.subheader("📈 Today's Progress")
-    
-    stats = st.session_state.data_manager.get_daily_stats()
-    
-    stat_col1, stat_col2 = st.columns(2)
-    
-    with stat_col1:
-        st.metric(
-            label="Focus Sessions",
-            value=stats['focus_sessions'],
-            delta=f"+{stats['focus_sessions']} today"
-        )
-        
-        st.metric(
-            label="Break Time",
-            value=f"{stats['total_break_time']//60}h {stats['total_break_time']%60}m",
-            delta=f"+{stats['total_break_time']//60}h today"
-        )
-    
-    with stat_col2:
-        st.metric(
-            label="Total Focus Time",
-            value=f"{stats['total_focus_time']//60}h {stats['total_focus_time']%60}m",
-            delta=f"+{stats['total_focus_time']//60}h today"
-        )
-        
-        st.metric(
-            label="Productivity Score",
-            value=f"{stats['productivity_score']:.1f}%",
-            delta=f"Based on {stats['focus_sessions']} sessions"
-        )
-    
-    st.divider()
-    st.subheader("📅 Recent Sessions")
-    
-    history = st.session_state.data_manager.get_recent_sessions(10)
-    if history:
-        for session in history:
-            session_date = datetime.fromisoformat(session['start_time']).strftime("%H:%M")
-            duration = session['duration'] // 60
-            session_type = session['session_type'].title()
-            
-            st.markdown(f"""
-            <div class="stats-card">
-                <strong>{session_date}</strong> - {session_type} Session 
-                <span style="float: right;">{duration} minutes</span>
-            </div>
-            """, unsafe_allow_html=True)
-    else:
-        st.info("No sessions completed yet. Start your first focus session!")
-    
-    if st.session_state.timer_manager.is_running():
-        session_completed = st.session_state.timer_manager.update()
-        
-        if session_completed:
-            st.session_state.data_manager.log_session(
-                st.session_state.timer_manager.get_completed_session_data()
-            )
-            
-            st.success(f"🎉 {session_type} session completed!")
-            
-            next_session = st.session_state.timer_manager.get_next_session_type()
-            if ((next_session in ['short_break', 'long_break'] and st.session_state.settings['auto_start_breaks']) or
-                (next_session == 'focus' and st.session_state.settings['auto_start_focus'])):
-                st.session_state.timer_manager.start_next_session(st.session_state.settings)
-        
-        time.sleep(1)
-        st.rerun()
-
-if __name__ == "__main__":
+import streamlit as st
+import time
+from datetime import datetime, timedelta
+from timer_manager import TimerManager, DEFAULT_SETTINGS
+from themes import THEMES, get_theme_css
+from exporter import FORMATS, iter_export, export_file_info, zstd_available
+from config import load_config, resolve_path
+from instrumentation import (
+    instrumentation_enabled, get_metrics, InstrumentedDataManager, RerunProfile, NullProfile
+)
+
+if 'timer_manager' not in st.session_state:
+    storage = load_config()['storage']
+    st.session_state.checkpoints = None
+    # Anonymous visitors would all restore one "default" checkpoint, so only named users get one
+    if storage['checkpoint_dir'] and st.query_params.get('user'):
+        from checkpoints import CheckpointStore
+        st.session_state.checkpoints = CheckpointStore(resolve_path(storage['checkpoint_dir']))
+        st.session_state.checkpoint_user = st.query_params['user']
+        st.session_state.timer_manager = st.session_state.checkpoints.timer(st.session_state.checkpoint_user)
+    else:
+        st.session_state.timer_manager = TimerManager()
+if 'metrics' not in st.session_state:
+    instrumentation = load_config()['instrumentation']
+    st.session_state.metrics = (
+        get_metrics(resolve_path(instrumentation['metrics_file']))
+        if instrumentation_enabled(instrumentation) else None
+    )
+if 'current_theme' not in st.session_state:
+    st.session_state.current_theme = 'Ocean Blue'
+if 'settings' not in st.session_state:
+    st.session_state.settings = dict(DEFAULT_SETTINGS)
+    # A restored timer keeps the settings it was started with
+    st.session_state.settings.update(st.session_state.timer_manager.settings or {})
+
+def get_data_manager():
+    """Get this session's data manager, loading the stored history on first use"""
+    if 'data_manager' not in st.session_state:
+        # Imported here so the timer paints before the storage layer loads
+        from data_manager import create_data_manager
+        config = load_config()
+        data_manager = create_data_manager(config, user=st.query_params.get('user'))
+        if st.session_state.metrics is not None:
+            data_manager = InstrumentedDataManager(data_manager, st.session_state.metrics)
+        if config['cache']['enabled']:
+            # Outside the instrumentation, so its call counts are cache misses
+            from stats_cache import CachedDataManager
+            data_manager = CachedDataManager(data_manager, config['cache']['max_entries'])
+        st.session_state.data_manager = data_manager
+    return st.session_state.data_manager
+
+def apply_custom_css():
+    """Apply custom CSS for the selected theme"""
+    st.markdown(get_theme_css(st.session_state.current_theme), unsafe_allow_html=True)
+
+def format_time(seconds):
+    """Format seconds into MM:SS format"""
+    minutes = int(seconds // 60)
+    seconds = int(seconds % 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+def render_timer():
+    """Render the session type, countdown and progress bar"""
+    session_type = st.session_state.timer_manager.get_session_type_display()
+    st.markdown(f'<div class="session-type">{session_type}</div>', unsafe_allow_html=True)
+    
+    remaining_time = st.session_state.timer_manager.get_remaining_time()
+    time_display = format_time(remaining_time)
+    st.markdown(f'<div class="timer-display">{time_display}</div>', unsafe_allow_html=True)
+    
+    progress = st.session_state.timer_manager.get_progress()
+    st.markdown(f"""
+    <div class="progress-bar">
+        <div class="progress-fill" style="width: {progress * 100}%"></div>
+    </div>
+    """, unsafe_allow_html=True)
+
+def sync_timer():
+    """Pick up a pause, stop or completion the API or another tab saved to the checkpoint"""
+    checkpoints = st.session_state.checkpoints
+    if checkpoints is not None:
+        st.session_state.timer_manager = checkpoints.refresh(
+            st.session_state.checkpoint_user, st.session_state.timer_manager
+        )
+
+def complete_session():
+    """Log the finished session and auto-start the next one if enabled"""
+    with st.session_state.profile.phase('completion'):
+        session_data = st.session_state.timer_manager.get_completed_session_data()
+        get_data_manager().log_session(session_data)
+        session_type = session_data['session_type'].replace('_', ' ').title()
+        st.session_state.completed_message = f"🎉 {session_type} session completed!"
+        
+        if st.session_state.timer_manager.should_auto_start(st.session_state.settings):
+            st.session_state.timer_manager.start_next_session(st.session_state.settings)
+
+def render_timezone_setting():
+    """Let the user pick the time zone their days are counted in"""
+    data_manager = get_data_manager()
+    current = data_manager.days.timezone or ''
+    with st.sidebar:
+        st.divider()
+        st.subheader("🌍 Time Zone")
+        timezone = st.text_input(
+            "IANA time zone (blank for server time)", current, placeholder="Europe/Berlin"
+        ).strip()
+    if timezone != current:
+        try:
+            data_manager.set_timezone(timezone or None)
+        except ValueError as error:
+            st.sidebar.error(str(error))
+        else:
+            st.rerun()
+
+def render_debug_panel(profile):
+    """Show this rerun's phase timings and the data manager call totals"""
+    metrics = st.session_state.metrics
+    with st.sidebar.expander("🔍 Rerun Profile"):
+        st.caption("This rerun, milliseconds")
+        st.table({
+            'phase': list(profile.phases),
+            'ms': [round(seconds * 1000, 3) for seconds in profile.phases.values()]
+        })
+        st.caption("Data manager calls since start")
+        methods = sorted(metrics.call_count)
+        st.table({
+            'method': methods,
+            'calls': [metrics.call_count[method] for method in methods],
+            'ms': [round(metrics.call_seconds[method] * 1000, 3) for method in methods],
+            'rows returned': [metrics.call_rows[method] for method in methods]
+        })
+        cache_info = getattr(st.session_state.get('data_manager'), 'cache_info', None)
+        if cache_info is not None:
+            info = cache_info()
+            st.caption(
+                f"Stats cache: {info['hits']} hits, {info['misses']} misses, "
+                f"{info['evictions']} evictions, {info['entries']}/{info['max_entries']} entries"
+            )
+        st.download_button(
+            label="Download Prometheus metrics",
+            data=metrics.prometheus_text(),
+            file_name="focus_metrics.prom",
+            mime="text/plain"
+        )
+
+def timer_fragment():
+    """Tick the timer once a second without re-running the whole page"""
+    # Wait out a final partial second so completion lands on the deadline
+    wait = st.session_state.timer_manager.seconds_until_deadline()
+    if wait is not None and wait < 1:
+        time.sleep(wait)
+    sync_timer()
+    if st.session_state.timer_manager.is_running() and st.session_state.timer_manager.update():
+        complete_session()
+        st.rerun()
+    render_timer()
+
+def main():
+    st.set_page_config(
+        page_title="Focus Timer Pro",
+        page_icon="⏰",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    sync_timer()
+    metrics = st.session_state.metrics
+    profile = st.session_state.profile = RerunProfile(metrics) if metrics is not None else NullProfile()
+    
+    apply_custom_css()
+    profile.lap('css')
+    
+    with st.sidebar:
+        st.title("⚙️ Settings")
+        
+        st.subheader("🎨 Theme")
+        new_theme = st.selectbox(
+            "Choose Theme",
+            options=list(THEMES.keys()),
+            index=list(THEMES.keys()).index(st.session_state.current_theme)
+        )
+        if new_theme != st.session_state.current_theme:
+            st.session_state.current_theme = new_theme
+            st.rerun()
+        
+        st.divider()
+        
+        st.subheader("⏱️ Timer Settings")
+        st.session_state.settings['focus_duration'] = st.slider(
+            "Focus Duration (minutes)", 1, 60, st.session_state.settings['focus_duration']
+        )
+        st.session_state.settings['short_break'] = st.slider(
+            "Short Break (minutes)", 1, 30, st.session_state.settings['short_break']
+        )
+        st.session_state.settings['long_break'] = st.slider(
+            "Long Break (minutes)", 1, 60, st.session_state.settings['long_break']
+        )
+        st.session_state.settings['sessions_until_long_break'] = st.slider(
+            "Sessions until Long Break", 2, 10, st.session_state.settings['sessions_until_long_break']
+        )
+        
+        st.divider()
+        
+        st.subheader("🔄 Auto-start")
+        st.session_state.settings['auto_start_breaks'] = st.checkbox(
+            "Auto-start breaks", st.session_state.settings['auto_start_breaks']
+        )
+        st.session_state.settings['auto_start_focus'] = st.checkbox(
+            "Auto-start focus after breaks", st.session_state.settings['auto_start_focus']
+        )
+        
+        st.divider()
+        
+        st.subheader("📊 Data Export")
+        export_format = st.selectbox("Format", list(FORMATS), format_func=str.upper)
+        compressions = [None, 'gzip'] + (['zstd'] if zstd_available() else [])
+        export_compression = st.selectbox(
+            "Compression", compressions, format_func=lambda name: name or "None"
+        )
+        export_start = export_end = None
+        if st.checkbox("Limit to date range"):
+            today = datetime.now().date()
+            dates = st.date_input("Date range", (today - timedelta(days=30), today))
+            if len(dates) == 2:
+                export_start = datetime.combine(dates[0], datetime.min.time())
+                export_end = datetime.combine(dates[1], datetime.min.time()) + timedelta(days=1)
+        if st.button("Export Session Data"):
+            # st.download_button holds the whole payload in memory, so the browser
+            # download is still buffered; only the pretty-printed copy is gone.
+            # Compress to shrink it, or stream from GET /api/export instead.
+            export_bytes = b''.join(iter_export(get_data_manager(), export_format,
+                                                export_compression, export_start, export_end))
+            info = export_file_info(export_format, export_compression)
+            st.download_button(
+                label=f"Download {info['extension'].upper()}",
+                data=export_bytes,
+                file_name=f"focus_timer_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{info['extension']}",
+                mime=info['mime']
+            )
+        
+        st.subheader("📥 Data Import")
+        uploaded = st.file_uploader("Session backup", type=['json', 'jsonl', 'gz'] + (['zst'] if zstd_available() else []))
+        if uploaded is not None and st.button("Import Session Data"):
+            progress_bar = st.progress(0.0, text="Importing...")
+            total_bytes = uploaded.size or 1
+            from importer import import_file
+            try:
+                imported = import_file(
+                    get_data_manager(),
+                    uploaded,
+                    progress=lambda read, added: progress_bar.progress(
+                        min(1.0, uploaded.tell() / total_bytes),
+                        text=f"Read {read:,} sessions, added {added:,}"
+                    )
+                )
+            except ValueError as error:
+                progress_bar.empty()
+                st.error(f"Import stopped: {error}. Sessions read before it were kept.")
+            else:
+                progress_bar.progress(1.0, text=f"Imported {imported:,} new sessions")
+    profile.lap('sidebar')
+    
+    st.title("🎯 Focus Timer Pro")
+    st.markdown("*Boost your productivity with customizable focus sessions*")
+    
+    if 'completed_message' in st.session_state:
+        st.success(st.session_state.pop('completed_message'))
+    
+    if st.session_state.get('mobile_layout', False) or True:
+
+        st.markdown('<div class="timer-container">', unsafe_allow_html=True)
+        
+        if hasattr(st, 'fragment'):
+            run_every = 1 if st.session_state.timer_manager.is_running() else None
+            st.fragment(run_every=run_every)(timer_fragment)()
+        else:
+            render_timer()
+        
+        button_col1, button_col2 = st.columns(2)
+        
+        with button_col1:
+            if st.button("▶️ Start", use_container_width=True, key="start_btn"):
+                st.session_state.timer_manager.start_timer(st.session_state.settings)
+                st.rerun()
+            
+            if st.button("⏹️ Stop", use_container_width=True, key="stop_btn"):
+                st.session_state.timer_manager.stop_timer()
+                st.rerun()
+        
+        with button_col2:
+            if st.button("⏸️ Pause", use_container_width=True, key="pause_btn"):
+                st.session_state.timer_manager.pause_timer()
+                st.rerun()
+            
+            if st.button("🔄 Reset", use_container_width=True, key="reset_btn"):
+                st.session_state.timer_manager.reset_timer()
+                st.rerun()
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+    profile.lap('timer')
+    
+    st.divider()
+    st.subheader("📈 Today's Progress")
+    
+    stats = get_data_manager().get_daily_stats()
+    
+    stat_col1, stat_col2 = st.columns(2)
+    
+    with stat_col1:
+        st.metric(
+            label="Focus Sessions",
+            value=stats['focus_sessions'],
+            delta=f"+{stats['focus_sessions']} today"
+        )
+        
+        st.metric(
+            label="Break Time",
+            value=f"{stats['total_break_time']//60}h {stats['total_break_time']%60}m",
+            delta=f"+{stats['total_break_time']//60}h today"
+        )
+    
+    with stat_col2:
+        st.metric(
+            label="Total Focus Time",
+            value=f"{stats['total_focus_time']//60}h {stats['total_focus_time']%60}m",
+            delta=f"+{stats['total_focus_time']//60}h today"
+        )
+        
+        st.metric(
+            label="Productivity Score",
+            value=f"{stats['productivity_score']:.1f}%",
+            delta=f"Based on {stats['focus_sessions']} sessions"
+        )
+    profile.lap('daily_stats')
+    
+    st.divider()
+    st.subheader("📅 Recent Sessions")
+    
+    data_manager = get_data_manager()
+    history = data_manager.get_recent_records(10)
+    if history:
+        for session in history:
+            # Stored in server time; shown in the user's time zone
+            session_date = data_manager.days.local_time(session.start_datetime).strftime("%H:%M")
+            duration = session.duration // 60
+            session_type = session.session_type.title()
+            
+            st.markdown(f"""
+            <div class="stats-card">
+                <strong>{session_date}</strong> - {session_type} Session 
+                <span style="float: right;">{duration} minutes</span>
+            </div>
+            """, unsafe_allow_html=True)
+    else:
+        st.info("No sessions completed yet. Start your first focus session!")
+    profile.lap('recent_sessions')
+    
+    # Rendered into the sidebar last so the storage layer still loads after the timer paints
+    render_timezone_setting()
+    
+    profile.finish()
+    if metrics is not None:
+        render_debug_panel(profile)
+    
+    if st.session_state.timer_manager.is_running() and not hasattr(st, 'fragment'):
+        if st.session_state.timer_manager.update():
+            complete_session()
+        
+        wait = st.session_state.timer_manager.seconds_until_deadline()
+        time.sleep(1 if wait is None else min(1, wait))
+        st.rerun()
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
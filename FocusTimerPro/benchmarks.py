@@ -0,0 +1,346 @@
+"""
+Load tests and profiling reports for Focus Timer, plus the synthetic data
+the pytest-benchmark suite in test_benchmarks.py runs on.
+Run from this directory: python benchmarks.py --load-users 32 | --scheduler-timers 10000 |
+--api-clients 32 [--conditional] | --cold-start [--importtime] | --themes
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from data_manager import DataManager
+from themes import THEMES, get_theme_css, render_theme_css
+from timer_manager import TimerManager
+
+SESSIONS_PER_DAY = 12
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+def generate_sessions(count: int, seed: int = 0) -> list:
+    """Generate synthetic sessions, SESSIONS_PER_DAY per day, ending today"""
+    rng = random.Random(seed)
+    today = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0)
+    sessions = []
+    for i in range(count):
+        day = today - timedelta(days=i // SESSIONS_PER_DAY)
+        start = day + timedelta(minutes=30 * (i % SESSIONS_PER_DAY), seconds=rng.randrange(60))
+        session_type = 'focus' if i % 2 == 0 else rng.choice(['short_break', 'long_break'])
+        duration = 25 * 60 if session_type == 'focus' else rng.choice([5, 15]) * 60
+        sessions.append({
+            'session_type': session_type,
+            'duration': duration,
+            'start_time': start.isoformat(),
+            'end_time': (start + timedelta(seconds=duration)).isoformat(),
+            'completed': True,
+            'logged_at': (start + timedelta(seconds=duration)).isoformat()
+        })
+    return sessions
+
+def timed(func, repeat: int) -> float:
+    """Return the best wall time of `repeat` calls in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def count_parses(func) -> int:
+    """Count the fromisoformat calls made while running func once"""
+    parses = 0
+    def profile(frame, event, arg):
+        nonlocal parses
+        if event == 'c_call' and getattr(arg, '__name__', None) == 'fromisoformat':
+            parses += 1
+    sys.setprofile(profile)
+    try:
+        func()
+    finally:
+        sys.setprofile(None)
+    return parses
+
+def running_timer() -> TimerManager:
+    """A timer mid-way through a long focus session"""
+    timer = TimerManager()
+    timer.start_timer({'focus_duration': 600, 'short_break': 5, 'long_break': 15})
+    return timer
+
+def theme_report(repeat: int):
+    """Per-rerun CSS payload and render time for every theme"""
+    print(f"{'theme':<16} {'raw B':>7} {'sent B':>7} {'render ms':>10} {'cached ms':>10}")
+    get_theme_css.cache_clear()
+    for name in THEMES:
+        render_ms = timed(lambda: render_theme_css(name), repeat)
+        payload = get_theme_css(name)
+        cached_ms = timed(lambda: get_theme_css(name), repeat)
+        print(f"{name:<16} {len(render_theme_css(name).encode()):>7} {len(payload.encode()):>7} "
+              f"{render_ms:10.4f} {cached_ms:10.4f}")
+
+def load_test(users: int, sessions_per_user: int, pool_size: int, think_ms: float):
+    """Concurrent timers completing sessions through one shared SQLite store"""
+    from shared_store import SharedStore
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SharedStore(os.path.join(directory, 'load.db'), pool_size)
+        latencies = []
+        barrier = threading.Barrier(users)
+
+        def timer_thread(user_id: int):
+            manager = store.for_user(f'user-{user_id}')
+            sessions = generate_sessions(sessions_per_user, seed=user_id)
+            rng = random.Random(user_id)
+            barrier.wait()
+            for session in sessions:
+                time.sleep(rng.uniform(0, 2 * think_ms) / 1000)
+                started = time.perf_counter()
+                manager.log_session(session)
+                manager.get_daily_stats()
+                latencies.append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=timer_thread, args=(i,)) for i in range(users)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        store.close()
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{users} timers x {sessions_per_user} sessions, pool {pool_size}, think {think_ms} ms: "
+          f"{len(latencies) / elapsed:,.0f} completions/s  p50 {p50:.2f} ms  p99 {p99:.2f} ms")
+
+def scheduler_test(timers: int, spread_s: float):
+    """Many timers completing through one asyncio scheduler"""
+    import asyncio
+    from scheduler import TimerScheduler
+
+    async def run():
+        scheduler = TimerScheduler()
+        manager = DataManager()
+        done = asyncio.Event()
+        rng = random.Random(0)
+
+        def on_complete(key, session_data):
+            if scheduler.completed == timers:
+                done.set()
+
+        task = asyncio.create_task(scheduler.run())
+        for key in range(timers):
+            # Durations are whole seconds, given in minutes as the settings expect
+            settings = {'focus_duration': rng.randint(1, max(1, round(spread_s))) / 60,
+                        'short_break': 5, 'long_break': 15,
+                        'auto_start_breaks': False, 'auto_start_focus': False}
+            scheduler.add(key, TimerManager(), settings, manager, on_complete)
+            scheduler.start(key)
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        await done.wait()
+        elapsed = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+        task.cancel()
+        print(f"{timers:,} timers over {spread_s:g} s: {scheduler.completed:,} completions in {elapsed:.2f} s, "
+              f"CPU {cpu:.2f} s  max lateness {scheduler.max_lateness_ns / 1e6:.2f} ms")
+
+    asyncio.run(run())
+
+API_PATHS = ('/api/timer', '/api/stats/daily', '/api/stats/weekly', '/api/sessions/recent?limit=10', '/api/streaks')
+
+async def api_clients(host: str, port: int, clients: int, seconds: float, conditional: bool) -> dict:
+    """Keep-alive clients cycling through API_PATHS; returns latencies and statuses per path"""
+    import asyncio
+    results = {path: {'latencies': [], 'statuses': {}} for path in API_PATHS}
+    deadline = time.perf_counter() + seconds
+
+    async def client(index: int):
+        reader, writer = await asyncio.open_connection(host, port)
+        etags = {}
+        while time.perf_counter() < deadline:
+            path = API_PATHS[index % len(API_PATHS)]
+            index += 1
+            request = f'GET {path} HTTP/1.1\r\nHost: {host}\r\n'
+            if conditional and path in etags:
+                request += f'If-None-Match: {etags[path]}\r\n'
+            started = time.perf_counter()
+            writer.write((request + '\r\n').encode('latin-1'))
+            status = int((await reader.readline()).split()[1])
+            headers = {}
+            while (line := await reader.readline()) != b'\r\n':
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            await reader.readexactly(int(headers.get('content-length', 0)))
+            results[path]['latencies'].append(time.perf_counter() - started)
+            results[path]['statuses'][status] = results[path]['statuses'].get(status, 0) + 1
+            if 'etag' in headers:
+                etags[path] = headers['etag']
+        writer.close()
+
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    return results
+
+def api_load_test(clients: int, seconds: float, size: int, conditional: bool):
+    """Poll the HTTP API, served by a separate process over `size` sessions"""
+    import asyncio
+    from sqlite_manager import SQLiteDataManager
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'api.db')
+        manager = SQLiteDataManager(database)
+        manager.import_sessions(generate_sessions(size))
+        manager.close()
+        config_path = os.path.join(directory, 'config.toml')
+        with open(config_path, 'w') as f:
+            f.write('[focus_timer.storage]\n'
+                    'engine = "sqlite"\n'
+                    f'database = {json.dumps(database)}\n'
+                    f'checkpoint_dir = {json.dumps(os.path.join(directory, "timers"))}\n')
+        server = subprocess.Popen(
+            [sys.executable, 'api.py', '--config', config_path, '--port', '0'],
+            stdout=subprocess.PIPE, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        try:
+            line = server.stdout.readline()
+            if not line.startswith('Serving on http://'):
+                raise RuntimeError("API server did not start")
+            host, port = line.strip().removeprefix('Serving on http://').rsplit(':', 1)
+            started = time.perf_counter()
+            results = asyncio.run(api_clients(host, int(port), clients, seconds, conditional))
+            elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait()
+
+    everything = []
+    print(f"{clients} clients for {seconds:g} s over {size:,} sessions"
+          f"{', revalidating with If-None-Match' if conditional else ''}:")
+    for path, result in list(results.items()) + [('all', None)]:
+        if result is None:
+            latencies = sorted(everything)
+            statuses = {}
+            for other in results.values():
+                for status, count in other['statuses'].items():
+                    statuses[status] = statuses.get(status, 0) + count
+        else:
+            latencies = sorted(result['latencies'])
+            statuses = result['statuses']
+            everything.extend(latencies)
+        if not latencies:
+            continue
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        counts = ' '.join(f'{status}x{count}' for status, count in sorted(statuses.items()))
+        print(f"  {path:<32} {len(latencies) / elapsed:9,.0f} req/s  p50 {p50:6.2f} ms  p99 {p99:6.2f} ms  {counts}")
+
+COLD_START_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from timer_manager import TimerManager
+from themes import get_theme_css
+timer = TimerManager()
+get_theme_css('Ocean Blue')
+timer.get_remaining_time()
+first_paint = time.perf_counter()
+if sys.argv[2] == 'paint':
+    print(json.dumps({'first_paint': first_paint - started}))
+    sys.exit()
+from config import load_config
+from data_manager import create_data_manager
+config = load_config()
+config['storage'] = json.loads(sys.argv[1])
+manager = create_data_manager(config)
+manager.get_daily_stats()
+manager.get_recent_sessions(10)
+ready = time.perf_counter()
+print(json.dumps({'first_paint': first_paint - started, 'ready': ready - started}))
+"""
+
+def cold_start_storage(directory: str, size: int) -> dict:
+    """Storage settings for a memory engine over a session log of `size` sessions"""
+    from config import DEFAULTS
+    from session_log import SessionLog
+    log_path = os.path.join(directory, f'{size}.jsonl')
+    SessionLog(log_path).compact(generate_sessions(size))
+    return dict(DEFAULTS['storage'], session_log=log_path)
+
+def run_cold_start(storage: dict, stage: str = 'ready', importtime: bool = False) -> subprocess.CompletedProcess:
+    """
+    Start a new process and stop at the first timer paint ('paint') or once
+    the history is loaded ('ready'); it prints its own timings as JSON
+    """
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + \
+        ['-c', COLD_START_SCRIPT, json.dumps(storage), stage]
+    return subprocess.run(command, capture_output=True, text=True, check=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+
+def cold_start(sizes: list, repeat: int, importtime: bool):
+    """
+    Print new-process times to the first timer paint and to a loaded history.
+    test_benchmarks.py tracks the same numbers in saved runs.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            storage = cold_start_storage(directory, size)
+            runs = []
+            for _ in range(repeat):
+                result = run_cold_start(storage, importtime=importtime)
+                runs.append(json.loads(result.stdout))
+            first_paint = min(run['first_paint'] for run in runs) * 1000
+            ready = min(run['ready'] for run in runs) * 1000
+            print(f"{'cold_start':<14} {size:>10,} sessions  first paint {first_paint:8.2f} ms  "
+                  f"history ready {ready:9.2f} ms")
+
+        if importtime:
+            # Slowest modules by cumulative import time, from the last run
+            imports = []
+            for line in result.stderr.splitlines():
+                if line.startswith('import time:') and not line.endswith('package'):
+                    _, cumulative, module = (field.strip() for field in line[12:].split('|'))
+                    imports.append((int(cumulative), module))
+            for cumulative, module in sorted(imports, reverse=True)[:10]:
+                print(f"  {cumulative / 1000:8.2f} ms  {module}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help='history sizes for the cold start; the API load test uses the first')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--themes', action='store_true', help='report theme CSS payloads')
+    parser.add_argument('--load-users', type=int, help='run the shared-store load test with N timers')
+    parser.add_argument('--pool-size', type=int, default=4)
+    parser.add_argument('--think-ms', type=float, default=200.0, help='mean pause between completions per timer')
+    parser.add_argument('--cold-start', action='store_true',
+                        help='time new processes to first paint and to a loaded history')
+    parser.add_argument('--importtime', action='store_true', help='cold start: list the slowest imports')
+    parser.add_argument('--scheduler-timers', type=int, help='run the asyncio scheduler test with N timers')
+    parser.add_argument('--spread', type=float, default=5.0, help='scheduler test: longest session in seconds')
+    parser.add_argument('--api-clients', type=int, help='run the HTTP API load test with N keep-alive clients')
+    parser.add_argument('--api-seconds', type=float, default=5.0, help='API load test: how long to poll')
+    parser.add_argument('--conditional', action='store_true',
+                        help='API load test: revalidate with If-None-Match, as polling dashboards would')
+    args = parser.parse_args()
+
+    if args.themes:
+        theme_report(args.repeat)
+    elif args.load_users:
+        load_test(args.load_users, args.repeat, args.pool_size, args.think_ms)
+    elif args.cold_start:
+        cold_start(args.sizes, min(args.repeat, 5), args.importtime)
+    elif args.scheduler_timers:
+        scheduler_test(args.scheduler_timers, args.spread)
+    elif args.api_clients:
+        api_load_test(args.api_clients, args.api_seconds, args.sizes[0], args.conditional)
+    else:
+        parser.error("pick a test; micro-benchmarks run with: pytest test_benchmarks.py")
+
+if __name__ == "__main__":
+    main()
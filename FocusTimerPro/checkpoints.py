@@ -0,0 +1,111 @@
+"""
+Checkpoints of timer state, so running sessions survive server restarts.
+A TimerManager snapshot is written on each state transition (start, pause,
+resume, stop, reset, completion), never on ticks, as one small JSON file
+per user replaced atomically. The checkpoint is the shared copy of a timer:
+processes and browser tabs holding the same user's timer call refresh()
+before acting on it, to pick up transitions saved by the others.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import quote
+
+from timer_manager import TimerManager
+
+class CheckpointStore:
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        # The file identity and contents of each checkpoint as last saved or loaded here
+        self._seen: Dict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+
+    def _path(self, key: str) -> str:
+        """Get the checkpoint file of a key, escaped to a safe file name"""
+        return os.path.join(self.directory, quote(key, safe='') + '.json')
+
+    def save(self, key: str, snapshot: Dict[str, Any]):
+        """Atomically replace the checkpoint of a key"""
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+            self._seen[key] = (_stamp(os.stat(path)), snapshot)
+        finally:
+            # Gone after a successful replace; left over only if writing failed
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the checkpoint of a key, or None if there is none"""
+        try:
+            with open(self._path(key)) as f:
+                snapshot = json.load(f)
+                self._seen[key] = (_stamp(os.fstat(f.fileno())), snapshot)
+                return snapshot
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key: str):
+        """Forget the checkpoint of a key"""
+        self._seen.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def timer(self, key: str, clock=time.monotonic_ns, wall_clock=time.time) -> TimerManager:
+        """Restore the checkpointed timer of a key, or make a new one, saving every transition"""
+        try:
+            snapshot = self.load(key)
+        except ValueError:
+            snapshot = None
+        timer = self._restore(key, snapshot, clock, wall_clock) if snapshot is not None else None
+        return timer or TimerManager(clock, on_transition=self._saver(key, wall_clock))
+
+    def refresh(self, key: str, timer: TimerManager, clock=time.monotonic_ns,
+                wall_clock=time.time) -> TimerManager:
+        """
+        Get `timer` itself, or the timer restored from the key's checkpoint if
+        another process or tab has saved a different one since this store last
+        saved or loaded it
+        """
+        try:
+            stamp = _stamp(os.stat(self._path(key)))
+        except FileNotFoundError:
+            return timer
+        seen = self._seen.get(key)
+        if seen is not None and seen[0] == stamp:
+            return timer
+        try:
+            snapshot = self.load(key)
+        except ValueError:
+            return timer
+        if snapshot is None or (seen is not None and snapshot == seen[1]):
+            return timer
+        return self._restore(key, snapshot, clock, wall_clock) or timer
+
+    def _saver(self, key: str, wall_clock):
+        """Get the on_transition callback checkpointing a key's timer"""
+        def save(timer: TimerManager):
+            self.save(key, timer.snapshot(wall_clock))
+        return save
+
+    def _restore(self, key: str, snapshot: Dict[str, Any], clock, wall_clock) -> Optional[TimerManager]:
+        """Rebuild a timer from a snapshot, or None if it cannot be"""
+        try:
+            return TimerManager.restore(snapshot, clock, wall_clock, on_transition=self._saver(key, wall_clock))
+        except (KeyError, TypeError, ValueError):
+            # An unreadable or incompatible checkpoint is not worth failing the page over
+            return None
+
+def _stamp(stat: os.stat_result) -> Tuple[int, int, int]:
+    """Identify one version of a checkpoint file; every save replaces the inode"""
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
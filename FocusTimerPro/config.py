@@ -0,0 +1,59 @@
+"""
+Application settings read from the [focus_timer.*] tables of config.toml.
+"""
+
+import os
+import tomllib
+from typing import Any, Dict
+
+CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(CONFIG_DIR, 'config.toml')
+
+DEFAULTS = {
+    'storage': {
+        'engine': 'memory',
+        'database': 'focus_sessions.db',
+        'user': 'default',
+        'pool_size': 4,
+        'session_log': 'focus_sessions.jsonl',
+        'fsync_every': 8,
+        'fsync_interval': 30.0,
+        'timezone': '',
+        'checkpoint_dir': ''
+    },
+    'retention': {
+        'policy': 'unlimited',
+        'max_sessions': 50000,
+        'max_age_days': 365,
+        'archive': 'focus_sessions.archive.jsonl'
+    },
+    'cache': {
+        'enabled': True,
+        'max_entries': 128
+    },
+    'api': {
+        'host': '127.0.0.1',
+        'port': 8765
+    },
+    'instrumentation': {
+        'enabled': False,
+        'metrics_file': 'focus_metrics.prom'
+    }
+}
+
+def load_config(path: str = CONFIG_PATH) -> Dict[str, Any]:
+    """Load application settings merged over the defaults"""
+    try:
+        with open(path, 'rb') as f:
+            overrides = tomllib.load(f).get('focus_timer', {})
+    except FileNotFoundError:
+        overrides = {}
+
+    return {
+        section: {**defaults, **overrides.get(section, {})}
+        for section, defaults in DEFAULTS.items()
+    }
+
+def resolve_path(path: str) -> str:
+    """Resolve a configured path relative to the config directory"""
+    return os.path.join(CONFIG_DIR, os.path.expanduser(path))
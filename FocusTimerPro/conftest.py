@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+
+import day_buckets
+import timer_manager
+from timer_manager import NS_PER_SECOND
+
+class FakeClock:
+    """
+    Manually advanced stand-ins for time.monotonic_ns (calling the clock)
+    and the wall clock (wall() and datetime.now() in timer_manager and
+    day_buckets), which can jump independently as NTP corrections and
+    restarts make them do.
+    """
+
+    def __init__(self, start_ns: int = 5 * NS_PER_SECOND, wall_start: float = 1_700_000_000.0):
+        self.now = start_ns
+        self.wall_now = wall_start
+
+    def __call__(self) -> int:
+        return self.now
+
+    def wall(self) -> float:
+        return self.wall_now
+
+    def advance(self, seconds: float):
+        """Let time pass on both clocks"""
+        self.now += round(seconds * NS_PER_SECOND)
+        self.wall_now += seconds
+
+    def jump_wall(self, seconds: float):
+        """Step only the wall clock, as an NTP correction or suspend does"""
+        self.wall_now += seconds
+
+    def restart(self, downtime: float):
+        """Let `downtime` pass in a new process, whose monotonic clock has a different origin"""
+        self.wall_now += downtime
+        self.now = 123 * NS_PER_SECOND
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromtimestamp(clock.wall_now, tz)
+
+    monkeypatch.setattr(timer_manager, 'datetime', FakeDatetime)
+    monkeypatch.setattr(day_buckets, 'datetime', FakeDatetime)
+    return clock
@@ -1,171 +1,662 @@
-import json
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
-
-class DataManager:
-    def __init__(self):
-        self.sessions = []
-        self.daily_goals = {
-            'focus_sessions': 8,
-            'focus_minutes': 200
-        }
-    
-    def log_session(self, session_data: Dict[str, Any]):
-        """Log a completed session"""
-        session_data['logged_at'] = datetime.now().isoformat()
-        self.sessions.append(session_data)
-        
-        if len(self.sessions) > 1000:
-            self.sessions = self.sessions[-1000:]
-    
-    def get_daily_stats(self, date: datetime = None) -> Dict[str, Any]:
-        """Get statistics for a specific date (default: today)"""
-        if date is None:
-            date = datetime.now()
-        
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
-        
-        daily_sessions = [
-            session for session in self.sessions
-            if start_of_day <= datetime.fromisoformat(session['start_time']) < end_of_day
-        ]
-        
-        focus_sessions = [s for s in daily_sessions if s['session_type'] == 'focus']
-        break_sessions = [s for s in daily_sessions if s['session_type'] in ['short_break', 'long_break']]
-        
-        total_focus_time = sum(s['duration'] for s in focus_sessions) // 60
-        total_break_time = sum(s['duration'] for s in break_sessions) // 60
-        
-        goal_sessions = self.daily_goals['focus_sessions']
-        goal_minutes = self.daily_goals['focus_minutes']
-        
-        session_score = min(100, (len(focus_sessions) / goal_sessions) * 100) if goal_sessions > 0 else 0
-        time_score = min(100, (total_focus_time / goal_minutes) * 100) if goal_minutes > 0 else 0
-        productivity_score = (session_score + time_score) / 2
-        
-        return {
-            'focus_sessions': len(focus_sessions),
-            'total_focus_time': total_focus_time,
-            'total_break_time': total_break_time,
-            'productivity_score': productivity_score,
-            'average_session_length': total_focus_time / len(focus_sessions) if focus_sessions else 0
-        }
-    
-    def get_weekly_stats(self) -> Dict[str, Any]:
-        """Get statistics for the current week"""
-        today = datetime.now()
-        start_of_week = today - timedelta(days=today.weekday())
-        
-        weekly_data = []
-        for i in range(7):
-            day = start_of_week + timedelta(days=i)
-            daily_stats = self.get_daily_stats(day)
-            daily_stats['date'] = day.strftime('%Y-%m-%d')
-            daily_stats['day_name'] = day.strftime('%A')
-            weekly_data.append(daily_stats)
-        
-        total_focus_sessions = sum(day['focus_sessions'] for day in weekly_data)
-        total_focus_time = sum(day['total_focus_time'] for day in weekly_data)
-        average_productivity = sum(day['productivity_score'] for day in weekly_data) / 7
-        
-        return {
-            'daily_breakdown': weekly_data,
-            'total_focus_sessions': total_focus_sessions,
-            'total_focus_time': total_focus_time,
-            'average_productivity': average_productivity,
-            'most_productive_day': max(weekly_data, key=lambda x: x['productivity_score'])['day_name']
-        }
-    
-    def get_recent_sessions(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get the most recent sessions"""
-        sorted_sessions = sorted(
-            self.sessions,
-            key=lambda x: x['start_time'],
-            reverse=True
-        )
-        return sorted_sessions[:limit]
-    
-    def get_session_history(self, days: int = 30) -> List[Dict[str, Any]]:
-        """Get session history for the last N days"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        return [
-            session for session in self.sessions
-            if datetime.fromisoformat(session['start_time']) >= cutoff_date
-        ]
-    
-    def export_data(self) -> Dict[str, Any]:
-        """Export all data for backup/analysis"""
-        return {
-            'sessions': self.sessions,
-            'daily_goals': self.daily_goals,
-            'export_timestamp': datetime.now().isoformat(),
-            'total_sessions': len(self.sessions),
-            'date_range': {
-                'first_session': min(s['start_time'] for s in self.sessions) if self.sessions else None,
-                'last_session': max(s['start_time'] for s in self.sessions) if self.sessions else None
-            }
-        }
-    
-    def import_data(self, data: Dict[str, Any]):
-        """Import data from backup"""
-        if 'sessions' in data:
-            self.sessions.extend(data['sessions'])
-            seen = set()
-            unique_sessions = []
-            for session in self.sessions:
-                identifier = (session['start_time'], session['session_type'])
-                if identifier not in seen:
-                    seen.add(identifier)
-                    unique_sessions.append(session)
-            self.sessions = unique_sessions
-        
-        if 'daily_goals' in data:
-            self.daily_goals.update(data['daily_goals'])
-    
-    def set_daily_goals(self, focus_sessions: int = None, focus_minutes: int = None):
-        """Set daily productivity goals"""
-        if focus_sessions is not None:
-            self.daily_goals['focus_sessions'] = focus_sessions
-        if focus_minutes is not None:
-            self.daily_goals['focus_minutes'] = focus_minutes
-    
-    def get_streak_data(self) -> Dict[str, int]:
-        """Calculate current and longest streaks"""
-        if not self.sessions:
-            return {'current_streak': 0, 'longest_streak': 0}
-        
-        session_dates = set()
-        for session in self.sessions:
-            if session['session_type'] == 'focus':
-                date = datetime.fromisoformat(session['start_time']).date()
-                session_dates.add(date)
-        
-        if not session_dates:
-            return {'current_streak': 0, 'longest_streak': 0}
-        
-        sorted_dates = sorted(session_dates)
-        
-        current_streak = 0
-        today = datetime.now().date()
-        check_date = today
-        
-        while check_date in session_dates:
-            current_streak += 1
-            check_date -= timedelta(days=1)
-        
-        longest_streak = 1
-        current_run = 1
-        
-        for i in range(1, len(sorted_dates)):
-            if sorted_dates[i] - sorted_dates[i-1] == timedelta(days=1):
-                current_run += 1
-                longest_streak = max(longest_streak, current_run)
-            else:
-                current_run = 1
-        
-        return {
-            'current_streak': current_streak,
-            'longest_streak': longest_streak
-        }
+import math
+import os
+import threading
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Tuple
+from urllib.parse import quote
+
+from config import load_config, resolve_path
+from session_log import SessionLog
+from session_store import SessionStore, SessionRecord, FOCUS, SHORT_BREAK, LONG_BREAK, to_epoch
+from retention import RetentionPolicy, SessionArchive
+from day_buckets import DayBuckets
+
+def _day_number(key: float) -> int:
+    """Get the day bucket (days since epoch) for naive epoch seconds"""
+    return int(key // 86400)
+
+EMPTY_BUCKET = {
+    'sessions': 0,
+    'focus_sessions': 0,
+    'focus_seconds': 0,
+    'break_seconds': 0
+}
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most `size` items"""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def rollup_deltas(rows: Iterable[Tuple[float, int, int]],
+                  day_of: Callable[[float], int] = _day_number) -> Dict[int, Dict[str, int]]:
+    """Sum (start, kind, duration) rows into per-day bucket increments"""
+    deltas = {}
+    for start, kind, duration in rows:
+        day = day_of(start)
+        delta = deltas.get(day)
+        if delta is None:
+            delta = deltas[day] = dict(EMPTY_BUCKET)
+        delta['sessions'] += 1
+        if kind == FOCUS:
+            delta['focus_sessions'] += 1
+            delta['focus_seconds'] += duration
+        elif kind == SHORT_BREAK or kind == LONG_BREAK:
+            delta['break_seconds'] += duration
+    return deltas
+
+def validate_session(session: Dict[str, Any]):
+    """Raise ValueError unless a session dict can be stored"""
+    if not isinstance(session, dict):
+        raise ValueError(f"expected an object, got {session!r}")
+    missing = [key for key in ('session_type', 'duration', 'start_time') if key not in session]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    if not isinstance(session['session_type'], str):
+        raise ValueError(f"session_type must be a string, got {session['session_type']!r}")
+    duration = session['duration']
+    if isinstance(duration, bool) or not isinstance(duration, int) or duration < 0:
+        raise ValueError(f"duration must be whole seconds, got {duration!r}")
+    for key in ('start_time', 'end_time', 'logged_at'):
+        value = session.get(key)
+        if value is None and key != 'start_time':
+            continue
+        if isinstance(value, str):
+            datetime.fromisoformat(value)
+        elif not isinstance(value, datetime):
+            raise ValueError(f"{key} must be an ISO timestamp or datetime, got {value!r}")
+
+def validate_sessions(sessions: List[Dict[str, Any]], action: str, first_index: int = 0):
+    """Validate a batch of sessions, raising ValueError that names the first bad one"""
+    for index, session_data in enumerate(sessions, first_index):
+        try:
+            validate_session(session_data)
+        except ValueError as error:
+            raise ValueError(f"Session {index} cannot be {action}: {error}") from error
+
+def summarize_day(bucket: Dict[str, int], daily_goals: Dict[str, int]) -> Dict[str, Any]:
+    """Turn a day's aggregates into the statistics shown on the dashboard"""
+    focus_sessions = bucket['focus_sessions']
+    total_focus_time = bucket['focus_seconds'] // 60
+    total_break_time = bucket['break_seconds'] // 60
+    
+    goal_sessions = daily_goals['focus_sessions']
+    goal_minutes = daily_goals['focus_minutes']
+    
+    session_score = min(100, (focus_sessions / goal_sessions) * 100) if goal_sessions > 0 else 0
+    time_score = min(100, (total_focus_time / goal_minutes) * 100) if goal_minutes > 0 else 0
+    productivity_score = (session_score + time_score) / 2
+    
+    return {
+        'focus_sessions': focus_sessions,
+        'total_focus_time': total_focus_time,
+        'total_break_time': total_break_time,
+        'productivity_score': productivity_score,
+        'average_session_length': total_focus_time / focus_sessions if focus_sessions else 0
+    }
+
+def summarize_week(weekly_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine seven daily summaries into weekly statistics"""
+    total_focus_sessions = sum(day['focus_sessions'] for day in weekly_data)
+    total_focus_time = sum(day['total_focus_time'] for day in weekly_data)
+    average_productivity = sum(day['productivity_score'] for day in weekly_data) / 7
+    
+    return {
+        'daily_breakdown': weekly_data,
+        'total_focus_sessions': total_focus_sessions,
+        'total_focus_time': total_focus_time,
+        'average_productivity': average_productivity,
+        'most_productive_day': max(weekly_data, key=lambda x: x['productivity_score'])['day_name']
+    }
+
+def compute_streaks(sorted_days: List[int], today: int) -> Dict[str, int]:
+    """Calculate streaks from sorted, distinct active day numbers"""
+    if not sorted_days:
+        return {'current_streak': 0, 'longest_streak': 0}
+    
+    active_days = set(sorted_days)
+    current_streak = 0
+    check_date = today
+    
+    while check_date in active_days:
+        current_streak += 1
+        check_date -= 1
+    
+    longest_streak = 1
+    current_run = 1
+    
+    for i in range(1, len(sorted_days)):
+        if sorted_days[i] - sorted_days[i-1] == 1:
+            current_run += 1
+            longest_streak = max(longest_streak, current_run)
+        else:
+            current_run = 1
+    
+    return {
+        'current_streak': current_streak,
+        'longest_streak': longest_streak
+    }
+
+class StreakState:
+    """Trailing and longest runs of active days, kept as days become active"""
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        """Forget every active day"""
+        self.last_active = None
+        self.current_run = 0
+        self.longest_run = 0
+        self.stale = False
+    
+    def add_day(self, day: int):
+        """Record a day's first focus session"""
+        if self.stale:
+            return
+        if self.last_active is None or day > self.last_active + 1:
+            self.current_run = 1
+        elif day == self.last_active + 1:
+            self.current_run += 1
+        else:
+            # An earlier day can extend or bridge old runs; rebuild on next read
+            self.stale = True
+            return
+        self.last_active = day
+        self.longest_run = max(self.longest_run, self.current_run)
+    
+    def rebuild(self, sorted_days: Iterable[int]):
+        """Replay sorted, distinct active days"""
+        self.reset()
+        for day in sorted_days:
+            self.add_day(day)
+    
+    def streaks(self, today: int) -> Dict[str, int]:
+        """Get streaks as compute_streaks would for the same days"""
+        return {
+            'current_streak': self.current_run if self.last_active == today else 0,
+            'longest_streak': self.longest_run
+        }
+
+class DataManager:
+    def __init__(self, log: SessionLog = None, retention: RetentionPolicy = None,
+                 archive: SessionArchive = None, timezone: str = None):
+        self.sessions = SessionStore()
+        self._daily = {}
+        self._streak = StreakState()
+        self.daily_goals = {
+            'focus_sessions': 8,
+            'focus_minutes': 200
+        }
+        self.log = log
+        self.retention = retention
+        self.archive = archive
+        # Bumped by every write so cached query results can be invalidated
+        self.version = 0
+        self.days = DayBuckets(timezone)
+        # Whether the user picked a time zone, which outlives the configured default
+        self._timezone_chosen = False
+        if log is not None:
+            self._load_log()
+        elif archive is not None:
+            self._rebuild_rollups()
+        self._enforce_retention(force=True)
+    
+    def _load_log(self):
+        """Stream the persisted history into memory"""
+        horizon = self.archive.horizon if self.archive is not None else None
+        encoded = []
+        for record in self.log.load():
+            if 'daily_goals' in record:
+                self.daily_goals.update(record['daily_goals'])
+            elif 'timezone' in record:
+                self.days = DayBuckets(record['timezone'])
+                self._timezone_chosen = True
+            else:
+                session = self.sessions.encode(record)
+                # Rows at or before the horizon were spilled to the archive
+                if horizon is None or session[0] > horizon:
+                    encoded.append(session)
+        self.sessions.merge(encoded)
+        self._rebuild_rollups()
+        self._maybe_compact_log()
+    
+    def _enforce_retention(self, force: bool = False):
+        """Spill the oldest rows to the archive once the policy calls for it"""
+        if self.retention is None or self.archive is None:
+            return
+        store = self.sessions
+        count = self.retention.evict_count(store, to_epoch(datetime.now()), force)
+        if not count:
+            return
+        
+        # Evict whole runs of equal start times so the horizon splits cleanly
+        horizon = store.start[count - 1]
+        count = bisect_right(store.start, horizon)
+        rows = range(count)
+        self.archive.spill(
+            (store.record(row) for row in rows),
+            rollup_deltas(
+                ((store.start[row], store.kind[row], store.duration[row]) for row in rows), self.days.day_of
+            ),
+            horizon
+        )
+        store.evict_head(count)
+        self.version += 1
+        if self.log is not None:
+            self._maybe_compact_log()
+    
+    def _maybe_compact_log(self):
+        """Compact the log once superseded records outnumber live ones"""
+        if self.log.records > 2 * len(self.sessions) + 64:
+            self._compact_log()
+    
+    def _compact_log(self):
+        """Rewrite the log with only the live sessions and current settings"""
+        settings = [{'daily_goals': self.daily_goals}]
+        if self._timezone_chosen:
+            settings.append({'timezone': self.days.timezone})
+        self.log.compact(list(self.sessions) + settings)
+    
+    def log_session(self, session_data: Dict[str, Any]):
+        """Log a completed session, unless one with the same start and type is stored"""
+        validate_session(session_data)
+        session_data['logged_at'] = datetime.now().isoformat()
+        encoded = self.sessions.encode(session_data)
+        if self.archive and encoded[0] <= self.archive.horizon:
+            # Rows this old are dropped from the log on load, so they belong in the archive
+            if self._archive_old([encoded]):
+                self.version += 1
+            return
+        if self.sessions.contains(encoded[0], encoded[3]):
+            return
+        self.sessions.insert(encoded)
+        self._update_rollup(encoded[0], encoded[3], encoded[4])
+        self.version += 1
+        
+        if self.log is not None:
+            self.log.append(self.sessions.decode(encoded))
+        self._enforce_retention()
+    
+    def log_sessions(self, sessions: Iterable[Dict[str, Any]]) -> int:
+        """
+        Log many completed sessions at once, e.g. from an offline client.
+        Every session is validated before any is stamped or stored; the batch
+        is merged into the columns once, written to the log in one write and
+        fsync, and folded into the rollups one day at a time. Sessions whose
+        start and type are already stored are skipped, as in the SQLite
+        engine. Returns how many were logged.
+        """
+        sessions = list(sessions)
+        validate_sessions(sessions, 'logged')
+        
+        logged_at = datetime.now().isoformat()
+        encoded = []
+        for session_data in sessions:
+            session_data['logged_at'] = logged_at
+            encoded.append(self.sessions.encode(session_data))
+        
+        archived = 0
+        if self.archive:
+            archived = self._archive_old([session for session in encoded if session[0] <= self.archive.horizon])
+            encoded = [session for session in encoded if session[0] > self.archive.horizon]
+        
+        rows = self.sessions.merge(encoded)
+        self._update_rollups(rows)
+        self.version += 1
+        if self.log is not None:
+            self.log.append_many(self.sessions.record(row) for row in rows)
+            self._maybe_compact_log()
+        self._enforce_retention()
+        return archived + len(rows)
+    
+    def _update_rollups(self, rows: Iterable[int]):
+        """Fold stored rows into the rollups with one bucket update per day"""
+        store = self.sessions
+        self._apply_deltas(rollup_deltas(
+            ((store.start[row], store.kind[row], store.duration[row]) for row in rows), self.days.day_of
+        ))
+    
+    def _apply_deltas(self, deltas: Dict[int, Dict[str, int]]):
+        """Add per-day bucket increments to the rollups"""
+        # Ascending days keep the streak state incremental for in-order batches
+        for day in sorted(deltas):
+            bucket = self._daily.get(day)
+            if bucket is None:
+                bucket = self._daily[day] = dict(EMPTY_BUCKET)
+            if deltas[day]['focus_sessions'] and not bucket['focus_sessions']:
+                self._streak.add_day(day)
+            for field, value in deltas[day].items():
+                bucket[field] += value
+    
+    def _update_rollup(self, start: float, kind: int, duration: int):
+        """Add a session to its day bucket"""
+        day = self.days.day_of(start)
+        bucket = self._daily.get(day)
+        if bucket is None:
+            bucket = self._daily[day] = dict(EMPTY_BUCKET)
+        
+        bucket['sessions'] += 1
+        if kind == FOCUS:
+            if not bucket['focus_sessions']:
+                self._streak.add_day(day)
+            bucket['focus_sessions'] += 1
+            bucket['focus_seconds'] += duration
+        elif kind == SHORT_BREAK or kind == LONG_BREAK:
+            bucket['break_seconds'] += duration
+    
+    def _rebuild_rollups(self):
+        """Rebuild the daily rollups from the archive totals and the session columns"""
+        self._daily = {}
+        self._streak.reset()
+        if self.archive is not None and self.archive.timezone != self.days.timezone:
+            self._rebucket_archive()
+        if self.archive:
+            self._daily = {day: dict(bucket) for day, bucket in self.archive.days.items()}
+            self._streak.stale = True
+        store = self.sessions
+        for start, kind, duration in zip(store.start, store.kind, store.duration):
+            self._update_rollup(start, kind, duration)
+    
+    def _rebucket_archive(self):
+        """Recompute the archived per-day totals for the current time zone"""
+        code = self.sessions.type_code
+        rows = (
+            (to_epoch(record['start_time']), code(record['session_type']), record['duration'])
+            for record in self.archive.iter_records()
+        )
+        self.archive.rebucket(rollup_deltas(rows, self.days.day_of), self.days.timezone)
+    
+    def _sessions_between(self, start: datetime, end: datetime = None) -> List[Dict[str, Any]]:
+        """Get sessions starting in [start, end) ordered by start time"""
+        lo = self.sessions.bisect(to_epoch(start))
+        hi = len(self.sessions) if end is None else self.sessions.bisect(to_epoch(end))
+        return self.sessions.records(lo, hi)
+    
+    def get_daily_stats(self, date: datetime = None) -> Dict[str, Any]:
+        """Get statistics for a specific date (default: today)"""
+        day = self.days.today() if date is None else self.days.day_number(date)
+        bucket = self._daily.get(day, EMPTY_BUCKET)
+        return summarize_day(bucket, self.daily_goals)
+    
+    def get_weekly_stats(self) -> Dict[str, Any]:
+        """Get statistics for the current week"""
+        today = self.days.now()
+        start_of_week = today - timedelta(days=today.weekday())
+        
+        weekly_data = []
+        for i in range(7):
+            day = start_of_week + timedelta(days=i)
+            daily_stats = self.get_daily_stats(day)
+            daily_stats['date'] = day.strftime('%Y-%m-%d')
+            daily_stats['day_name'] = day.strftime('%A')
+            weekly_data.append(daily_stats)
+        
+        return summarize_week(weekly_data)
+    
+    def get_monthly_stats(self, year: int = None, month: int = None) -> Dict[str, Any]:
+        """Get statistics for every day of a month (default: this month)"""
+        from analytics import month_range
+        today = self.days.now()
+        return self._range_stats(*month_range(year or today.year, month or today.month))
+    
+    def get_yearly_stats(self, year: int = None) -> Dict[str, Any]:
+        """Get statistics for every day of a year (default: this year)"""
+        from analytics import year_range
+        return self._range_stats(*year_range(year or self.days.now().year))
+    
+    def _range_stats(self, first_day: int, last_day: int) -> Dict[str, Any]:
+        """Statistics for [first_day, last_day], from rollups where rows were archived"""
+        from analytics import arrays_from_buckets, range_stats, summarize_range
+        if self.archive and self.archive.days and first_day <= max(self.archive.days):
+            return summarize_range(first_day, arrays_from_buckets(first_day, last_day, self._daily), self.daily_goals)
+        boundaries = self.days.boundaries(first_day, last_day) if self.days.zone is not None else None
+        return range_stats(self.sessions, first_day, last_day, self.daily_goals, boundaries)
+    
+    def get_recent_sessions(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the most recent sessions"""
+        newest = len(self.sessions) - 1
+        return [self.sessions.record(row) for row in range(newest, max(newest - limit, -1), -1)]
+    
+    def get_recent_records(self, limit: int = 10) -> List[SessionRecord]:
+        """Get the most recent sessions with parsed timestamps, for display"""
+        newest = len(self.sessions) - 1
+        return [self.sessions.row(row) for row in range(newest, max(newest - limit, -1), -1)]
+    
+    def get_session_history(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Get session history for the last N days"""
+        cutoff_date = datetime.now() - timedelta(days=days)
+        
+        return self._sessions_between(cutoff_date)
+    
+    def export_data(self) -> Dict[str, Any]:
+        """Export all data for backup/analysis"""
+        sessions = list(self.iter_sessions())
+        return {
+            'sessions': sessions,
+            'daily_goals': self.daily_goals,
+            'export_timestamp': datetime.now().isoformat(),
+            'total_sessions': len(sessions),
+            'date_range': {
+                'first_session': sessions[0]['start_time'] if sessions else None,
+                'last_session': sessions[-1]['start_time'] if sessions else None
+            }
+        }
+    
+    def iter_sessions(self, start: datetime = None, end: datetime = None) -> Iterator[Dict[str, Any]]:
+        """Iterate sessions starting in [start, end) in start order, archived ones first"""
+        if self.archive:
+            yield from self.archive.iter_records(
+                -math.inf if start is None else to_epoch(start),
+                math.inf if end is None else to_epoch(end)
+            )
+        lo = 0 if start is None else self.sessions.bisect(to_epoch(start))
+        hi = len(self.sessions) if end is None else self.sessions.bisect(to_epoch(end))
+        for row in range(lo, hi):
+            yield self.sessions.record(row)
+    
+    def import_data(self, data: Dict[str, Any]):
+        """Import data from backup"""
+        if 'sessions' in data:
+            self.import_sessions(data['sessions'])
+        
+        if 'daily_goals' in data:
+            self.daily_goals.update(data['daily_goals'])
+            self.version += 1
+            if self.log is not None:
+                self.log.append({'daily_goals': data['daily_goals']})
+                self._maybe_compact_log()
+    
+    def import_sessions(self, sessions: Iterable[Dict[str, Any]], batch_size: int = 5000,
+                        progress: Callable[[int, int], None] = None) -> int:
+        """
+        Import sessions batch by batch, skipping ones already stored. Each
+        batch is validated before any of it is stored; a bad session raises
+        ValueError, leaving earlier batches imported.
+        """
+        read = imported = 0
+        for batch in batched(sessions, batch_size):
+            validate_sessions(batch, 'imported', read)
+            encoded = [self.sessions.encode(session) for session in batch]
+            if self.archive:
+                imported += self._archive_old(
+                    [session for session in encoded if session[0] <= self.archive.horizon]
+                )
+                encoded = [session for session in encoded if session[0] > self.archive.horizon]
+            
+            added_rows = self.sessions.merge(encoded)
+            self._update_rollups(added_rows)
+            if self.log is not None:
+                self.log.append_many(self.sessions.record(row) for row in added_rows)
+            
+            read += len(batch)
+            imported += len(added_rows)
+            self.version += 1
+            if progress is not None:
+                progress(read, imported)
+        self._enforce_retention()
+        return imported
+    
+    def _archive_old(self, encoded: List[Tuple]) -> int:
+        """
+        Send sessions at or before the horizon straight to the archive,
+        skipping ones already archived; returns how many were added
+        """
+        if not encoded:
+            return 0
+        keys = self.archive.keys()
+        records = {}
+        for session in encoded:
+            record = self.sessions.decode(session)
+            key = (session[0], record['session_type'])
+            if key not in keys and key not in records:
+                records[key] = (session, record)
+        if not records:
+            return 0
+        
+        deltas = rollup_deltas(
+            ((session[0], session[3], session[4]) for session, _ in records.values()), self.days.day_of
+        )
+        self.archive.add_old((record for _, record in records.values()), deltas)
+        self._apply_deltas(deltas)
+        return len(records)
+    
+    def set_daily_goals(self, focus_sessions: int = None, focus_minutes: int = None):
+        """Set daily productivity goals"""
+        if focus_sessions is not None:
+            self.daily_goals['focus_sessions'] = focus_sessions
+        if focus_minutes is not None:
+            self.daily_goals['focus_minutes'] = focus_minutes
+        self.version += 1
+        
+        if self.log is not None:
+            self.log.append({'daily_goals': dict(self.daily_goals)})
+            self._maybe_compact_log()
+    
+    def set_timezone(self, timezone: str = None):
+        """Set the IANA time zone days are counted in; None uses the server's"""
+        self.days = DayBuckets(timezone)
+        self._timezone_chosen = True
+        self._rebuild_rollups()
+        self.version += 1
+        
+        if self.log is not None:
+            self.log.append({'timezone': self.days.timezone})
+            self._maybe_compact_log()
+    
+    def get_streak_data(self) -> Dict[str, int]:
+        """Calculate current and longest streaks"""
+        if not self._daily:
+            return {'current_streak': 0, 'longest_streak': 0}
+        
+        today = self.days.today()
+        if self._streak.stale:
+            self._streak.rebuild(self._active_days())
+        if self._streak.last_active is not None and self._streak.last_active > today:
+            # Sessions dated after today: the current run has to end at today
+            return compute_streaks(self._active_days(), today)
+        return self._streak.streaks(today)
+    
+    def _active_days(self) -> List[int]:
+        """Get the sorted day numbers with at least one focus session"""
+        return sorted(day for day, bucket in self._daily.items() if bucket['focus_sessions'])
+
+class LockedDataManager:
+    """
+    Proxy serializing calls to a DataManager shared by every browser session
+    of the process. Iterators it returns take the lock for each item, so a
+    slow export never blocks other sessions for long.
+    """
+    
+    def __init__(self, manager: DataManager):
+        self._manager = manager
+        self._lock = threading.RLock()
+    
+    def __getattr__(self, name: str):
+        attribute = getattr(self._manager, name)
+        if name.startswith('_') or not callable(attribute):
+            return attribute
+        
+        def locked_call(*args, **kwargs):
+            with self._lock:
+                result = attribute(*args, **kwargs)
+            if isinstance(result, Iterator):
+                return self._locked_iter(result)
+            return result
+        
+        return locked_call
+    
+    def _locked_iter(self, iterator: Iterator[Any]) -> Iterator[Any]:
+        """Advance an iterator over the shared manager one locked step at a time"""
+        while True:
+            with self._lock:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+_shared_managers: Dict[str, LockedDataManager] = {}
+_shared_managers_lock = threading.Lock()
+
+def get_shared_manager(path: str, build: Callable[[], DataManager]) -> LockedDataManager:
+    """
+    Get the process-wide manager persisted at `path`, building it on first
+    use. Every writer of a session log must go through one manager, since
+    compaction rewrites the file from that manager's sessions alone.
+    """
+    manager = _shared_managers.get(path)
+    if manager is None:
+        with _shared_managers_lock:
+            manager = _shared_managers.get(path)
+            if manager is None:
+                manager = _shared_managers[path] = LockedDataManager(build())
+    return manager
+
+def user_path(path: str, user: str, default_user: str) -> str:
+    """
+    Get a user's copy of a configured file: the file itself for the default
+    user, else a sibling named after the escaped user, e.g. sessions@alice.jsonl
+    """
+    if user == default_user:
+        return path
+    root, extension = os.path.splitext(path)
+    return f'{root}@{quote(user, safe="")}{extension}'
+
+def create_data_manager(config: Dict[str, Any] = None, user: str = None):
+    """
+    Build the storage engine selected in [focus_timer.storage] for a user,
+    the configured default one if None. Each user has their own history:
+    the memory engine keeps it in per-user log and archive files, shared by
+    every browser session of that user; the sqlite engine in its database.
+    """
+    config = config or load_config()
+    storage = config['storage']
+    user = user or storage['user']
+    
+    if storage['engine'] == 'sqlite':
+        from shared_store import get_shared_store
+        store = get_shared_store(resolve_path(storage['database']), storage['pool_size'])
+        return store.for_user(user, storage['timezone'])
+    
+    log_path = archive_path = None
+    if storage['session_log']:
+        log_path = user_path(resolve_path(storage['session_log']), user, storage['user'])
+    retention_settings = config['retention']
+    retention = RetentionPolicy.from_config(retention_settings)
+    if retention is not None:
+        archive_path = user_path(resolve_path(retention_settings['archive']), user, storage['user'])
+    if log_path is None and archive_path is None:
+        # Nothing on disk to keep consistent, so each browser session gets its own
+        return DataManager(timezone=storage['timezone'])
+    
+    def build() -> DataManager:
+        log = None
+        if log_path is not None:
+            log = SessionLog(log_path, fsync_every=storage['fsync_every'], fsync_interval=storage['fsync_interval'])
+        archive = SessionArchive(archive_path) if archive_path is not None else None
+        return DataManager(log, retention, archive, storage['timezone'])
+    
+    return get_shared_manager(log_path or archive_path, build)
@@ -0,0 +1,110 @@
+"""
+Day bucketing in a user's time zone.
+Session starts are stored as naive server-local epochs. DayBuckets
+precomputes the epochs of the user's local midnights over a span of days,
+so a session is assigned to its day with one bisect instead of a time zone
+conversion per row. Without a time zone, days follow the server's clock and
+a day number is plain integer division.
+"""
+
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime, time
+from typing import List
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from session_store import to_epoch
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Midnights are precomputed this far past the days asked for, so a growing
+# history rarely has to extend the table
+MARGIN_DAYS = 366
+
+def get_zone(name: str = None):
+    """Resolve an IANA time zone name; None or '' means the server's local time"""
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as error:
+        raise ValueError(f"Unknown time zone: {name}") from error
+
+class DayBuckets:
+    """
+    Maps naive server-local epochs to day numbers (days since 1970-01-01)
+    of the calendar in `timezone`. DST changes make some local days 23 or
+    25 hours long; zoneinfo resolves each midnight, so bucketing follows them.
+    """
+
+    def __init__(self, timezone: str = None):
+        self.zone = get_zone(timezone)
+        self.timezone = timezone or None
+        self._first_day = 0
+        self._midnights = array('d')
+
+    def day_of(self, epoch: float) -> int:
+        """Get the day number a session starting at `epoch` belongs to"""
+        if self.zone is None:
+            return int(epoch // 86400)
+        midnights = self._midnights
+        index = bisect_right(midnights, epoch) - 1
+        if index < 0 or index >= len(midnights) - 1:
+            # Local midnights are within a day of UTC ones, so two days either side cover it
+            guess = int(epoch // 86400)
+            self._cover(guess - 2, guess + 2)
+            index = bisect_right(self._midnights, epoch) - 1
+        return self._first_day + index
+
+    def midnight(self, day: int) -> float:
+        """Get the epoch at which a day number starts"""
+        if self.zone is None:
+            return day * 86400.0
+        self._cover(day, day)
+        return self._midnights[day - self._first_day]
+
+    def boundaries(self, first_day: int, last_day: int) -> List[float]:
+        """Get the epochs starting each day in [first_day, last_day], then the end of last_day"""
+        if self.zone is None:
+            return [day * 86400.0 for day in range(first_day, last_day + 2)]
+        self._cover(first_day, last_day + 1)
+        lo = first_day - self._first_day
+        return self._midnights[lo:lo + last_day - first_day + 2].tolist()
+
+    def day_number(self, value: date) -> int:
+        """Get the day number of a calendar date, or of a datetime's date"""
+        if isinstance(value, datetime):
+            value = value.date()
+        return value.toordinal() - EPOCH_ORDINAL
+
+    def now(self) -> datetime:
+        """Get the current wall-clock time in the time zone, as a naive datetime"""
+        if self.zone is None:
+            return datetime.now()
+        return datetime.now(self.zone).replace(tzinfo=None)
+
+    def today(self) -> int:
+        """Get today's day number in the time zone"""
+        return self.day_number(self.now())
+
+    def local_time(self, value: datetime) -> datetime:
+        """Convert a naive server-local datetime to the time zone's naive wall-clock time"""
+        if self.zone is None:
+            return value
+        return value.astimezone(self.zone).replace(tzinfo=None)
+
+    def _cover(self, first_day: int, last_day: int):
+        """Precompute midnights for at least [first_day, last_day + 1]"""
+        have_last = self._first_day + len(self._midnights) - 2
+        if self._midnights:
+            if self._first_day <= first_day and last_day <= have_last:
+                return
+            first_day = min(first_day, self._first_day)
+            last_day = max(last_day, have_last)
+        first_day -= MARGIN_DAYS
+        last_day += MARGIN_DAYS
+        self._midnights = array('d', (
+            to_epoch(datetime.combine(date.fromordinal(day + EPOCH_ORDINAL), time(), self.zone))
+            for day in range(first_day, last_day + 2)
+        ))
+        self._first_day = first_day
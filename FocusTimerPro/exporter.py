@@ -0,0 +1,152 @@
+"""
+Streaming export of session data.
+Sessions are written as they are read from the data manager, so an export
+never holds the whole history in memory, optionally compressed on the fly.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterator
+
+FORMATS = {
+    'json': ('application/json', 'json'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'csv': ('text/csv', 'csv')
+}
+
+COMPRESSIONS = {
+    None: (None, ''),
+    'gzip': ('application/gzip', '.gz'),
+    'zstd': ('application/zstd', '.zst')
+}
+
+CSV_FIELDS = ('session_type', 'duration', 'start_time', 'end_time', 'completed', 'logged_at')
+
+CHUNK_SIZE = 1 << 16
+
+@lru_cache(maxsize=None)
+def zstd_available() -> bool:
+    """Whether the optional zstandard package is installed"""
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _json_lines(manager, sessions: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """Sessions one per line, then the goals, in the session log format"""
+    for session in sessions:
+        yield json.dumps(session, separators=(',', ':')) + '\n'
+    yield json.dumps({'daily_goals': manager.daily_goals}, separators=(',', ':')) + '\n'
+
+def _csv_rows(sessions: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """Sessions as CSV rows under a header"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for session in sessions:
+        writer.writerow(session)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def _json_document(manager, sessions: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """
+    The export_data document with one session per line. The summary fields
+    follow the sessions so the count and date range come from the same pass.
+    """
+    total = 0
+    first_session = last_session = None
+    yield '{\n  "sessions": ['
+    for session in sessions:
+        if total == 0:
+            first_session = session['start_time']
+            yield '\n    '
+        else:
+            yield ',\n    '
+        last_session = session['start_time']
+        total += 1
+        yield json.dumps(session)
+    yield '\n  ],\n'
+
+    summary = {
+        'daily_goals': manager.daily_goals,
+        'export_timestamp': datetime.now().isoformat(),
+        'total_sessions': total,
+        'date_range': {
+            'first_session': first_session,
+            'last_session': last_session
+        }
+    }
+    yield json.dumps(summary, indent=2)[2:]
+
+def _chunked(pieces: Iterator[str]) -> Iterator[bytes]:
+    """Join small text pieces into encoded chunks of about CHUNK_SIZE"""
+    parts, size = [], 0
+    for piece in pieces:
+        parts.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            yield ''.join(parts).encode('utf-8')
+            parts, size = [], 0
+    if parts:
+        yield ''.join(parts).encode('utf-8')
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Gzip-compress a byte stream"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def _zstd(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Zstandard-compress a byte stream"""
+    import zstandard
+    compressor = zstandard.ZstdCompressor().compressobj()
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def iter_export(manager, fmt: str = 'json', compression: str = None,
+                start: datetime = None, end: datetime = None) -> Iterator[bytes]:
+    """
+    Stream an export of sessions starting in [start, end) as byte chunks.
+    fmt is 'json', 'jsonl' or 'csv'; compression is None, 'gzip' or 'zstd'.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown export compression: {compression}")
+    if compression == 'zstd' and not zstd_available():
+        raise ValueError("zstd export needs the zstandard package")
+
+    sessions = manager.iter_sessions(start, end)
+    if fmt == 'json':
+        pieces = _json_document(manager, sessions)
+    elif fmt == 'jsonl':
+        pieces = _json_lines(manager, sessions)
+    else:
+        pieces = _csv_rows(sessions)
+
+    chunks = _chunked(pieces)
+    if compression == 'gzip':
+        chunks = _gzip(chunks)
+    elif compression == 'zstd':
+        chunks = _zstd(chunks)
+    return chunks
+
+def export_file_info(fmt: str = 'json', compression: str = None) -> Dict[str, str]:
+    """MIME type and file extension for an export format"""
+    mime, extension = FORMATS[fmt]
+    compressed_mime, suffix = COMPRESSIONS[compression]
+    return {'mime': compressed_mime or mime, 'extension': extension + suffix}
@@ -0,0 +1,167 @@
+"""
+Streaming import of exported session data.
+Reads either a JSON export ({"sessions": [...], "daily_goals": {...}}) or
+JSON lines in the session log format, holding one chunk at a time, plain or
+compressed as the exporter writes them.
+"""
+
+import gzip
+import io
+import json
+from typing import Any, Callable, Dict, IO, Iterator
+
+CHUNK_SIZE = 1 << 16
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+class _JSONStream:
+    """Incremental tokenizer over a text stream for one top-level object"""
+
+    def __init__(self, fp: IO[str], chunk_size: int = CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Read another chunk, dropping consumed text; False at end of input"""
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > self.chunk_size:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """Get the next non-whitespace character without consuming it"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        """Consume one structural character"""
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of import data")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A value ending exactly at the buffer edge may be a truncated number
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+def _split_document(document: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield the sessions and goals of an export held in memory"""
+    yield from document['sessions']
+    if 'daily_goals' in document:
+        yield {'daily_goals': document['daily_goals']}
+
+def _walk_object(stream: _JSONStream) -> Iterator[Dict[str, Any]]:
+    """Walk one top-level object key by key, streaming a "sessions" array"""
+    stream.expect('{')
+    fields = {}
+    is_document = False
+    while stream.peek() != '}':
+        key = stream.value()
+        stream.expect(':')
+        if key == 'sessions' and stream.peek() == '[':
+            is_document = True
+            stream.pos += 1
+            while stream.peek() != ']':
+                yield stream.value()
+                if stream.peek() == ',':
+                    stream.pos += 1
+            stream.pos += 1
+        else:
+            fields[key] = stream.value()
+        if stream.peek() == ',':
+            stream.pos += 1
+    stream.pos += 1
+
+    if not is_document:
+        yield fields
+    elif 'daily_goals' in fields:
+        yield {'daily_goals': fields['daily_goals']}
+
+def read_records(fp: IO) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from a JSON export or JSON-lines file, plain, gzipped or
+    zstd-compressed. Sessions are yielded as dicts and goals as {"daily_goals": {...}}.
+    """
+    if not isinstance(fp, io.TextIOBase):
+        if fp.seekable():
+            position = fp.tell()
+            magic = fp.read(4)
+            fp.seek(position)
+            if magic.startswith(GZIP_MAGIC):
+                fp = gzip.GzipFile(fileobj=fp, mode='rb')
+            elif magic == ZSTD_MAGIC:
+                from exporter import zstd_available
+                if not zstd_available():
+                    raise ValueError("zstd import needs the zstandard package")
+                import zstandard
+                fp = zstandard.ZstdDecompressor().stream_reader(fp, closefd=False)
+        wrapper = io.TextIOWrapper(fp, encoding='utf-8')
+        try:
+            yield from read_records(wrapper)
+        finally:
+            # Leave the caller's binary file open
+            wrapper.detach()
+        return
+
+    stream = _JSONStream(fp)
+    while stream.peek():
+        # Small objects (JSON lines, small exports) decode in one call;
+        # anything not yet fully buffered is walked incrementally
+        try:
+            value, end = stream.decoder.raw_decode(stream.buf, stream.pos)
+        except json.JSONDecodeError:
+            value = None
+        if isinstance(value, dict):
+            stream.pos = end
+            if isinstance(value.get('sessions'), list):
+                yield from _split_document(value)
+            else:
+                yield value
+        else:
+            yield from _walk_object(stream)
+
+def import_file(manager, fp: IO, batch_size: int = 5000,
+                progress: Callable[[int, int], None] = None) -> int:
+    """Import an export file into a data manager; returns sessions added"""
+    daily_goals = {}
+
+    def sessions() -> Iterator[Dict[str, Any]]:
+        for record in read_records(fp):
+            if 'daily_goals' in record:
+                daily_goals.update(record['daily_goals'])
+            else:
+                yield record
+
+    imported = manager.import_sessions(sessions(), batch_size=batch_size, progress=progress)
+    if daily_goals:
+        manager.import_data({'daily_goals': daily_goals})
+    return imported
@@ -0,0 +1,212 @@
+"""
+Opt-in timing of each Streamlit rerun and of data manager calls.
+Enable with [focus_timer.instrumentation] enabled = true in config.toml or
+FOCUS_TIMER_PROFILE=1; metrics are also written in Prometheus text format.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator
+
+ENV_VAR = 'FOCUS_TIMER_PROFILE'
+
+# Reruns tick every second while a timer runs; the metrics file is
+# rewritten at most this often, about a Prometheus scrape interval
+WRITE_INTERVAL = 15.0
+
+def instrumentation_enabled(settings: Dict[str, Any]) -> bool:
+    """Check the env var first, then the [focus_timer.instrumentation] table"""
+    flag = os.environ.get(ENV_VAR)
+    if flag is not None:
+        return flag.strip().lower() not in ('', '0', 'false', 'no', 'off')
+    return bool(settings['enabled'])
+
+class Metrics:
+    """Process-wide totals shared by every browser session"""
+
+    def __init__(self, path: str = None, write_interval: float = WRITE_INTERVAL):
+        self.path = path
+        self.write_interval = write_interval
+        self.reruns = 0
+        self.phase_seconds: Dict[str, float] = {}
+        self.phase_count: Dict[str, int] = {}
+        self.call_count: Dict[str, int] = {}
+        self.call_seconds: Dict[str, float] = {}
+        self.call_rows: Dict[str, int] = {}
+        self._last_write = None
+        self._lock = threading.Lock()
+
+    def observe_phase(self, name: str, seconds: float):
+        """Add one timed phase"""
+        with self._lock:
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + seconds
+            self.phase_count[name] = self.phase_count.get(name, 0) + 1
+
+    def observe_rerun(self, seconds: float):
+        """Add one whole rerun"""
+        self.observe_phase('total', seconds)
+        with self._lock:
+            self.reruns += 1
+
+    def observe_call(self, method: str, seconds: float, rows: int):
+        """Add one data manager call and the session rows it returned"""
+        with self._lock:
+            self.call_count[method] = self.call_count.get(method, 0) + 1
+            self.call_seconds[method] = self.call_seconds.get(method, 0.0) + seconds
+            self.call_rows[method] = self.call_rows.get(method, 0) + rows
+
+    def prometheus_text(self) -> str:
+        """Render the totals in the Prometheus text exposition format"""
+        with self._lock:
+            lines = [
+                '# HELP focus_timer_reruns_total Instrumented Streamlit reruns.',
+                '# TYPE focus_timer_reruns_total counter',
+                f'focus_timer_reruns_total {self.reruns}',
+                '# HELP focus_timer_phase_seconds Time spent in each phase of app.main.',
+                '# TYPE focus_timer_phase_seconds summary'
+            ]
+            for name in sorted(self.phase_seconds):
+                lines.append(f'focus_timer_phase_seconds_sum{{phase="{name}"}} {self.phase_seconds[name]:.6f}')
+                lines.append(f'focus_timer_phase_seconds_count{{phase="{name}"}} {self.phase_count[name]}')
+            for metric, help_text, values in (
+                ('focus_timer_data_calls_total', 'Data manager calls.', self.call_count),
+                ('focus_timer_data_seconds_total', 'Time spent in data manager calls.', self.call_seconds),
+                ('focus_timer_data_rows_returned_total', 'Session rows returned or yielded by data manager calls.',
+                 self.call_rows)
+            ):
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} counter')
+                for method in sorted(values):
+                    value = values[method]
+                    value = f'{value:.6f}' if isinstance(value, float) else value
+                    lines.append(f'{metric}{{method="{method}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, force: bool = False):
+        """Atomically replace the metrics file, as textfile collectors expect, at most every write_interval"""
+        if not self.path:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._last_write is not None and now - self._last_write < self.write_interval:
+                return
+            self._last_write = now
+        temp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(temp_path, self.path)
+
+class RerunProfile:
+    """Phase timings of one rerun, added to the shared totals as they finish"""
+
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+        self.phases: Dict[str, float] = {}
+        self.started = self._lap_started = time.perf_counter()
+
+    def _record(self, name: str, seconds: float):
+        """Add time to a phase of this rerun and to the totals"""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        self.metrics.observe_phase(name, seconds)
+
+    def lap(self, name: str):
+        """Close the phase running since the previous lap, naming it `name`"""
+        now = time.perf_counter()
+        self._record(name, now - self._lap_started)
+        self._lap_started = now
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block that may run outside the sequence of laps"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - started)
+
+    def finish(self):
+        """Record the whole rerun and refresh the metrics file if it is due"""
+        self.phases['total'] = time.perf_counter() - self.started
+        self.metrics.observe_rerun(self.phases['total'])
+        self.metrics.write()
+
+class NullProfile:
+    """Stand-in used when instrumentation is off"""
+
+    phases: Dict[str, float] = {}
+
+    def lap(self, name: str):
+        pass
+
+    def phase(self, name: str):
+        return nullcontext()
+
+    def finish(self):
+        pass
+
+def _row_count(result: Any) -> int:
+    """
+    Session rows carried by a data manager result. Aggregates such as daily
+    stats and streaks carry none; SQLite cannot report the rows it scanned.
+    """
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict) and isinstance(result.get('sessions'), list):
+        return len(result['sessions'])
+    return 0
+
+class InstrumentedDataManager:
+    """
+    Proxy counting and timing every public data manager method. Iterators
+    are timed and counted as they are consumed, and observed once they are
+    exhausted or closed.
+    """
+
+    def __init__(self, manager, metrics: Metrics):
+        self._manager = manager
+        self._metrics = metrics
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._manager, name)
+        if name.startswith('_') or not callable(attribute):
+            return attribute
+
+        def timed_call(*args, **kwargs):
+            started = time.perf_counter()
+            result = attribute(*args, **kwargs)
+            if isinstance(result, Iterator):
+                return self._timed_iter(name, result, time.perf_counter() - started)
+            self._metrics.observe_call(name, time.perf_counter() - started, _row_count(result))
+            return result
+
+        return timed_call
+
+    def _timed_iter(self, name: str, iterator: Iterator[Any], seconds: float) -> Iterator[Any]:
+        """Pass items through, timing only the iterator's own work between them"""
+        rows = 0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    seconds += time.perf_counter() - started
+                    return
+                seconds += time.perf_counter() - started
+                rows += 1
+                yield item
+        finally:
+            self._metrics.observe_call(name, seconds, rows)
+
+_metrics: Dict[str, Metrics] = {}
+_metrics_lock = threading.Lock()
+
+def get_metrics(path: str) -> Metrics:
+    """Get the process-wide totals for a metrics file"""
+    with _metrics_lock:
+        metrics = _metrics.get(path)
+        if metrics is None:
+            metrics = _metrics[path] = Metrics(path)
+    return metrics
@@ -0,0 +1,169 @@
+"""
+Retention of in-memory session history.
+A RetentionPolicy bounds how many session rows DataManager keeps in its
+columns; evicted rows are spilled to a SessionArchive on disk, whose per-day
+rollups keep every aggregate statistic intact.
+"""
+
+import json
+import math
+import os
+from typing import Any, Dict, Iterable, Iterator, Set, Tuple
+
+from session_store import SessionStore, to_epoch
+
+class RetentionPolicy:
+    """
+    Keep at most `max_sessions` rows and/or rows from the last `max_age_days`.
+    Rows are evicted oldest first in chunks of `slack`, so the columns act as
+    a ring buffer with amortized O(1) eviction per logged session.
+    """
+
+    def __init__(self, max_sessions: int = None, max_age_days: float = None, slack: int = None):
+        self.max_sessions = max_sessions
+        self.max_age_days = max_age_days
+        self.slack = slack if slack is not None else max(64, (max_sessions or 0) // 10)
+
+    @classmethod
+    def from_config(cls, settings: Dict[str, Any]):
+        """Build the policy in [focus_timer.retention]; None means unlimited"""
+        policy = settings['policy']
+        if policy == 'unlimited':
+            return None
+        if policy == 'count':
+            return cls(max_sessions=settings['max_sessions'])
+        if policy == 'age':
+            return cls(max_age_days=settings['max_age_days'])
+        raise ValueError(f"Unknown retention policy: {policy}")
+
+    def evict_count(self, store: SessionStore, now: float, force: bool = False) -> int:
+        """Number of oldest rows to evict; 0 until a full chunk is due unless forced"""
+        count = 0
+        if self.max_sessions is not None:
+            count = len(store) - self.max_sessions
+        if self.max_age_days is not None:
+            count = max(count, store.bisect(now - self.max_age_days * 86400))
+        if count <= 0 or (count < self.slack and not force):
+            return 0
+        return count
+
+class SessionArchive:
+    """
+    Sessions evicted from memory, as JSON lines, plus a state file holding
+    the eviction horizon and per-day rollups of everything archived. The
+    state file is the commit point: archive bytes past its recorded size
+    are an unfinished spill and are dropped.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.state_path = path + '.state.json'
+        self.horizon = -math.inf
+        self.size = 0
+        self.ordered = True
+        # Time zone the per-day rollups were bucketed in; None is server time
+        self.timezone = None
+        self.days: Dict[int, Dict[str, int]] = {}
+        self._keys: Set[Tuple[float, str]] = None
+
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                state = json.load(f)
+            self.horizon = state['horizon'] if state['horizon'] is not None else -math.inf
+            self.size = state['size']
+            self.ordered = state['ordered']
+            self.timezone = state.get('timezone')
+            self.days = {int(day): bucket for day, bucket in state['days'].items()}
+
+    def __bool__(self) -> bool:
+        return self.size > 0
+
+    def spill(self, records: Iterable[Dict[str, Any]], deltas: Dict[int, Dict[str, int]], horizon: float):
+        """Archive evicted rows, which all start at or before `horizon`"""
+        self._append(records)
+        self.horizon = max(self.horizon, horizon)
+        self._merge_days(deltas)
+        self._save_state()
+
+    def add_old(self, records: Iterable[Dict[str, Any]], deltas: Dict[int, Dict[str, int]]):
+        """Archive logged or imported sessions that are not newer than the horizon"""
+        self._append(records)
+        self.ordered = False
+        self._merge_days(deltas)
+        self._save_state()
+
+    def rebucket(self, deltas: Dict[int, Dict[str, int]], timezone: str = None):
+        """Replace the per-day rollups with ones bucketed in another time zone"""
+        self.days = {}
+        self._merge_days(deltas)
+        self.timezone = timezone
+        self._save_state()
+
+    def keys(self) -> Set[Tuple[float, str]]:
+        """(start epoch, session type) of every archived session, loaded on first use"""
+        if self._keys is None:
+            self._keys = {
+                (to_epoch(record['start_time']), record['session_type'])
+                for record in self._read()
+            }
+        return self._keys
+
+    def iter_records(self, start: float = -math.inf, end: float = math.inf) -> Iterator[Dict[str, Any]]:
+        """Stream archived sessions starting in [start, end) in start order"""
+        if start > self.horizon and self.ordered:
+            return
+        matching = (record for record in self._read() if start <= to_epoch(record['start_time']) < end)
+        if self.ordered:
+            yield from matching
+        else:
+            # Old imports were appended out of order; sort just this range
+            yield from sorted(matching, key=lambda record: to_epoch(record['start_time']))
+
+    def _read(self) -> Iterator[Dict[str, Any]]:
+        """Stream committed archive records"""
+        if not self.size:
+            return
+        decode = json.JSONDecoder().decode
+        with open(self.path, 'rb') as f:
+            remaining = self.size
+            for line in f:
+                remaining -= len(line)
+                if remaining < 0:
+                    break
+                yield decode(line.decode('utf-8'))
+
+    def _append(self, records: Iterable[Dict[str, Any]]):
+        """Append records after the committed size and fsync them"""
+        lines = []
+        for record in records:
+            lines.append(json.dumps(record, separators=(',', ':')).encode() + b'\n')
+            if self._keys is not None:
+                self._keys.add((to_epoch(record['start_time']), record['session_type']))
+        with open(self.path, 'ab') as f:
+            f.truncate(self.size)
+            f.write(b''.join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+            self.size = f.tell()
+
+    def _merge_days(self, deltas: Dict[int, Dict[str, int]]):
+        """Add per-day rollup deltas to the archived totals"""
+        for day, delta in deltas.items():
+            bucket = self.days.setdefault(day, dict.fromkeys(delta, 0))
+            for field, value in delta.items():
+                bucket[field] += value
+
+    def _save_state(self):
+        """Atomically replace the state file"""
+        temp_path = self.state_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({
+                'horizon': self.horizon if self.horizon != -math.inf else None,
+                'size': self.size,
+                'ordered': self.ordered,
+                'timezone': self.timezone,
+                'days': self.days
+            }, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.state_path)
@@ -0,0 +1,147 @@
+"""
+Asyncio scheduler that completes timers at their deadlines.
+Deadlines sit in a min-heap and one task sleeps until the earliest, so
+thousands of timers cost one wakeup per completion instead of a poll each.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from timer_manager import TimerManager, NS_PER_SECOND
+
+logger = logging.getLogger(__name__)
+
+class ScheduledTimer:
+    def __init__(self, timer: TimerManager, settings: Dict[str, Any], data_manager,
+                 on_complete: Callable[[Hashable, Dict[str, Any]], None] = None):
+        self.timer = timer
+        self.settings = settings
+        self.data_manager = data_manager
+        self.on_complete = on_complete
+
+class TimerScheduler:
+    """
+    Owns many TimerManagers and, at each deadline, completes the session,
+    logs it and auto-starts the next one as the settings ask. Methods must
+    be called from the event loop's thread.
+    """
+
+    def __init__(self, clock=time.monotonic_ns, refresh: Callable[[Hashable], bool] = None):
+        self.clock = clock
+        # Called with a key before completing its timer; True if the timer was replaced
+        self.refresh = refresh
+        self.timers: Dict[Hashable, ScheduledTimer] = {}
+        self.completed = 0
+        self.max_lateness_ns = 0
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._sequence = itertools.count()
+        self._wake = None
+
+    def add(self, key: Hashable, timer: TimerManager, settings: Dict[str, Any], data_manager,
+            on_complete: Callable[[Hashable, Dict[str, Any]], None] = None):
+        """Take ownership of a timer, scheduling it if it is already running"""
+        self.timers[key] = ScheduledTimer(timer, settings, data_manager, on_complete)
+        self.reschedule(key)
+
+    def remove(self, key: Hashable):
+        """Stop scheduling a timer; its heap entry is dropped when it surfaces"""
+        self.timers.pop(key, None)
+
+    def reschedule(self, key: Hashable):
+        """Queue a timer's current deadline after it starts or resumes"""
+        entry = self.timers.get(key)
+        deadline = entry.timer.next_deadline() if entry else None
+        if deadline is None:
+            return
+        if not self._heap or deadline < self._heap[0][0]:
+            self._notify()
+        heapq.heappush(self._heap, (deadline, next(self._sequence), key))
+
+    def start(self, key: Hashable):
+        """Start or resume a timer"""
+        entry = self.timers[key]
+        entry.timer.start_timer(entry.settings)
+        self.reschedule(key)
+
+    def pause(self, key: Hashable):
+        """Pause a timer; its stale heap entry is skipped when it surfaces"""
+        self.timers[key].timer.pause_timer()
+
+    def stop(self, key: Hashable):
+        """Stop a timer"""
+        self.timers[key].timer.stop_timer()
+
+    def reset(self, key: Hashable):
+        """Stop a timer and start the cycle over from the first focus session"""
+        self.timers[key].timer.reset_timer()
+
+    def skip(self, key: Hashable):
+        """Abandon a timer's session without logging it and queue the next one"""
+        self.timers[key].timer.skip_session()
+
+    def next_deadline(self):
+        """Get the earliest queued deadline, or None"""
+        return self._heap[0][0] if self._heap else None
+
+    def run_due(self, now: int = None) -> int:
+        """Complete every timer whose deadline has passed; returns how many"""
+        if now is None:
+            now = self.clock()
+        fired = 0
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, key = heapq.heappop(self._heap)
+            entry = self.timers.get(key)
+            # Entries left behind by pause, stop or restart no longer match
+            if entry is None or entry.timer.next_deadline() != deadline:
+                continue
+            # Another process may have paused, stopped or completed it meanwhile;
+            # a replaced timer is queued afresh at its own deadline
+            if self.refresh is not None and self.refresh(key):
+                continue
+            if not entry.timer.update():
+                heapq.heappush(self._heap, (deadline, next(self._sequence), key))
+                break
+            try:
+                self._finish(key, entry, now - deadline)
+            except Exception:
+                # One failing store or callback must not stall every other timer
+                logger.exception("Completing timer %r failed", key)
+            fired += 1
+        return fired
+
+    def _finish(self, key: Hashable, entry: ScheduledTimer, lateness_ns: int):
+        """Log a completed session and chain the next one"""
+        self.completed += 1
+        self.max_lateness_ns = max(self.max_lateness_ns, lateness_ns)
+        session_data = entry.timer.get_completed_session_data()
+        entry.data_manager.log_session(session_data)
+        if entry.timer.should_auto_start(entry.settings):
+            entry.timer.start_next_session(entry.settings)
+            self.reschedule(key)
+        if entry.on_complete is not None:
+            entry.on_complete(key, session_data)
+
+    def _notify(self):
+        """Wake the run loop to recompute its sleep"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def run(self):
+        """Sleep until each deadline and complete the timers due; runs until cancelled"""
+        self._wake = asyncio.Event()
+        try:
+            while True:
+                self.run_due()
+                self._wake.clear()
+                deadline = self.next_deadline()
+                timeout = None if deadline is None else max(0, deadline - self.clock()) / NS_PER_SECOND
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._wake = None
@@ -0,0 +1,107 @@
+"""
+Append-only JSON-lines storage for the session history.
+Each line is either a logged session or a {"daily_goals": {...}} record.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator
+
+class SessionLog:
+    def __init__(self, path: str, fsync_every: int = 8, fsync_interval: float = 30.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.records = 0
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._file = None
+
+    def load(self) -> Iterator[Dict[str, Any]]:
+        """Stream records from disk, dropping a torn trailing write"""
+        self.records = 0
+        if not os.path.exists(self.path):
+            return
+
+        good_offset = 0
+        decode = json.JSONDecoder().decode
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                good_offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    # Decoding to str first skips json.loads' per-call encoding sniffing
+                    record = decode(line.decode('utf-8'))
+                except ValueError:
+                    continue
+                self.records += 1
+                yield record
+
+        if good_offset < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_offset)
+
+    def append(self, record: Dict[str, Any]):
+        """Append one record; fsync once per batch of writes"""
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+        self._file.write(json.dumps(record, separators=(',', ':')).encode() + b'\n')
+        self._file.flush()
+        self.records += 1
+        self._pending += 1
+
+        if (self._pending >= self.fsync_every or
+                time.monotonic() - self._last_sync >= self.fsync_interval):
+            self.sync()
+
+    def append_many(self, records: Iterable[Dict[str, Any]]):
+        """Append records in one write and one fsync"""
+        lines = [json.dumps(record, separators=(',', ':')).encode() + b'\n' for record in records]
+        if not lines:
+            return
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+        self._file.write(b''.join(lines))
+        self._file.flush()
+        self.records += len(lines)
+        self._pending += len(lines)
+        self.sync()
+
+    def sync(self):
+        """Force pending appends to stable storage"""
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def compact(self, records: Iterable[Dict[str, Any]]):
+        """Atomically replace the log with the given records"""
+        self.close()
+        temp_path = self.path + '.tmp'
+        count = 0
+        with open(temp_path, 'wb') as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(',', ':')).encode() + b'\n')
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+        if hasattr(os, 'O_DIRECTORY'):
+            directory = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+        self.records = count
+
+    def close(self):
+        """Sync and close the underlying file"""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
@@ -0,0 +1,217 @@
+"""
+Columnar storage for logged sessions, kept sorted by start time.
+Timestamps are naive epoch seconds and session types are int8 codes,
+so a session costs ~30 bytes instead of a dict of ISO strings.
+"""
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from timer_manager import SessionType
+
+_EPOCH = datetime(1970, 1, 1)
+
+FOCUS = 0
+SHORT_BREAK = 1
+LONG_BREAK = 2
+
+def to_epoch(value) -> float:
+    """Convert an ISO timestamp or datetime into naive epoch seconds"""
+    if value is None:
+        return math.nan
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return (value - _EPOCH).total_seconds()
+
+def from_epoch(value: float):
+    """Convert naive epoch seconds back into an ISO timestamp"""
+    if math.isnan(value):
+        return None
+    return (_EPOCH + timedelta(seconds=value)).isoformat()
+
+class SessionRecord:
+    """
+    One session with its timestamps already parsed into naive epoch seconds,
+    for display code; ISO strings are only produced by to_dict.
+    """
+
+    __slots__ = ('session_type', 'duration', 'start', 'end', 'completed', 'logged_at')
+
+    def __init__(self, session_type: str, duration: int, start: float, end: float = math.nan,
+                 completed: bool = True, logged_at: float = math.nan):
+        self.session_type = session_type
+        self.duration = duration
+        self.start = start
+        self.end = end
+        self.completed = completed
+        self.logged_at = logged_at
+
+    @classmethod
+    def from_dict(cls, session: Dict[str, Any]):
+        """Parse a session dict, shaped like a logged session"""
+        return cls(
+            session['session_type'],
+            session['duration'],
+            to_epoch(session['start_time']),
+            to_epoch(session.get('end_time')),
+            bool(session.get('completed', True)),
+            to_epoch(session.get('logged_at'))
+        )
+
+    @property
+    def start_datetime(self) -> datetime:
+        """Get the start as a naive local datetime"""
+        return _EPOCH + timedelta(seconds=self.start)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert back into a session dict with ISO timestamps"""
+        return {
+            'session_type': self.session_type,
+            'duration': self.duration,
+            'start_time': from_epoch(self.start),
+            'end_time': from_epoch(self.end),
+            'completed': self.completed,
+            'logged_at': from_epoch(self.logged_at)
+        }
+
+class SessionStore:
+    def __init__(self):
+        self.start = array('d')
+        self.end = array('d')
+        self.logged = array('d')
+        self.kind = array('b')
+        self.duration = array('i')
+        self.completed = array('b')
+        self.type_names = [session_type.value for session_type in SessionType]
+        self._type_codes = {name: code for code, name in enumerate(self.type_names)}
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(len(self.start)):
+            yield self.record(row)
+
+    def type_code(self, name: str) -> int:
+        """Get the int8 code for a session type, registering unknown types"""
+        code = self._type_codes.get(name)
+        if code is None:
+            code = self._type_codes[name] = len(self.type_names)
+            self.type_names.append(name)
+        return code
+
+    def encode(self, session: Dict[str, Any]) -> Tuple:
+        """Convert a session dict into a column tuple"""
+        return (
+            to_epoch(session['start_time']),
+            to_epoch(session.get('end_time')),
+            to_epoch(session.get('logged_at')),
+            self.type_code(session['session_type']),
+            session['duration'],
+            1 if session.get('completed', True) else 0
+        )
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Get a dict view of one row, shaped like a logged session"""
+        return self.decode((self.start[row], self.end[row], self.logged[row],
+                            self.kind[row], self.duration[row], self.completed[row]))
+
+    def row(self, row: int) -> SessionRecord:
+        """Get one row as a SessionRecord without formatting its timestamps"""
+        return SessionRecord(self.type_names[self.kind[row]], self.duration[row], self.start[row],
+                             self.end[row], bool(self.completed[row]), self.logged[row])
+
+    def decode(self, encoded: Tuple) -> Dict[str, Any]:
+        """Convert a column tuple back into a session dict"""
+        start, end, logged, kind, duration, completed = encoded
+        return {
+            'session_type': self.type_names[kind],
+            'duration': duration,
+            'start_time': from_epoch(start),
+            'end_time': from_epoch(end),
+            'completed': bool(completed),
+            'logged_at': from_epoch(logged)
+        }
+
+    def records(self, lo: int, hi: int) -> List[Dict[str, Any]]:
+        """Get dict views of rows [lo, hi)"""
+        return [self.record(row) for row in range(lo, hi)]
+
+    def bisect(self, epoch: float) -> int:
+        """Get the first row starting at or after `epoch`"""
+        return bisect_left(self.start, epoch)
+
+    def contains(self, start: float, kind: int) -> bool:
+        """Check whether a session with this start and type code is stored"""
+        row = bisect_left(self.start, start)
+        while row < len(self.start) and self.start[row] == start:
+            if self.kind[row] == kind:
+                return True
+            row += 1
+        return False
+
+    def insert(self, encoded: Tuple) -> int:
+        """Insert one encoded session in start order and return its row"""
+        row = bisect_right(self.start, encoded[0])
+        for column, value in zip(self._columns(), encoded):
+            column.insert(row, value)
+        return row
+
+    def merge(self, incoming: Iterable[Tuple]) -> List[int]:
+        """
+        Merge encoded sessions, skipping ones whose (start, type) is already
+        stored. Only rows from the earliest incoming start onwards are
+        rewritten, and runs of existing rows are copied as array slices.
+        Returns the rows of the sessions that were added.
+        """
+        incoming = sorted(incoming, key=lambda encoded: encoded[0])
+        if not incoming:
+            return []
+
+        columns = self._columns()
+        lo = i = bisect_left(self.start, incoming[0][0])
+        tail = tuple(array(column.typecode) for column in columns)
+        tail_start, tail_kind = tail[0], tail[3]
+        added_rows = []
+
+        for encoded in incoming:
+            start = encoded[0]
+            stop = bisect_right(self.start, start, i)
+            if stop > i:
+                for merged, column in zip(tail, columns):
+                    merged.extend(column[i:stop])
+                i = stop
+
+            row = len(tail_start) - 1
+            while row >= 0 and tail_start[row] == start and tail_kind[row] != encoded[3]:
+                row -= 1
+            if row >= 0 and tail_start[row] == start:
+                continue
+
+            added_rows.append(lo + len(tail_start))
+            for merged, value in zip(tail, encoded):
+                merged.append(value)
+
+        for merged, column in zip(tail, columns):
+            merged.extend(column[i:])
+            del column[lo:]
+            column.extend(merged)
+        return added_rows
+
+    def evict_head(self, count: int):
+        """Drop the `count` oldest rows"""
+        for column in self._columns():
+            del column[:count]
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the column buffers"""
+        return sum(len(column) * column.itemsize for column in self._columns())
+
+    def _columns(self) -> Tuple[array, ...]:
+        """Get the columns in encoded tuple order"""
+        return (self.start, self.end, self.logged, self.kind, self.duration, self.completed)
@@ -0,0 +1,42 @@
+"""
+Process-wide SQLite store shared by every Streamlit session.
+Each user gets an isolated SQLiteDataManager view over one connection pool.
+"""
+
+import threading
+from typing import Dict
+
+from sqlite_manager import ConnectionPool, SQLiteDataManager
+
+class SharedStore:
+    def __init__(self, path: str, pool_size: int = 4):
+        self.pool = ConnectionPool(path, size=pool_size)
+        self._managers: Dict[str, SQLiteDataManager] = {}
+        self._lock = threading.Lock()
+
+    def for_user(self, user: str, timezone: str = None) -> SQLiteDataManager:
+        """Get the data manager for one user, creating it on first use with a default time zone"""
+        manager = self._managers.get(user)
+        if manager is None:
+            with self._lock:
+                manager = self._managers.get(user)
+                if manager is None:
+                    manager = self._managers[user] = SQLiteDataManager(user=user, pool=self.pool, timezone=timezone)
+        return manager
+
+    def close(self):
+        """Close every pooled connection"""
+        self.pool.close()
+
+_stores: Dict[str, SharedStore] = {}
+_stores_lock = threading.Lock()
+
+def get_shared_store(path: str, pool_size: int = 4) -> SharedStore:
+    """Get the process-wide store for a database path"""
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = _stores[path] = SharedStore(path, pool_size)
+    return store
@@ -0,0 +1,420 @@
+import queue
+import sqlite3
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import datetime, timedelta, date as date_type
+from typing import List, Dict, Any, Callable, Iterable, Iterator
+
+from data_manager import (
+    EMPTY_BUCKET, batched, validate_session, validate_sessions, summarize_day, summarize_week, compute_streaks
+)
+from session_store import SessionRecord, to_epoch, from_epoch
+from day_buckets import DayBuckets, EPOCH_ORDINAL
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    session_type TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT,
+    completed INTEGER NOT NULL DEFAULT 1,
+    logged_at TEXT,
+    UNIQUE (user, start_time, session_type)
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_start ON sessions (user, start_time);
+CREATE INDEX IF NOT EXISTS idx_sessions_type_start ON sessions (session_type, start_time);
+CREATE TABLE IF NOT EXISTS daily_goals (
+    user TEXT PRIMARY KEY,
+    focus_sessions INTEGER NOT NULL,
+    focus_minutes INTEGER NOT NULL,
+    timezone TEXT
+);
+CREATE TABLE IF NOT EXISTS generations (
+    user TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+"""
+
+SESSION_COLUMNS = ('session_type', 'duration', 'start_time', 'end_time', 'completed', 'logged_at')
+
+DAY_BUCKETS = """
+SELECT CAST(julianday(substr(start_time, 1, 10)) - 2440587.5 AS INTEGER) AS day,
+       COUNT(*),
+       COALESCE(SUM(session_type = 'focus'), 0),
+       COALESCE(SUM(CASE WHEN session_type = 'focus' THEN duration END), 0),
+       COALESCE(SUM(CASE WHEN session_type IN ('short_break', 'long_break') THEN duration END), 0)
+FROM sessions
+WHERE user = ? AND start_time >= ? AND start_time < ?
+GROUP BY day
+"""
+
+# Days in a user's time zone: one indexed range scan per precomputed day.
+# Each day binds 3 variables, so a long range is queried in spans that stay
+# under the 999-variable limit of SQLite builds before 3.32.
+ZONED_DAYS_PER_QUERY = 300
+
+ZONED_DAY_BUCKETS = """
+WITH bounds (day, lo, hi) AS (VALUES {values})
+SELECT bounds.day,
+       COUNT(*),
+       COALESCE(SUM(session_type = 'focus'), 0),
+       COALESCE(SUM(CASE WHEN session_type = 'focus' THEN duration END), 0),
+       COALESCE(SUM(CASE WHEN session_type IN ('short_break', 'long_break') THEN duration END), 0)
+FROM bounds JOIN sessions ON sessions.start_time >= bounds.lo AND sessions.start_time < bounds.hi
+WHERE sessions.user = ?
+GROUP BY bounds.day
+"""
+
+def _iso(value):
+    """
+    Normalize a timestamp to the naive local ISO text the memory engine
+    stores, so offsets and separators can't split days or dodge UNIQUE
+    """
+    return from_epoch(to_epoch(value))
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared between threads"""
+
+    def __init__(self, path: str, size: int = 4, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        if path == ':memory:':
+            size = 1
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._idle.put(conn)
+
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+            # Databases created before per-user time zones lack the column
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(daily_goals)')}
+            if 'timezone' not in columns:
+                conn.execute('ALTER TABLE daily_goals ADD COLUMN timezone TEXT')
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection, waiting up to `timeout` for one to free up"""
+        conn = self._idle.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+class SQLiteDataManager:
+    """DataManager interface backed by an indexed SQLite database"""
+
+    def __init__(self, path: str = None, user: str = 'default', pool: ConnectionPool = None,
+                 timezone: str = None):
+        self.user = user
+        self._owns_pool = pool is None
+        self.pool = pool if pool is not None else ConnectionPool(path, size=1)
+        self.path = self.pool.path
+
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                'SELECT focus_sessions, focus_minutes, timezone FROM daily_goals WHERE user = ?', (user,)
+            ).fetchone()
+        self.daily_goals = {
+            'focus_sessions': row[0] if row else 8,
+            'focus_minutes': row[1] if row else 200
+        }
+        self.days = DayBuckets(row[2] if row and row[2] else timezone)
+
+    @property
+    def version(self) -> int:
+        """
+        The user's write generation. It lives in the database, so writes by
+        every process sharing it (the app and the API) invalidate cached results
+        """
+        with self.pool.connection() as conn:
+            row = conn.execute('SELECT generation FROM generations WHERE user = ?', (self.user,)).fetchone()
+        return row[0] if row else 0
+
+    def _bump_version(self, conn: sqlite3.Connection):
+        """Mark the stored data as changed, in the transaction that changed it"""
+        conn.execute(
+            'INSERT INTO generations (user, generation) VALUES (?, 1) '
+            'ON CONFLICT (user) DO UPDATE SET generation = generation + 1',
+            (self.user,)
+        )
+
+    def _row_to_session(self, row) -> Dict[str, Any]:
+        """Convert a sessions row into the dict shape used by DataManager"""
+        session = dict(zip(SESSION_COLUMNS, row))
+        session['completed'] = bool(session['completed'])
+        return session
+
+    def _select_sessions(self, where: str, params: tuple, suffix: str = '') -> List[Dict[str, Any]]:
+        """Select this user's sessions matching a WHERE clause"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(SESSION_COLUMNS)} FROM sessions WHERE user = ? AND {where} {suffix}",
+                (self.user,) + params
+            ).fetchall()
+        return [self._row_to_session(row) for row in rows]
+
+    def _day_buckets(self, first_day: int, last_day: int) -> Dict[int, Dict[str, int]]:
+        """Aggregate sessions into per-day buckets keyed by day number for [first_day, last_day]"""
+        boundaries = [from_epoch(epoch) for epoch in self.days.boundaries(first_day, last_day)]
+        if self.days.zone is None:
+            queries = [(DAY_BUCKETS, [self.user, boundaries[0], boundaries[-1]])]
+        else:
+            queries = []
+            for span_first in range(first_day, last_day + 1, ZONED_DAYS_PER_QUERY):
+                span_last = min(span_first + ZONED_DAYS_PER_QUERY - 1, last_day)
+                params = []
+                for day in range(span_first, span_last + 1):
+                    params.extend((day, boundaries[day - first_day], boundaries[day - first_day + 1]))
+                params.append(self.user)
+                values = ', '.join(['(?, ?, ?)'] * (span_last - span_first + 1))
+                queries.append((ZONED_DAY_BUCKETS.format(values=values), params))
+        with self.pool.connection() as conn:
+            rows = [row for query, params in queries for row in conn.execute(query, params).fetchall()]
+        return {
+            day: {
+                'sessions': sessions,
+                'focus_sessions': focus_sessions,
+                'focus_seconds': focus_seconds,
+                'break_seconds': break_seconds
+            }
+            for day, sessions, focus_sessions, focus_seconds, break_seconds in rows
+        }
+
+    def _insert_sessions(self, conn: sqlite3.Connection, sessions: List[Dict[str, Any]]):
+        """Insert sessions, skipping (start_time, session_type) duplicates"""
+        conn.executemany(
+            'INSERT OR IGNORE INTO sessions (user, session_type, duration, start_time, end_time, completed, logged_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (
+                (self.user, s['session_type'], s['duration'], _iso(s['start_time']),
+                 _iso(s.get('end_time')), int(s.get('completed', True)), _iso(s.get('logged_at')))
+                for s in sessions
+            )
+        )
+
+    def log_session(self, session_data: Dict[str, Any]):
+        """Log a completed session, unless one with the same start and type is stored"""
+        validate_session(session_data)
+        session_data['logged_at'] = datetime.now().isoformat()
+        with self.pool.connection() as conn, conn:
+            self._insert_sessions(conn, [session_data])
+            self._bump_version(conn)
+
+    def log_sessions(self, sessions: Iterable[Dict[str, Any]]) -> int:
+        """
+        Log many completed sessions in one transaction, validating all of them
+        before any is stamped or stored. Sessions whose start and type are
+        already stored are skipped. Returns how many were logged.
+        """
+        sessions = list(sessions)
+        validate_sessions(sessions, 'logged')
+
+        logged_at = datetime.now().isoformat()
+        for session_data in sessions:
+            session_data['logged_at'] = logged_at
+
+        with self.pool.connection() as conn, conn:
+            before = conn.total_changes
+            self._insert_sessions(conn, sessions)
+            logged = conn.total_changes - before
+            self._bump_version(conn)
+        return logged
+
+    def get_daily_stats(self, date: datetime = None) -> Dict[str, Any]:
+        """Get statistics for a specific date (default: today)"""
+        day = self.days.today() if date is None else self.days.day_number(date)
+        bucket = self._day_buckets(day, day).get(day, EMPTY_BUCKET)
+        return summarize_day(bucket, self.daily_goals)
+
+    def get_weekly_stats(self) -> Dict[str, Any]:
+        """Get statistics for the current week"""
+        today = self.days.now()
+        start_of_week = today - timedelta(days=today.weekday())
+        first_day = self.days.day_number(start_of_week)
+        buckets = self._day_buckets(first_day, first_day + 6)
+
+        weekly_data = []
+        for i in range(7):
+            day = start_of_week + timedelta(days=i)
+            daily_stats = summarize_day(buckets.get(first_day + i, EMPTY_BUCKET), self.daily_goals)
+            daily_stats['date'] = day.strftime('%Y-%m-%d')
+            daily_stats['day_name'] = day.strftime('%A')
+            weekly_data.append(daily_stats)
+
+        return summarize_week(weekly_data)
+
+    def _range_stats(self, first_day: int, last_day: int) -> Dict[str, Any]:
+        """Statistics for [first_day, last_day] from one GROUP BY query"""
+        from analytics import arrays_from_buckets, summarize_range
+        buckets = self._day_buckets(first_day, last_day)
+        return summarize_range(first_day, arrays_from_buckets(first_day, last_day, buckets), self.daily_goals)
+
+    def get_monthly_stats(self, year: int = None, month: int = None) -> Dict[str, Any]:
+        """Get statistics for every day of a month (default: this month)"""
+        from analytics import month_range
+        today = self.days.now()
+        return self._range_stats(*month_range(year or today.year, month or today.month))
+
+    def get_yearly_stats(self, year: int = None) -> Dict[str, Any]:
+        """Get statistics for every day of a year (default: this year)"""
+        from analytics import year_range
+        return self._range_stats(*year_range(year or self.days.now().year))
+
+    def get_recent_sessions(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the most recent sessions"""
+        return self._select_sessions('1', (limit,), 'ORDER BY start_time DESC LIMIT ?')
+
+    def get_recent_records(self, limit: int = 10) -> List[SessionRecord]:
+        """Get the most recent sessions with parsed timestamps, for display"""
+        return [SessionRecord.from_dict(session) for session in self.get_recent_sessions(limit)]
+
+    def get_session_history(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Get session history for the last N days"""
+        cutoff_date = datetime.now() - timedelta(days=days)
+        return self._select_sessions('start_time >= ?', (cutoff_date.isoformat(),), 'ORDER BY start_time')
+
+    def export_data(self) -> Dict[str, Any]:
+        """Export all data for backup/analysis"""
+        sessions = self._select_sessions('1', (), 'ORDER BY start_time')
+        return {
+            'sessions': sessions,
+            'daily_goals': self.daily_goals,
+            'export_timestamp': datetime.now().isoformat(),
+            'total_sessions': len(sessions),
+            'date_range': {
+                'first_session': sessions[0]['start_time'] if sessions else None,
+                'last_session': sessions[-1]['start_time'] if sessions else None
+            }
+        }
+
+    def iter_sessions(self, start: datetime = None, end: datetime = None,
+                      batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate sessions starting in [start, end) in start order. Each batch is
+        its own keyset query, so no pooled connection stays borrowed while the
+        caller consumes rows, however long the iterator lives.
+        """
+        where, params = ['user = ?'], [self.user]
+        if start is not None:
+            where.append('start_time >= ?')
+            params.append(start.isoformat())
+        if end is not None:
+            where.append('start_time < ?')
+            params.append(end.isoformat())
+
+        query = (f"SELECT id, {', '.join(SESSION_COLUMNS)} FROM sessions WHERE {' AND '.join(where)} "
+                 "{after} ORDER BY start_time, id LIMIT ?")
+        after, after_params = '', []
+        while True:
+            with self.pool.connection() as conn:
+                rows = conn.execute(query.format(after=after), params + after_params + [batch_size]).fetchall()
+            for row in rows:
+                yield self._row_to_session(row[1:])
+            if len(rows) < batch_size:
+                return
+            # Resume after the last row; ids break ties between equal start times
+            last = dict(zip(('id',) + SESSION_COLUMNS, rows[-1]))
+            after, after_params = 'AND (start_time, id) > (?, ?)', [last['start_time'], last['id']]
+
+    def import_data(self, data: Dict[str, Any]):
+        """Import data from backup"""
+        if 'sessions' in data:
+            self.import_sessions(data['sessions'])
+        if 'daily_goals' in data:
+            self.daily_goals.update(data['daily_goals'])
+            with self.pool.connection() as conn, conn:
+                self._save_goals(conn)
+                self._bump_version(conn)
+
+    def import_sessions(self, sessions: Iterable[Dict[str, Any]], batch_size: int = 5000,
+                        progress: Callable[[int, int], None] = None) -> int:
+        """
+        Import sessions one transaction per batch; the UNIQUE index skips
+        duplicates. A bad session raises ValueError before its batch is
+        stored, leaving earlier batches imported.
+        """
+        read = imported = 0
+        for batch in batched(sessions, batch_size):
+            validate_sessions(batch, 'imported', read)
+            with self.pool.connection() as conn, conn:
+                before = conn.total_changes
+                self._insert_sessions(conn, batch)
+                imported += conn.total_changes - before
+                self._bump_version(conn)
+            read += len(batch)
+            if progress is not None:
+                progress(read, imported)
+        return imported
+
+    def set_daily_goals(self, focus_sessions: int = None, focus_minutes: int = None):
+        """Set daily productivity goals"""
+        if focus_sessions is not None:
+            self.daily_goals['focus_sessions'] = focus_sessions
+        if focus_minutes is not None:
+            self.daily_goals['focus_minutes'] = focus_minutes
+        with self.pool.connection() as conn, conn:
+            self._save_goals(conn)
+            self._bump_version(conn)
+
+    def set_timezone(self, timezone: str = None):
+        """Set the IANA time zone days are counted in; None uses the server's"""
+        self.days = DayBuckets(timezone)
+        with self.pool.connection() as conn, conn:
+            self._save_goals(conn)
+            self._bump_version(conn)
+
+    def _save_goals(self, conn: sqlite3.Connection):
+        """Upsert this user's daily goals and time zone"""
+        conn.execute(
+            'INSERT INTO daily_goals (user, focus_sessions, focus_minutes, timezone) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (user) DO UPDATE SET focus_sessions = excluded.focus_sessions, '
+            'focus_minutes = excluded.focus_minutes, timezone = excluded.timezone',
+            (self.user, self.daily_goals['focus_sessions'], self.daily_goals['focus_minutes'],
+             self.days.timezone)
+        )
+
+    def get_streak_data(self) -> Dict[str, int]:
+        """Calculate current and longest streaks"""
+        today = self.days.today()
+        if self.days.zone is None:
+            with self.pool.connection() as conn:
+                rows = conn.execute(
+                    "SELECT DISTINCT substr(start_time, 1, 10) AS day FROM sessions "
+                    "WHERE user = ? AND session_type = 'focus' ORDER BY day",
+                    (self.user,)
+                ).fetchall()
+            sorted_days = [date_type.fromisoformat(day).toordinal() - EPOCH_ORDINAL for day, in rows]
+            return compute_streaks(sorted_days, today)
+
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT start_time FROM sessions WHERE user = ? AND session_type = 'focus' "
+                "ORDER BY start_time",
+                (self.user,)
+            ).fetchall()
+        if not rows:
+            return compute_streaks([], today)
+        # Only the first and last starts are parsed; the rest bisect the ISO boundaries
+        first_day = self.days.day_of(to_epoch(rows[0][0]))
+        last_day = self.days.day_of(to_epoch(rows[-1][0]))
+        boundaries = [from_epoch(epoch) for epoch in self.days.boundaries(first_day, last_day)]
+        active_days = {first_day + bisect_right(boundaries, start) - 1 for start, in rows}
+        return compute_streaks(sorted(active_days), today)
+
+    def close(self):
+        """Close the connection pool if this manager created it"""
+        if self._owns_pool:
+            self.pool.close()
@@ -0,0 +1,97 @@
+"""
+Memoized data manager queries.
+Results are reused across reruns until a write bumps the manager's version
+or the user's date changes, so an idle rerun recomputes nothing.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+# Queries whose results depend only on their arguments, the stored data and
+# today's date. get_session_history depends on the time of day, so it is
+# always passed through.
+CACHED_METHODS = frozenset({
+    'get_daily_stats',
+    'get_weekly_stats',
+    'get_monthly_stats',
+    'get_yearly_stats',
+    'get_recent_sessions',
+    'get_recent_records',
+    'get_streak_data'
+})
+
+class CachedDataManager:
+    """
+    Proxy memoizing the read-only queries of a data manager, keyed by
+    (method, args). Every entry belongs to one (version, today) generation,
+    today being the manager's day number in the user's time zone;
+    a write or a new day starts a fresh generation and drops the old
+    entries. Within a generation the least recently used entry is evicted
+    beyond `max_entries`. Cached results are shared, so callers must not
+    mutate them.
+    """
+
+    def __init__(self, manager, max_entries: int = 128, today: Callable[[], int] = None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self._manager = manager
+        # Looked up on each call, since set_timezone replaces manager.days
+        self._today = today or (lambda: manager.days.today())
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._generation: Tuple[int, int] = None
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._manager, name)
+        if name not in CACHED_METHODS:
+            return attribute
+
+        def cached_call(*args, **kwargs):
+            return self._lookup(name, attribute, args, kwargs)
+
+        return cached_call
+
+    def _lookup(self, name: str, method: Callable, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """Return a cached result, computing and storing it on a miss"""
+        generation = (self._manager.version, self._today())
+        if generation != self._generation:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._generation = generation
+
+        key = (name, args, tuple(sorted(kwargs.items())))
+        try:
+            result = self._entries[key]
+        except KeyError:
+            pass
+        else:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = self._entries[key] = method(*args, **kwargs)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def cache_info(self) -> Dict[str, int]:
+        """Get the hit, miss and eviction counters for tuning max_entries"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries
+        }
+
+    def clear_cache(self):
+        """Drop every cached result"""
+        self._entries.clear()
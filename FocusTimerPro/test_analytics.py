@@ -0,0 +1,74 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from data_manager import DataManager
+from retention import RetentionPolicy, SessionArchive
+
+def year_of_sessions():
+    """Sessions on most days of 2024, some just before and after local midnight"""
+    sessions = []
+    start = datetime(2024, 1, 1, 0, 10)
+    for day in range(366):
+        if day % 7 == 3:
+            continue
+        for index in range(day % 5 + 1):
+            session_type = 'focus' if index % 3 != 2 else 'short_break'
+            when = start + timedelta(days=day, hours=index * 5 + day % 3)
+            sessions.append({'session_type': session_type, 'duration': 300 + 60 * index + day,
+                             'start_time': when.isoformat()})
+        sessions.append({'session_type': 'focus', 'duration': 1500,
+                         'start_time': (start + timedelta(days=day + 1, minutes=-25)).isoformat()})
+    return sessions
+
+@pytest.fixture(params=['memory', 'archived', 'sqlite'])
+def engine(request, tmp_path):
+    def build(timezone: str = None):
+        if request.param == 'sqlite':
+            from sqlite_manager import SQLiteDataManager
+            manager = SQLiteDataManager(':memory:', timezone=timezone)
+            request.addfinalizer(manager.close)
+        elif request.param == 'archived':
+            # Most of the year only survives in the archive's rollups
+            manager = DataManager(retention=RetentionPolicy(max_sessions=100),
+                                  archive=SessionArchive(str(tmp_path / 'archive.jsonl')), timezone=timezone)
+        else:
+            manager = DataManager(timezone=timezone)
+        manager.import_sessions(year_of_sessions())
+        if request.param == 'archived':
+            assert len(manager.sessions) < 200
+        return manager
+    return build
+
+def assert_matches_daily_stats(manager, stats):
+    for day in stats['daily_breakdown']:
+        daily = manager.get_daily_stats(datetime.fromisoformat(day['date']))
+        assert day['focus_sessions'] == daily['focus_sessions'], day['date']
+        assert day['total_focus_time'] == daily['total_focus_time'], day['date']
+        assert day['total_break_time'] == daily['total_break_time'], day['date']
+        assert day['productivity_score'] == pytest.approx(daily['productivity_score']), day['date']
+    breakdown = stats['daily_breakdown']
+    assert stats['total_focus_sessions'] == sum(day['focus_sessions'] for day in breakdown)
+    assert stats['total_focus_time'] == sum(day['total_focus_time'] for day in breakdown)
+    assert stats['active_days'] == sum(1 for day in breakdown if day['focus_sessions'])
+
+@pytest.mark.parametrize('timezone', [None, 'America/New_York'])
+def test_yearly_stats_match_daily_stats(engine, timezone):
+    manager = engine(timezone)
+    stats = manager.get_yearly_stats(2024)
+    assert [day['date'] for day in stats['daily_breakdown']] == [
+        (date(2024, 1, 1) + timedelta(days=i)).isoformat() for i in range(366)
+    ]
+    assert stats['total_focus_sessions'] > 0
+    assert_matches_daily_stats(manager, stats)
+
+@pytest.mark.parametrize('timezone', [None, 'Asia/Kolkata'])
+@pytest.mark.parametrize('month', [2, 3, 12])
+def test_monthly_stats_match_daily_stats(engine, timezone, month):
+    manager = engine(timezone)
+    stats = manager.get_monthly_stats(2024, month)
+    assert stats['daily_breakdown'][0]['date'] == f'2024-{month:02d}-01'
+    assert len(stats['daily_breakdown']) == {2: 29, 3: 31, 12: 31}[month]
+    assert_matches_daily_stats(manager, stats)
+    yearly = manager.get_yearly_stats(2024)['daily_breakdown']
+    assert stats['daily_breakdown'] == [day for day in yearly if day['date'].startswith(f'2024-{month:02d}')]
@@ -0,0 +1,175 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from api import FocusTimerAPI
+from config import DEFAULTS
+from shared_store import get_shared_store
+from timer_manager import DEFAULT_SETTINGS
+
+FOCUS_SECONDS = DEFAULT_SETTINGS['focus_duration'] * 60
+
+@pytest.fixture
+def api(tmp_path, clock):
+    database = str(tmp_path / 'sessions.db')
+    config = {
+        **DEFAULTS,
+        'storage': dict(DEFAULTS['storage'], engine='sqlite', database=database,
+                        checkpoint_dir=str(tmp_path / 'timers'))
+    }
+    yield FocusTimerAPI(config, clock)
+    get_shared_store(database).close()
+
+def call(api, method: str, target: str, body: bytes = b'', **headers):
+    response = api.dispatch(method, target, headers, body)
+    payload = json.loads(response.body) if response.body else None
+    return response, payload
+
+def test_memory_engine_is_refused(tmp_path):
+    config = {**DEFAULTS, 'storage': dict(DEFAULTS['storage'], session_log=str(tmp_path / 'sessions.jsonl'))}
+    with pytest.raises(ValueError, match='sqlite'):
+        FocusTimerAPI(config)
+
+def test_timer_routes_drive_the_scheduler(api, clock):
+    response, state = call(api, 'GET', '/api/timer')
+    assert response.status == HTTPStatus.OK
+    assert state['state'] == 'stopped'
+
+    _, state = call(api, 'POST', '/api/timer/start')
+    assert state['state'] == 'running'
+    assert api.scheduler.next_deadline() == clock.now + FOCUS_SECONDS * 1_000_000_000
+    clock.advance(60)
+    _, state = call(api, 'POST', '/api/timer/pause')
+    assert state == dict(state, state='paused', remaining_seconds=FOCUS_SECONDS - 60)
+
+    _, state = call(api, 'POST', '/api/timer/next')
+    assert (state['state'], state['session_type']) == ('stopped', 'short_break')
+    _, state = call(api, 'POST', '/api/timer/reset')
+    assert (state['state'], state['session_type'], state['session_count']) == ('stopped', 'focus', 0)
+    # The skipped session's deadline is stale and must not complete anything
+    clock.advance(FOCUS_SECONDS)
+    assert api.scheduler.run_due() == 0
+    assert call(api, 'GET', '/api/sessions/recent')[1] == []
+
+@pytest.mark.parametrize('route, method', [('reset', 'reset'), ('next', 'skip'), ('stop', 'stop')])
+def test_transitions_go_through_the_scheduler(api, monkeypatch, route, method):
+    call(api, 'POST', '/api/timer/start?user=alice')
+    calls = []
+    monkeypatch.setattr(api.scheduler, method, calls.append)
+    response, _ = call(api, 'POST', f'/api/timer/{route}?user=alice')
+    assert response.status == HTTPStatus.OK
+    assert calls == ['alice']
+
+def test_completed_sessions_are_logged_per_user(api, clock):
+    call(api, 'POST', '/api/timer/start?user=alice', json.dumps({'focus_duration': 1}).encode())
+    clock.advance(60)
+    assert api.scheduler.run_due() == 1
+    _, sessions = call(api, 'GET', '/api/sessions/recent?user=alice')
+    assert [(s['session_type'], s['duration']) for s in sessions] == [('focus', 60)]
+    assert call(api, 'GET', '/api/sessions/recent')[1] == []
+    assert call(api, 'GET', '/api/timer?user=alice')[1]['session_type'] == 'short_break'
+
+def test_get_with_a_matching_etag_is_not_modified(api):
+    response, _ = call(api, 'GET', '/api/timer')
+    etag = response.headers['ETag']
+    for header in (etag, f'W/{etag}', f'"other", {etag}', '*'):
+        revalidated, _ = call(api, 'GET', '/api/timer', **{'if-none-match': header})
+        assert revalidated.status == HTTPStatus.NOT_MODIFIED
+        assert revalidated.body == b''
+        assert revalidated.headers['ETag'] == etag
+
+    call(api, 'POST', '/api/timer/start')
+    changed, _ = call(api, 'GET', '/api/timer', **{'if-none-match': etag})
+    assert changed.status == HTTPStatus.OK
+    assert changed.headers['ETag'] != etag
+    # Only GETs revalidate
+    response, _ = call(api, 'POST', '/api/timer/pause', **{'if-none-match': '*'})
+    assert response.status == HTTPStatus.OK
+
+@pytest.mark.parametrize('method, target, body, status', [
+    ('GET', '/api/nothing', b'', HTTPStatus.NOT_FOUND),
+    ('GET', '/api/timer/start', b'', HTTPStatus.METHOD_NOT_ALLOWED),
+    ('DELETE', '/api/timer', b'', HTTPStatus.METHOD_NOT_ALLOWED),
+    ('POST', '/api/timer/start', b'{', HTTPStatus.BAD_REQUEST),
+    ('POST', '/api/timer/start', b'[25]', HTTPStatus.BAD_REQUEST),
+    ('POST', '/api/timer/start', b'{"focus_minutes": 25}', HTTPStatus.BAD_REQUEST),
+    ('POST', '/api/timer/start', b'{"focus_duration": 0}', HTTPStatus.BAD_REQUEST),
+    ('POST', '/api/timer/start', b'{"auto_start_breaks": 1}', HTTPStatus.BAD_REQUEST),
+    ('GET', '/api/stats/daily?date=yesterday', b'', HTTPStatus.BAD_REQUEST),
+    ('GET', '/api/sessions/recent?limit=0', b'', HTTPStatus.BAD_REQUEST),
+    ('GET', '/api/sessions/recent?limit=-5', b'', HTTPStatus.BAD_REQUEST),
+    ('GET', '/api/export?format=xml', b'', HTTPStatus.BAD_REQUEST),
+])
+def test_errors_are_json_with_their_status(api, method, target, body, status):
+    response, payload = call(api, method, target, body)
+    assert response.status == status
+    assert response.headers['Content-Type'] == 'application/json'
+    assert payload['error']
+
+def test_starting_a_running_timer_conflicts(api):
+    call(api, 'POST', '/api/timer/start')
+    response, payload = call(api, 'POST', '/api/timer/start')
+    assert response.status == HTTPStatus.CONFLICT
+    assert payload == {'error': 'Timer is already running'}
+
+def test_unexpected_errors_are_500s(api, monkeypatch, caplog):
+    monkeypatch.setattr(api, 'streaks', lambda user, query, body: 1 / 0)
+    api.routes[('GET', '/api/streaks')] = api.streaks
+    response, payload = call(api, 'GET', '/api/streaks')
+    assert response.status == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert payload == {'error': 'Internal Server Error'}
+    assert 'ZeroDivisionError' in caplog.text
+
+def test_sessions_logged_by_another_process_change_the_etag(api, tmp_path):
+    from sqlite_manager import SQLiteDataManager
+    response, sessions = call(api, 'GET', '/api/sessions/recent')
+    assert sessions == []
+    # The Streamlit app logging through its own connection pool
+    app = SQLiteDataManager(str(tmp_path / 'sessions.db'))
+    app.log_session({'session_type': 'focus', 'duration': 1500, 'start_time': '2024-03-04T09:00:00'})
+    app.close()
+    changed, sessions = call(api, 'GET', '/api/sessions/recent', **{'if-none-match': response.headers['ETag']})
+    assert changed.status == HTTPStatus.OK
+    assert len(sessions) == 1
+
+def app_timer(tmp_path, clock):
+    """The Streamlit app's own copy of alice's timer"""
+    from checkpoints import CheckpointStore
+    return CheckpointStore(str(tmp_path / 'timers')).timer('alice', clock)
+
+def test_a_pause_in_the_app_reaches_the_scheduler(api, tmp_path, clock):
+    call(api, 'POST', '/api/timer/start?user=alice', json.dumps({'focus_duration': 1}).encode())
+    timer = app_timer(tmp_path, clock)
+    clock.advance(20)
+    timer.pause_timer()
+    clock.advance(60)
+    assert api.scheduler.run_due() == 0
+    _, state = call(api, 'GET', '/api/timer?user=alice')
+    assert (state['state'], state['remaining_seconds']) == ('paused', 40)
+    assert call(api, 'GET', '/api/sessions/recent?user=alice')[1] == []
+
+    timer.stop_timer()
+    assert call(api, 'GET', '/api/timer?user=alice')[1]['state'] == 'stopped'
+
+def test_timers_started_in_the_app_run_with_its_settings(api, tmp_path, clock):
+    call(api, 'GET', '/api/timer?user=alice')
+    timer = app_timer(tmp_path, clock)
+    timer.start_timer(dict(DEFAULT_SETTINGS, focus_duration=1, auto_start_breaks=True))
+    # Any request for the timer picks up the start and queues its deadline
+    assert call(api, 'GET', '/api/timer?user=alice')[1]['duration'] == 60
+    clock.advance(60)
+    assert api.scheduler.run_due() == 1
+    _, state = call(api, 'GET', '/api/timer?user=alice')
+    assert (state['state'], state['session_type']) == ('running', 'short_break')
+    _, sessions = call(api, 'GET', '/api/sessions/recent?user=alice')
+    assert [(s['session_type'], s['duration']) for s in sessions] == [('focus', 60)]
+
+def test_a_completion_in_the_app_is_not_completed_again(api, tmp_path, clock):
+    call(api, 'POST', '/api/timer/start?user=alice', json.dumps({'focus_duration': 1}).encode())
+    timer = app_timer(tmp_path, clock)
+    clock.advance(60)
+    assert timer.update()
+    assert api.scheduler.run_due() == 0
+    _, state = call(api, 'GET', '/api/timer?user=alice')
+    assert (state['state'], state['session_type']) == ('completed', 'short_break')
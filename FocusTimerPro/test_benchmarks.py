@@ -0,0 +1,220 @@
+"""
+pytest-benchmark suite for the data layer and timer hot paths.
+Every benchmark gets a freshly built manager, so writes in one never skew another.
+
+    pytest test_benchmarks.py --benchmark-autosave
+    pytest test_benchmarks.py --benchmark-compare --benchmark-compare-fail=mean:20%
+
+History sizes come from FOCUS_TIMER_BENCH_SIZES (default 1000), e.g.
+FOCUS_TIMER_BENCH_SIZES=1000,10000,100000,1000000. Run the rest of the
+suite without them with --benchmark-skip.
+"""
+
+import itertools
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from benchmarks import generate_sessions, count_parses, running_timer, cold_start_storage, run_cold_start
+from data_manager import DataManager, rollup_deltas
+from day_buckets import DayBuckets
+from stats_cache import CachedDataManager
+
+SIZES = [int(size) for size in os.environ.get('FOCUS_TIMER_BENCH_SIZES', '1000').split(',')]
+
+@lru_cache(maxsize=None)
+def history(size: int) -> tuple:
+    """Synthetic sessions, generated once per size and shared read-only"""
+    return tuple(generate_sessions(size))
+
+def build_manager(size: int, engine: str = 'memory'):
+    if engine == 'sqlite':
+        from sqlite_manager import SQLiteDataManager
+        manager = SQLiteDataManager(':memory:')
+    else:
+        manager = DataManager()
+    manager.import_sessions(history(size))
+    return manager
+
+@pytest.fixture(params=SIZES, ids=lambda size: f'{size}_sessions')
+def size(request) -> int:
+    return request.param
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def manager(request, size):
+    manager = build_manager(size, request.param)
+    yield manager
+    if request.param == 'sqlite':
+        manager.close()
+
+@pytest.fixture
+def memory_manager(size) -> DataManager:
+    return build_manager(size)
+
+def new_sessions(start: datetime, count: int, step: timedelta) -> list:
+    return [
+        {'session_type': 'focus', 'duration': 1500, 'start_time': (start + step * i).isoformat(),
+         'end_time': None, 'completed': True}
+        for i in range(count)
+    ]
+
+def test_log_session(benchmark, manager):
+    """Logging one completed session"""
+    start = datetime.now().replace(hour=23, minute=0, second=0, microsecond=0)
+    sessions = iter(new_sessions(start, 1000, timedelta(seconds=1)))
+    benchmark.pedantic(manager.log_session, setup=lambda: ((next(sessions),), {}), rounds=200)
+
+def test_log_sessions(benchmark, manager):
+    """Logging a batch of 1,000 sessions with log_sessions"""
+    start = datetime.now().replace(hour=23, minute=30, second=0, microsecond=0)
+    batches = iter([new_sessions(start + timedelta(seconds=batch), 1000, timedelta(milliseconds=1))
+                    for batch in range(5)])
+    benchmark.pedantic(manager.log_sessions, setup=lambda: ((next(batches),), {}), rounds=5)
+
+def test_daily(benchmark, manager):
+    """Today's statistics"""
+    benchmark(manager.get_daily_stats)
+
+def test_weekly(benchmark, manager):
+    """This week's statistics"""
+    benchmark(manager.get_weekly_stats)
+
+def test_yearly(benchmark, manager):
+    """Year heatmap statistics"""
+    benchmark(manager.get_yearly_stats)
+
+def test_history(benchmark, manager):
+    """Last 30 days of sessions"""
+    benchmark(manager.get_session_history, 30)
+
+def test_recent(benchmark, manager):
+    """Recent Sessions panel"""
+    benchmark(manager.get_recent_sessions, 10)
+
+def test_streak(benchmark, manager):
+    """Current and longest streak lookup"""
+    benchmark(manager.get_streak_data)
+
+def test_import_dedup(benchmark, manager):
+    """Re-importing up to 10k already stored sessions, all skipped as duplicates"""
+    sessions = list(itertools.islice(manager.iter_sessions(), 10_000))
+    benchmark.pedantic(manager.import_data, args=({'sessions': sessions},), rounds=5)
+
+def test_export(benchmark, manager):
+    """Building the export_data dict"""
+    benchmark.pedantic(manager.export_data, rounds=3)
+
+def test_export_stream(benchmark, manager):
+    """Streaming a gzipped JSON-lines export"""
+    from exporter import iter_export
+    benchmark.pedantic(lambda: sum(len(chunk) for chunk in iter_export(manager, 'jsonl', 'gzip')), rounds=3)
+
+def test_render(benchmark, manager):
+    """Queries issued by one dashboard render"""
+    def render():
+        manager.get_daily_stats()
+        manager.get_weekly_stats()
+        manager.get_session_history(7)
+    benchmark(render)
+
+def test_render_records(benchmark, manager):
+    """Today's Progress and Recent Sessions, formatting pre-parsed records"""
+    def render():
+        manager.get_daily_stats()
+        for session in manager.get_recent_records(10):
+            session.start_datetime.strftime("%H:%M")
+    benchmark.extra_info['timestamp_parses'] = count_parses(render)
+    benchmark(render)
+
+def test_render_dicts(benchmark, manager):
+    """The same render formatting recent sessions from their ISO strings"""
+    def render():
+        manager.get_daily_stats()
+        for session in manager.get_recent_sessions(10):
+            datetime.fromisoformat(session['start_time']).strftime("%H:%M")
+    benchmark.extra_info['timestamp_parses'] = count_parses(render)
+    benchmark(render)
+
+def test_tick_rerun(benchmark, manager):
+    """Data work of one legacy full-page rerun while a timer runs"""
+    timer = running_timer()
+    def tick():
+        timer.update()
+        manager.get_daily_stats()
+        manager.get_recent_sessions(10)
+    benchmark(tick)
+
+def test_tick_cached(benchmark, manager):
+    """Data work of one legacy full-page rerun served by the stats cache"""
+    timer = running_timer()
+    cached = CachedDataManager(manager)
+    def tick():
+        timer.update()
+        cached.get_daily_stats()
+        cached.get_recent_sessions(10)
+    benchmark(tick)
+
+def test_tick_fragment(benchmark):
+    """Data work of one timer fragment tick"""
+    timer = running_timer()
+    def tick():
+        timer.update()
+        timer.get_remaining_time()
+        timer.get_progress()
+    benchmark(tick)
+
+def test_timer_update(benchmark):
+    """TimerManager.update on a running timer; OPS is its throughput"""
+    benchmark(running_timer().update)
+
+def test_checkpoint(benchmark):
+    """Snapshot and durably save a running timer, as on each state transition"""
+    from checkpoints import CheckpointStore
+    timer = running_timer()
+    with tempfile.TemporaryDirectory() as directory:
+        store = CheckpointStore(directory)
+        benchmark(lambda: store.save('default', timer.snapshot()))
+
+def test_rollup(benchmark, memory_manager):
+    """Bucket every stored session into server-local days"""
+    store = memory_manager.sessions
+    benchmark(lambda: rollup_deltas(zip(store.start, store.kind, store.duration)))
+
+def test_rollup_tz(benchmark, memory_manager):
+    """Bucket every stored session into days of a DST-observing time zone"""
+    store = memory_manager.sessions
+    days = DayBuckets('America/New_York')
+    benchmark(lambda: rollup_deltas(zip(store.start, store.kind, store.duration), days.day_of))
+
+def test_memory(benchmark, memory_manager):
+    """Bytes per session in the columnar store and as a list of dicts, in extra_info"""
+    store = memory_manager.sessions
+    sessions = memory_manager.export_data()['sessions']
+    dict_bytes = sys.getsizeof(sessions)
+    for session in sessions:
+        dict_bytes += sys.getsizeof(session)
+        dict_bytes += sum(sys.getsizeof(value) for value in session.values() if not isinstance(value, bool))
+    benchmark.extra_info['column_bytes_per_session'] = store.memory_bytes() / len(store)
+    benchmark.extra_info['dict_bytes_per_session'] = dict_bytes / len(sessions)
+    benchmark(store.memory_bytes)
+
+def test_cold_start_first_paint(benchmark, tmp_path):
+    """A new process up to the first timer paint, interpreter start included"""
+    storage = cold_start_storage(str(tmp_path), 0)
+    result = benchmark.pedantic(run_cold_start, args=(storage, 'paint'), rounds=5)
+    benchmark.extra_info['first_paint_ms'] = json.loads(result.stdout)['first_paint'] * 1000
+
+def test_cold_start_ready(benchmark, tmp_path, size):
+    """A new process up to a loaded history and the first statistics"""
+    storage = cold_start_storage(str(tmp_path), size)
+    result = benchmark.pedantic(run_cold_start, args=(storage, 'ready'), rounds=5)
+    timings = json.loads(result.stdout)
+    benchmark.extra_info['first_paint_ms'] = timings['first_paint'] * 1000
+    benchmark.extra_info['ready_ms'] = timings['ready'] * 1000
@@ -0,0 +1,123 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from checkpoints import CheckpointStore
+from timer_manager import TimerState, SessionType, DEFAULT_SETTINGS
+
+FOCUS_SECONDS = DEFAULT_SETTINGS['focus_duration'] * 60
+
+def restart(store: CheckpointStore, clock, downtime: float):
+    """Bring the timer back in a new process after `downtime` seconds"""
+    clock.restart(downtime)
+    return store.timer('alice', clock, clock.wall)
+
+def test_running_session_keeps_its_deadline_across_a_restart(tmp_path, clock):
+    store = CheckpointStore(str(tmp_path))
+    timer = store.timer('alice', clock, clock.wall)
+    timer.start_timer(DEFAULT_SETTINGS)
+    clock.advance(300)
+
+    timer = restart(store, clock, 60)
+    assert timer.is_running()
+    assert not timer.update()
+    assert timer.get_remaining_time() == FOCUS_SECONDS - 360
+    assert timer.next_deadline() == clock.now + (FOCUS_SECONDS - 360) * 1_000_000_000
+    clock.advance(FOCUS_SECONDS - 360)
+    assert timer.update()
+
+def test_paused_session_stays_paused_across_a_restart(tmp_path, clock):
+    store = CheckpointStore(str(tmp_path))
+    timer = store.timer('alice', clock, clock.wall)
+    timer.start_timer(DEFAULT_SETTINGS)
+    clock.advance(300)
+    timer.pause_timer()
+
+    timer = restart(store, clock, 3600)
+    assert timer.is_paused()
+    assert timer.get_remaining_time() == FOCUS_SECONDS - 300
+    clock.advance(60)
+    timer.start_timer(DEFAULT_SETTINGS)
+    assert timer.seconds_until_deadline() == FOCUS_SECONDS - 300
+
+def test_session_that_ended_during_a_restart_completes_at_its_deadline(tmp_path, clock):
+    store = CheckpointStore(str(tmp_path))
+    timer = store.timer('alice', clock, clock.wall)
+    timer.start_timer(DEFAULT_SETTINGS)
+    started = datetime.fromtimestamp(clock.wall_now)
+    clock.advance(600)
+
+    timer = restart(store, clock, 7200)
+    assert timer.is_running()
+    assert timer.get_remaining_time() == 0
+    assert timer.update()
+    assert timer.state == TimerState.COMPLETED
+    assert timer.current_session == SessionType.SHORT_BREAK
+    session = timer.get_completed_session_data()
+    assert datetime.fromisoformat(session['start_time']) == started
+    assert datetime.fromisoformat(session['end_time']) - started == timedelta(seconds=FOCUS_SECONDS)
+    # The completion is itself a transition, so a second restart does not complete it again
+    assert not restart(store, clock, 60).update()
+
+def test_only_transitions_are_written(tmp_path, clock, monkeypatch):
+    store = CheckpointStore(str(tmp_path))
+    saves = []
+    save = store.save
+    monkeypatch.setattr(store, 'save', lambda key, snapshot: saves.append(snapshot) or save(key, snapshot))
+    timer = store.timer('alice', clock, clock.wall)
+    timer.start_timer(DEFAULT_SETTINGS)
+    for _ in range(100):
+        clock.advance(1)
+        assert not timer.update()
+        timer.get_remaining_time()
+    assert [snapshot['state'] for snapshot in saves] == ['running']
+    timer.pause_timer()
+    assert [snapshot['state'] for snapshot in saves] == ['running', 'paused']
+
+def test_failed_save_keeps_the_old_checkpoint_and_no_temp_file(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    store.save('alice', {'state': 'stopped'})
+    with pytest.raises(TypeError):
+        store.save('alice', {'state': object()})
+    assert os.listdir(tmp_path) == ['alice.json']
+    assert store.load('alice') == {'state': 'stopped'}
+
+def test_unreadable_checkpoint_gives_a_new_timer(tmp_path, clock):
+    store = CheckpointStore(str(tmp_path))
+    (tmp_path / 'alice.json').write_text(json.dumps({'state': 'running'}))
+    timer = store.timer('alice', clock, clock.wall)
+    assert timer.state == TimerState.STOPPED
+    assert timer.current_session == SessionType.FOCUS
+
+def test_a_completion_restored_before_it_is_logged_keeps_its_session(tmp_path, clock):
+    store = CheckpointStore(str(tmp_path))
+    timer = store.timer('alice', clock, clock.wall)
+    timer.start_timer(DEFAULT_SETTINGS)
+    clock.advance(FOCUS_SECONDS + 5)
+    assert timer.update()
+    completed = timer.get_completed_session_data()
+
+    timer = restart(store, clock, 30)
+    assert timer.state == TimerState.COMPLETED
+    assert timer.current_session == SessionType.SHORT_BREAK
+    assert timer.get_completed_session_data() == completed
+    assert completed['session_type'] == 'focus'
+
+def test_refresh_picks_up_only_changes_saved_elsewhere(tmp_path, clock):
+    store = CheckpointStore(str(tmp_path))
+    timer = store.timer('alice', clock, clock.wall)
+    timer.start_timer(dict(DEFAULT_SETTINGS, focus_duration=1))
+    assert store.refresh('alice', timer, clock, clock.wall) is timer
+
+    # Another process pausing its own copy of the timer
+    other = CheckpointStore(str(tmp_path)).timer('alice', clock, clock.wall)
+    clock.advance(20)
+    other.pause_timer()
+    refreshed = store.refresh('alice', timer, clock, clock.wall)
+    assert refreshed is not timer
+    assert refreshed.is_paused()
+    assert refreshed.get_remaining_time() == 40
+    assert refreshed.settings['focus_duration'] == 1
+    assert store.refresh('alice', refreshed, clock, clock.wall) is refreshed
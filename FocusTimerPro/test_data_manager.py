@@ -0,0 +1,162 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from config import DEFAULTS
+from data_manager import DataManager, create_data_manager
+from retention import RetentionPolicy, SessionArchive
+from session_log import SessionLog
+
+START = datetime(2024, 3, 4, 9, 0)
+
+def session(minutes: int, session_type: str = 'focus', duration: int = 1500):
+    start = START + timedelta(minutes=minutes)
+    return {
+        'session_type': session_type,
+        'duration': duration,
+        'start_time': start.isoformat(),
+        'end_time': (start + timedelta(seconds=duration)).isoformat(),
+        'completed': True
+    }
+
+def memory_config(tmp_path, **retention):
+    return {
+        **DEFAULTS,
+        'storage': dict(DEFAULTS['storage'], session_log=str(tmp_path / 'sessions.jsonl')),
+        'retention': dict(DEFAULTS['retention'], archive=str(tmp_path / 'archive.jsonl'), **retention)
+    }
+
+def test_browser_sessions_of_one_user_share_a_manager(tmp_path):
+    config = memory_config(tmp_path)
+    assert create_data_manager(config) is create_data_manager(config, user='default')
+    assert create_data_manager(config, user='alice') is create_data_manager(config, user='alice')
+
+def test_users_cannot_see_each_others_sessions(tmp_path):
+    config = memory_config(tmp_path, policy='count', max_sessions=100)
+    alice = create_data_manager(config, user='alice')
+    bob = create_data_manager(config, user='bob/..')
+    alice.log_sessions([session(0), session(30)])
+    alice.set_daily_goals(focus_sessions=3)
+    bob.log_session(session(60, 'short_break', 300))
+    assert [item['start_time'] for item in alice.iter_sessions()] == [session(0)['start_time'], session(30)['start_time']]
+    assert [item['start_time'] for item in bob.iter_sessions()] == [session(60)['start_time']]
+    assert bob.daily_goals['focus_sessions'] != 3
+    assert create_data_manager(config).get_recent_sessions(10) == []
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['sessions@alice.jsonl', 'sessions@bob%2F...jsonl']
+    assert alice.archive.path == str(tmp_path / 'archive@alice.jsonl')
+
+def test_compaction_keeps_sessions_logged_by_other_browser_sessions(tmp_path):
+    config = memory_config(tmp_path)
+    first = create_data_manager(config)
+    second = create_data_manager(config)
+    for minutes in range(0, 300, 30):
+        first.log_session(session(minutes))
+        second.log_session(session(minutes + 15, 'short_break', 300))
+    # Goal changes supersede each other until the log is compacted
+    for goal in range(200):
+        first.set_daily_goals(focus_sessions=goal % 10 + 1)
+
+    reloaded = DataManager(SessionLog(str(tmp_path / 'sessions.jsonl')))
+    assert len(reloaded.sessions) == 20
+    assert reloaded.log.records < 200
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def manager(request):
+    if request.param == 'sqlite':
+        from sqlite_manager import SQLiteDataManager
+        manager = SQLiteDataManager(':memory:')
+        yield manager
+        manager.close()
+    else:
+        yield DataManager()
+
+@pytest.mark.parametrize('field, value', [
+    ('start_time', None),
+    ('start_time', 12345),
+    ('start_time', 'yesterday'),
+    ('end_time', 'later'),
+    ('logged_at', 1.5),
+    ('session_type', None),
+    ('duration', '1500')
+])
+def test_log_sessions_rejects_the_whole_batch_before_stamping_any(manager, field, value):
+    batch = [session(0), dict(session(30), **{field: value}), session(60)]
+    with pytest.raises(ValueError, match='Session 1 cannot be logged'):
+        manager.log_sessions(batch)
+    assert manager.export_data()['total_sessions'] == 0
+    assert not any('logged_at' in item for item in batch if item is not batch[1])
+
+def test_log_session_rejects_a_missing_start(manager):
+    with pytest.raises(ValueError):
+        manager.log_session(dict(session(0), start_time=None))
+    assert manager.get_recent_sessions() == []
+
+def test_datetimes_are_stored_as_iso_timestamps(manager):
+    manager.log_sessions([dict(session(0), start_time=START, end_time=START + timedelta(minutes=25))])
+    stored = manager.get_recent_sessions(1)[0]
+    assert stored['start_time'] == START.isoformat()
+    assert stored['end_time'] == (START + timedelta(minutes=25)).isoformat()
+
+def test_engines_skip_the_same_duplicates(manager):
+    manager.log_session(session(0))
+    manager.log_session(session(0))
+    assert manager.log_sessions([session(0), session(30), session(30), session(30, 'short_break', 300)]) == 2
+    assert manager.export_data()['total_sessions'] == 3
+    assert manager.get_daily_stats(START)['focus_sessions'] == 2
+
+def restartable(tmp_path, max_sessions: int):
+    return DataManager(
+        SessionLog(str(tmp_path / 'sessions.jsonl')),
+        RetentionPolicy(max_sessions=max_sessions),
+        SessionArchive(str(tmp_path / 'archive.jsonl'))
+    )
+
+def summary(manager: DataManager):
+    return (
+        sorted(manager._daily.items()),
+        manager.get_streak_data(),
+        [item['start_time'] for item in manager.iter_sessions()]
+    )
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_sessions_older_than_the_horizon_survive_a_restart(tmp_path, batch):
+    manager = restartable(tmp_path, max_sessions=100)
+    manager.log_sessions([session(60 * 12 * day + 30 * i) for day in range(25) for i in range(12)])
+    assert manager.archive.horizon > -math.inf
+    days = len(manager._daily)
+    # Two days before anything stored, and a session on an archived day
+    late = [session(-2 * 24 * 60), session(90, 'long_break', 900)]
+    if batch:
+        assert manager.log_sessions(late + [session(0)]) == 2
+    else:
+        for item in late + [session(0)]:
+            manager.log_session(item)
+    before = summary(manager)
+    assert len(before[0]) == days + 1
+    assert len(before[2]) == 302
+
+    manager.log.close()
+    assert summary(restartable(tmp_path, max_sessions=100)) == before
+
+def test_equivalent_timestamps_are_stored_once_in_local_time(manager):
+    start = START.replace(hour=23, minute=30)
+    spellings = [
+        start.isoformat(),
+        start.isoformat(sep=' '),
+        start.astimezone().isoformat(),
+        start.astimezone(timezone(timedelta(hours=-11))).isoformat()
+    ]
+    for spelling in spellings:
+        manager.log_session({'session_type': 'focus', 'duration': 1500, 'start_time': spelling})
+    assert manager.log_sessions([{'session_type': 'focus', 'duration': 1500, 'start_time': spellings[-1]}]) == 0
+    assert [item['start_time'] for item in manager.iter_sessions()] == [start.isoformat()]
+    assert manager.get_daily_stats(start)['focus_sessions'] == 1
+
+def test_time_zones_are_per_user(tmp_path):
+    config = memory_config(tmp_path)
+    alice = create_data_manager(config, user='alice')
+    bob = create_data_manager(config, user='bob')
+    alice.set_timezone('Asia/Tokyo')
+    assert alice.days.timezone == 'Asia/Tokyo'
+    assert bob.days.timezone is None
@@ -0,0 +1,74 @@
+import time
+from datetime import date, datetime, timezone
+
+import pytest
+
+from day_buckets import DayBuckets, EPOCH_ORDINAL, get_zone
+from session_store import to_epoch
+
+@pytest.fixture(autouse=True)
+def utc_server(monkeypatch):
+    """Run on a UTC server, so stored naive epochs are UTC ones"""
+    monkeypatch.setenv('TZ', 'UTC')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def day(value: date) -> int:
+    return value.toordinal() - EPOCH_ORDINAL
+
+def utc(*args) -> float:
+    return to_epoch(datetime(*args, tzinfo=timezone.utc))
+
+def day_lengths(days: DayBuckets, first: date, count: int):
+    boundaries = days.boundaries(day(first), day(first) + count - 1)
+    return [(end - start) / 3600 for start, end in zip(boundaries, boundaries[1:])]
+
+def test_dst_days_are_23_and_25_hours_long():
+    days = DayBuckets('America/New_York')
+    assert day_lengths(days, date(2024, 3, 9), 3) == [24, 23, 24]
+    assert day_lengths(days, date(2024, 11, 2), 3) == [24, 25, 24]
+
+def test_sessions_near_dst_midnights_land_on_local_days():
+    days = DayBuckets('America/New_York')
+    # 23:59 EST on the 9th, and 00:00 EST on the 10th, the short day
+    assert days.day_of(utc(2024, 3, 10, 4, 59)) == day(date(2024, 3, 9))
+    assert days.day_of(utc(2024, 3, 10, 5, 0)) == day(date(2024, 3, 10))
+    # 23:30 EST ends the long day; its midnight was 00:00 EDT
+    assert days.day_of(utc(2024, 11, 4, 4, 30)) == day(date(2024, 11, 3))
+    assert days.day_of(utc(2024, 11, 3, 3, 59)) == day(date(2024, 11, 2))
+    assert days.day_of(utc(2024, 11, 3, 4, 0)) == day(date(2024, 11, 3))
+
+def test_a_day_whose_midnight_is_skipped_starts_at_the_transition():
+    # Chile moves its clocks from 00:00 to 01:00, so 2024-09-08 has no midnight
+    days = DayBuckets('America/Santiago')
+    assert days.midnight(day(date(2024, 9, 8))) == utc(2024, 9, 8, 4, 0)
+    assert day_lengths(days, date(2024, 9, 7), 3) == [24, 23, 24]
+    assert days.day_of(utc(2024, 9, 8, 3, 59)) == day(date(2024, 9, 7))
+
+def test_days_far_from_the_precomputed_span_are_covered():
+    days = DayBuckets('Australia/Lord_Howe')
+    assert days.day_of(utc(2024, 1, 1, 12)) == day(date(2024, 1, 1))
+    assert days.day_of(utc(1990, 6, 1, 12)) == day(date(1990, 6, 1))
+    assert days.day_of(utc(2060, 6, 1, 12)) == day(date(2060, 6, 1))
+    # Half-hour DST shifts: 2024-04-07 gains 30 minutes and 2024-10-06 loses them
+    assert day_lengths(days, date(2024, 4, 7), 1) == [24.5]
+    assert day_lengths(days, date(2024, 10, 6), 1) == [23.5]
+
+def test_without_a_time_zone_days_are_server_days():
+    days = DayBuckets()
+    assert days.zone is None
+    assert days.day_of(utc(2024, 3, 10, 23, 59)) == day(date(2024, 3, 10))
+    assert day_lengths(days, date(2024, 3, 9), 3) == [24, 24, 24]
+    assert days.local_time(datetime(2024, 3, 10, 23, 59)) == datetime(2024, 3, 10, 23, 59)
+
+def test_local_time_follows_the_zone_across_dst():
+    days = DayBuckets('Europe/Berlin')
+    assert days.local_time(datetime(2024, 3, 31, 0, 30)) == datetime(2024, 3, 31, 1, 30)
+    assert days.local_time(datetime(2024, 3, 31, 1, 30)) == datetime(2024, 3, 31, 3, 30)
+
+def test_unknown_zones_are_rejected():
+    assert get_zone('') is None
+    with pytest.raises(ValueError, match='Unknown time zone'):
+        DayBuckets('Mars/Olympus_Mons')
@@ -0,0 +1,112 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from data_manager import DataManager
+from exporter import CSV_FIELDS, iter_export, export_file_info, zstd_available
+from importer import read_records
+
+START = datetime(2024, 3, 4, 9, 0)
+
+COMPRESSIONS = [None, 'gzip', pytest.param('zstd', marks=pytest.mark.skipif(
+    not zstd_available(), reason='needs the zstandard package'))]
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def manager(request):
+    if request.param == 'sqlite':
+        from sqlite_manager import SQLiteDataManager
+        manager = SQLiteDataManager(':memory:')
+        request.addfinalizer(manager.close)
+    else:
+        manager = DataManager()
+    # Enough sessions for several output chunks
+    manager.import_sessions(
+        {'session_type': ('focus', 'short_break', 'long_break')[i % 3], 'duration': 300 + i,
+         'start_time': (START + timedelta(minutes=30 * i)).isoformat(),
+         'end_time': (START + timedelta(minutes=30 * i, seconds=300 + i)).isoformat(), 'completed': True}
+        for i in range(3000)
+    )
+    manager.set_daily_goals(focus_sessions=5)
+    return manager
+
+def export_bytes(manager, fmt, compression=None, start=None, end=None) -> bytes:
+    return b''.join(iter_export(manager, fmt, compression, start, end))
+
+def decompress(data: bytes, compression) -> bytes:
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    if compression == 'zstd':
+        import zstandard
+        return zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)).read()
+    return data
+
+@pytest.mark.parametrize('compression', COMPRESSIONS)
+@pytest.mark.parametrize('fmt', ['json', 'jsonl'])
+def test_json_exports_import_back(manager, fmt, compression):
+    data = export_bytes(manager, fmt, compression)
+    records = list(read_records(io.BytesIO(data)))
+    assert records[:-1] == list(manager.iter_sessions())
+    assert records[-1] == {'daily_goals': manager.daily_goals}
+
+def test_json_export_matches_export_data(manager):
+    document = json.loads(export_bytes(manager, 'json'))
+    expected = manager.export_data()
+    assert document.keys() == expected.keys()
+    for key in ('sessions', 'daily_goals', 'total_sessions', 'date_range'):
+        assert document[key] == expected[key]
+
+@pytest.mark.parametrize('compression', COMPRESSIONS)
+def test_csv_export(manager, compression):
+    text = decompress(export_bytes(manager, 'csv', compression), compression).decode('utf-8')
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert tuple(rows[0]) == CSV_FIELDS
+    assert [(row['start_time'], int(row['duration'])) for row in rows] == [
+        (session['start_time'], session['duration']) for session in manager.iter_sessions()
+    ]
+
+@pytest.mark.parametrize('fmt', ['json', 'jsonl', 'csv'])
+def test_exports_stream_in_chunks(manager, fmt):
+    chunks = list(iter_export(manager, fmt))
+    assert len(chunks) > 1
+    assert max(len(chunk) for chunk in chunks) < 2 * 65536
+
+@pytest.mark.parametrize('fmt', ['json', 'jsonl', 'csv'])
+def test_empty_exports(fmt):
+    data = export_bytes(DataManager(), fmt)
+    if fmt == 'json':
+        assert json.loads(data)['total_sessions'] == 0
+    elif fmt == 'jsonl':
+        assert list(read_records(io.BytesIO(data))) == [{'daily_goals': DataManager().daily_goals}]
+    else:
+        assert data.decode('utf-8').strip() == ','.join(CSV_FIELDS)
+
+def test_date_range_is_half_open(manager):
+    start, end = START + timedelta(days=1), START + timedelta(days=2)
+    document = json.loads(export_bytes(manager, 'json', start=start, end=end))
+    assert document['total_sessions'] == 48
+    assert document['date_range'] == {'first_session': start.isoformat(),
+                                      'last_session': (end - timedelta(minutes=30)).isoformat()}
+
+@pytest.mark.parametrize('fmt, compression, expected', [
+    ('json', None, {'mime': 'application/json', 'extension': 'json'}),
+    ('jsonl', 'gzip', {'mime': 'application/gzip', 'extension': 'jsonl.gz'}),
+    ('csv', 'zstd', {'mime': 'application/zstd', 'extension': 'csv.zst'})
+])
+def test_export_file_info(fmt, compression, expected):
+    assert export_file_info(fmt, compression) == expected
+
+@pytest.mark.parametrize('fmt, compression', [('xml', None), ('json', 'brotli')])
+def test_unknown_options_are_rejected(fmt, compression):
+    with pytest.raises(ValueError):
+        iter_export(DataManager(), fmt, compression)
+
+@pytest.mark.skipif(zstd_available(), reason='zstandard is installed')
+def test_zstd_needs_the_zstandard_package():
+    with pytest.raises(ValueError, match='zstandard'):
+        iter_export(DataManager(), 'json', 'zstd')
+    with pytest.raises(ValueError, match='zstandard'):
+        list(read_records(io.BytesIO(b'\x28\xb5\x2f\xfd' + b'\0' * 16)))
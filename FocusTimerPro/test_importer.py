@@ -0,0 +1,101 @@
+import gzip
+import io
+import json
+
+import pytest
+
+from data_manager import DataManager
+from importer import read_records, import_file
+
+SESSIONS = [
+    {'session_type': 'focus' if i % 2 else 'short_break', 'duration': 1500 + i * 7,
+     'start_time': f'2024-03-{1 + i // 24:02d}T{i % 24:02d}:00:00', 'end_time': None,
+     'completed': True, 'note': 'braces } and "quotes" [' * (i % 3)}
+    for i in range(200)
+]
+GOALS = {'focus_sessions': 6, 'focus_minutes': 150}
+
+class Trickle(io.TextIOBase):
+    """A text stream that returns a few characters per read, splitting every token somewhere"""
+
+    def __init__(self, text: str, step: int):
+        self.text = text
+        self.step = step
+        self.pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        chunk = self.text[self.pos:self.pos + self.step]
+        self.pos += len(chunk)
+        return chunk
+
+def opened(text: str, how: str):
+    if how == 'text':
+        return io.StringIO(text)
+    if how == 'bytes':
+        return io.BytesIO(text.encode('utf-8'))
+    if how == 'gzip':
+        return io.BytesIO(gzip.compress(text.encode('utf-8')))
+    return Trickle(text, int(how.removeprefix('trickle-')))
+
+READERS = ['text', 'bytes', 'gzip', 'trickle-1', 'trickle-7', 'trickle-4096']
+
+def document(order):
+    fields = {'export_timestamp': '2024-04-01T00:00:00', 'sessions': SESSIONS, 'daily_goals': GOALS,
+              'total_sessions': len(SESSIONS)}
+    return json.dumps({key: fields[key] for key in order}, indent=1)
+
+@pytest.mark.parametrize('how', READERS)
+@pytest.mark.parametrize('order', [
+    ('export_timestamp', 'sessions', 'daily_goals', 'total_sessions'),
+    ('daily_goals', 'total_sessions', 'sessions', 'export_timestamp'),
+    ('sessions', 'daily_goals')
+])
+def test_export_documents_stream_sessions_then_goals(how, order):
+    records = list(read_records(opened(document(order), how)))
+    assert records == SESSIONS + [{'daily_goals': GOALS}]
+
+@pytest.mark.parametrize('how', READERS)
+def test_json_lines(how):
+    lines = [json.dumps(session) for session in SESSIONS[:50]]
+    lines.insert(20, json.dumps({'daily_goals': GOALS}))
+    text = '\n'.join(lines) + '\n'
+    assert list(read_records(opened(text, how))) == SESSIONS[:20] + [{'daily_goals': GOALS}] + SESSIONS[20:50]
+
+@pytest.mark.parametrize('text', ['', '  \n', '{"sessions": []}'])
+def test_empty_input(text):
+    assert list(read_records(io.StringIO(text))) == []
+
+def test_numbers_split_at_a_chunk_edge_are_read_whole():
+    text = json.dumps({'sessions': [{'duration': 123456789}] * 3})
+    assert list(read_records(Trickle(text, 26))) == [{'duration': 123456789}] * 3
+
+@pytest.mark.parametrize('text', ['{"sessions": [{"duration": 1}', '{"sessions" [', '[1, 2]'])
+def test_truncated_or_malformed_input_raises_value_error(text):
+    with pytest.raises(ValueError):
+        list(read_records(Trickle(text, 3)))
+
+def test_import_file_adds_sessions_and_goals():
+    manager = DataManager()
+    binary = io.BytesIO(gzip.compress(document(('daily_goals', 'sessions')).encode('utf-8')))
+    assert import_file(manager, binary, batch_size=64) == len(SESSIONS)
+    assert manager.daily_goals == GOALS
+    assert import_file(manager, io.StringIO(document(('sessions',))), batch_size=64) == 0
+
+@pytest.mark.parametrize('engine', ['memory', 'sqlite'])
+def test_a_malformed_session_stops_the_import_before_its_batch(engine):
+    if engine == 'sqlite':
+        from sqlite_manager import SQLiteDataManager
+        manager = SQLiteDataManager(':memory:')
+    else:
+        manager = DataManager()
+    sessions = [dict(session) for session in SESSIONS]
+    del sessions[150]['start_time']
+    with pytest.raises(ValueError, match='Session 150 cannot be imported: missing start_time'):
+        manager.import_sessions(sessions, batch_size=64)
+    # The first two batches were stored, nothing of the third
+    assert len(list(manager.iter_sessions())) == 128
+    if engine == 'sqlite':
+        manager.close()
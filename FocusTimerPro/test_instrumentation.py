@@ -0,0 +1,50 @@
+from data_manager import DataManager
+from instrumentation import Metrics, InstrumentedDataManager, RerunProfile
+
+def sessions(count: int):
+    return [
+        {'session_type': 'focus', 'duration': 1500, 'start_time': f'2024-03-04T{9 + i // 60:02d}:{i % 60:02d}:00'}
+        for i in range(count)
+    ]
+
+def test_iterators_are_counted_and_timed_as_they_are_consumed():
+    metrics = Metrics()
+    manager = InstrumentedDataManager(DataManager(), metrics)
+    manager.import_sessions(sessions(30))
+    iterator = manager.iter_sessions()
+    assert 'iter_sessions' not in metrics.call_count
+    assert len(list(iterator)) == 30
+    assert metrics.call_count['iter_sessions'] == 1
+    assert metrics.call_rows['iter_sessions'] == 30
+    assert metrics.call_seconds['iter_sessions'] > 0
+
+def test_abandoned_iterators_count_the_rows_they_yielded():
+    metrics = Metrics()
+    manager = InstrumentedDataManager(DataManager(), metrics)
+    manager.import_sessions(sessions(30))
+    iterator = manager.iter_sessions()
+    next(iterator)
+    next(iterator)
+    iterator.close()
+    assert metrics.call_rows['iter_sessions'] == 2
+
+def test_rows_returned_by_lists_and_exports():
+    metrics = Metrics()
+    manager = InstrumentedDataManager(DataManager(), metrics)
+    manager.import_sessions(sessions(30))
+    manager.get_recent_sessions(10)
+    manager.export_data()
+    manager.get_daily_stats()
+    assert metrics.call_rows == {'import_sessions': 0, 'get_recent_sessions': 10, 'export_data': 30,
+                                 'get_daily_stats': 0}
+    assert 'focus_timer_data_rows_returned_total{method="export_data"} 30' in metrics.prometheus_text()
+
+def test_metrics_file_is_rewritten_at_most_every_write_interval(tmp_path):
+    path = tmp_path / 'metrics.prom'
+    metrics = Metrics(str(path), write_interval=3600)
+    RerunProfile(metrics).finish()
+    assert 'focus_timer_reruns_total 1' in path.read_text()
+    RerunProfile(metrics).finish()
+    assert 'focus_timer_reruns_total 1' in path.read_text()
+    metrics.write(force=True)
+    assert 'focus_timer_reruns_total 2' in path.read_text()
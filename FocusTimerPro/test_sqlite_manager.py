@@ -0,0 +1,74 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+from sqlite_manager import SQLiteDataManager
+
+START = datetime(2024, 3, 4, 9, 0)
+
+def sessions(count: int):
+    # Pairs of sessions share a start time so batches split between equal keys
+    return [
+        {
+            'session_type': 'focus' if i % 2 == 0 else 'short_break',
+            'duration': 1500 if i % 2 == 0 else 300,
+            'start_time': (START + timedelta(minutes=30 * (i // 2))).isoformat(),
+            'completed': True
+        }
+        for i in range(count)
+    ]
+
+def test_iter_sessions_returns_every_row_in_start_order_across_batches():
+    manager = SQLiteDataManager(':memory:')
+    manager.import_sessions(sessions(25))
+    iterated = list(manager.iter_sessions(batch_size=4))
+    assert iterated == manager.export_data()['sessions']
+    assert len(iterated) == 25
+
+def test_half_consumed_iterator_does_not_hold_a_pooled_connection():
+    # An in-memory database has a pool of one connection
+    manager = SQLiteDataManager(':memory:')
+    manager.import_sessions(sessions(25))
+    iterator = manager.iter_sessions(batch_size=4)
+    next(iterator)
+    manager.pool.timeout = 0.1
+    assert manager.get_recent_sessions(1)[0]['start_time'] == sessions(25)[-1]['start_time']
+    assert len(list(iterator)) == 24
+
+def test_iter_sessions_filters_by_date_range():
+    manager = SQLiteDataManager(':memory:')
+    manager.import_sessions(sessions(25))
+    iterated = list(manager.iter_sessions(START + timedelta(hours=1), START + timedelta(hours=3), batch_size=2))
+    assert [session['start_time'] for session in iterated] == sorted(
+        session['start_time'] for session in sessions(25)
+        if START + timedelta(hours=1) <= datetime.fromisoformat(session['start_time']) < START + timedelta(hours=3)
+    )
+
+def test_zoned_yearly_stats_fit_the_old_999_variable_limit():
+    manager = SQLiteDataManager(':memory:', timezone='America/New_York')
+    with manager.pool.connection() as conn:
+        conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+    everyday = [
+        {'session_type': 'focus', 'duration': 1500, 'start_time': (datetime(2024, 1, 1, 12) + timedelta(days=i)).isoformat()}
+        for i in range(366)
+    ]
+    manager.import_sessions(everyday)
+    stats = manager.get_yearly_stats(2024)
+    assert stats['total_focus_sessions'] == 366
+    assert stats['active_days'] == 366
+
+def test_cached_results_see_writes_made_through_another_pool(tmp_path):
+    from stats_cache import CachedDataManager
+    path = str(tmp_path / 'shared.db')
+    reader, writer = SQLiteDataManager(path), SQLiteDataManager(path)
+    cached = CachedDataManager(reader)
+    assert cached.get_recent_sessions(10) == []
+    version = reader.version
+    writer.log_session(sessions(1)[0])
+    assert reader.version == version + 1
+    assert len(cached.get_recent_sessions(10)) == 1
+    # Another user's writes leave this user's generation alone
+    alice = SQLiteDataManager(path, user='alice')
+    alice.log_session(sessions(1)[0])
+    assert reader.version == version + 1
+    for manager in (reader, writer, alice):
+        manager.close()
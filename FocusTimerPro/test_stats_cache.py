@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from data_manager import DataManager
+from stats_cache import CachedDataManager
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def manager(request, clock):
+    if request.param == 'sqlite':
+        from sqlite_manager import SQLiteDataManager
+        manager = SQLiteDataManager(':memory:')
+        request.addfinalizer(manager.close)
+        return manager
+    return DataManager()
+
+def focus_at(when: datetime):
+    return {'session_type': 'focus', 'duration': 1500, 'start_time': when.isoformat()}
+
+def test_repeated_queries_are_hits_sharing_one_result(manager):
+    cached = CachedDataManager(manager)
+    first = cached.get_weekly_stats()
+    assert cached.get_weekly_stats() is first
+    cached.get_recent_sessions(10)
+    cached.get_recent_sessions(limit=10)
+    cached.get_recent_sessions(5)
+    assert cached.cache_info() == {'hits': 1, 'misses': 4, 'evictions': 0, 'invalidations': 0,
+                                   'entries': 4, 'max_entries': 128}
+
+def test_a_write_starts_a_new_generation(manager, clock):
+    cached = CachedDataManager(manager)
+    assert cached.get_daily_stats()['focus_sessions'] == 0
+    assert cached.get_streak_data()['current_streak'] == 0
+    cached.log_session(focus_at(datetime.fromtimestamp(clock.wall())))
+    assert cached.get_daily_stats()['focus_sessions'] == 1
+    assert cached.get_streak_data()['current_streak'] == 1
+    assert cached.cache_info()['invalidations'] == 1
+    assert cached.cache_info()['misses'] == 4
+
+def test_the_cache_rolls_over_at_midnight_without_writes(manager, clock):
+    now = datetime.fromtimestamp(clock.wall())
+    before_midnight = datetime.combine(now.date(), datetime.min.time()) + timedelta(days=1, minutes=-5)
+    clock.advance((before_midnight - now).total_seconds())
+    manager.log_session(focus_at(before_midnight - timedelta(hours=1)))
+    cached = CachedDataManager(manager)
+    assert cached.get_daily_stats()['focus_sessions'] == 1
+    assert cached.get_streak_data()['current_streak'] == 1
+    clock.advance(60)
+    assert cached.get_daily_stats()['focus_sessions'] == 1
+    assert cached.hits == 1
+
+    # Past midnight the stored sessions belong to yesterday
+    clock.advance(5 * 60)
+    assert cached.get_daily_stats()['focus_sessions'] == 0
+    assert cached.get_streak_data() == {'current_streak': 0, 'longest_streak': 1}
+    assert cached.cache_info()['invalidations'] == 1
+
+def test_least_recently_used_entry_is_evicted(manager):
+    cached = CachedDataManager(manager, max_entries=2)
+    cached.get_recent_sessions(1)
+    cached.get_recent_sessions(2)
+    cached.get_recent_sessions(1)
+    cached.get_recent_sessions(3)
+    assert cached.cache_info()['evictions'] == 1
+    hits = cached.hits
+    cached.get_recent_sessions(1)
+    assert cached.hits == hits + 1
+    cached.get_recent_sessions(2)
+    assert cached.hits == hits + 1
+    assert cached.cache_info()['entries'] == 2
+
+def test_time_of_day_queries_and_writes_pass_through(manager):
+    cached = CachedDataManager(manager)
+    cached.get_session_history(30)
+    cached.get_session_history(30)
+    cached.set_daily_goals(focus_sessions=3)
+    assert manager.daily_goals['focus_sessions'] == 3
+    assert cached.cache_info()['hits'] == cached.cache_info()['misses'] == 0
+
+def test_clear_cache_and_max_entries(manager):
+    cached = CachedDataManager(manager)
+    cached.get_weekly_stats()
+    cached.clear_cache()
+    cached.get_weekly_stats()
+    assert cached.misses == 2
+    with pytest.raises(ValueError):
+        CachedDataManager(manager, max_entries=0)
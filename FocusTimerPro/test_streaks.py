@@ -0,0 +1,56 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+
+pytest.importorskip('hypothesis')
+
+from hypothesis import given, settings, strategies as st
+
+from data_manager import DataManager, StreakState, compute_streaks
+
+days = st.lists(st.integers(min_value=0, max_value=120), max_size=60)
+
+def feed(state: StreakState, active_days):
+    """Add days as DataManager does, rebuilding once an earlier day made the state stale"""
+    seen = set()
+    for day in active_days:
+        if day not in seen:
+            seen.add(day)
+            state.add_day(day)
+    if state.stale:
+        state.rebuild(sorted(seen))
+
+@given(days, st.integers(min_value=0, max_value=125))
+def test_in_order_days_match_compute_streaks(active_days, today):
+    state = StreakState()
+    feed(state, sorted(active_days))
+    assert not state.stale
+    if state.last_active is None or state.last_active <= today:
+        assert state.streaks(today) == compute_streaks(sorted(set(active_days)), today)
+
+@given(days, st.integers(min_value=0, max_value=125))
+def test_out_of_order_days_match_compute_streaks(active_days, today):
+    state = StreakState()
+    feed(state, active_days)
+    if state.last_active is None or state.last_active <= today:
+        assert state.streaks(today) == compute_streaks(sorted(set(active_days)), today)
+
+@settings(deadline=None, max_examples=50)
+@given(st.lists(st.integers(min_value=-40, max_value=2), max_size=40), st.booleans())
+def test_logged_and_imported_sessions_match_compute_streaks(offsets, imported):
+    """Offsets are days from today, including sessions dated after it"""
+    manager = DataManager()
+    noon = datetime.combine(datetime.now().date(), time(12))
+    sessions = [
+        {'session_type': 'focus', 'duration': 1500,
+         'start_time': (noon + timedelta(days=offset, seconds=index)).isoformat()}
+        for index, offset in enumerate(offsets)
+    ]
+    if imported:
+        manager.import_sessions(sessions)
+    else:
+        for session in sessions:
+            manager.log_session(session)
+
+    today = manager.days.today()
+    assert manager.get_streak_data() == compute_streaks(sorted({today + offset for offset in offsets}), today)
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+from timer_manager import TimerManager, TimerState, SessionType, DEFAULT_SETTINGS, NS_PER_SECOND
+
+FOCUS_SECONDS = DEFAULT_SETTINGS['focus_duration'] * 60
+
+def test_start_sets_a_deadline_one_session_ahead(clock):
+    timer = TimerManager(clock)
+    assert timer.next_deadline() is None
+    timer.start_timer(DEFAULT_SETTINGS)
+    assert timer.is_running()
+    assert timer.next_deadline() == clock.now + FOCUS_SECONDS * NS_PER_SECOND
+    assert timer.seconds_until_deadline() == FOCUS_SECONDS
+
+def test_update_counts_down_without_completing_early(clock):
+    timer = TimerManager(clock)
+    timer.start_timer(DEFAULT_SETTINGS)
+    clock.advance(FOCUS_SECONDS - 0.001)
+    assert not timer.update()
+    assert timer.get_remaining_time() == 0.001
+
+def test_pause_freezes_the_remaining_time(clock):
+    timer = TimerManager(clock)
+    timer.start_timer(DEFAULT_SETTINGS)
+    clock.advance(60)
+    timer.pause_timer()
+    assert timer.is_paused()
+    assert timer.next_deadline() is None
+    clock.advance(3600)
+    assert not timer.update()
+    assert timer.get_remaining_time() == FOCUS_SECONDS - 60
+
+def test_resume_moves_the_deadline_by_the_pause(clock):
+    timer = TimerManager(clock)
+    timer.start_timer(DEFAULT_SETTINGS)
+    deadline = timer.next_deadline()
+    clock.advance(60)
+    timer.pause_timer()
+    clock.advance(600)
+    timer.start_timer(DEFAULT_SETTINGS)
+    assert timer.next_deadline() == deadline + 600 * NS_PER_SECOND
+    assert timer.seconds_until_deadline() == FOCUS_SECONDS - 60
+
+def test_completion_is_dated_at_the_deadline_however_late_it_is_noticed(clock):
+    timer = TimerManager(clock)
+    timer.start_timer(DEFAULT_SETTINGS)
+    started = datetime.fromtimestamp(clock.wall_now)
+    clock.advance(FOCUS_SECONDS + 42.5)
+    assert timer.update()
+    assert timer.state == TimerState.COMPLETED
+    session = timer.get_completed_session_data()
+    assert session['session_type'] == 'focus'
+    assert session['duration'] == FOCUS_SECONDS
+    assert datetime.fromisoformat(session['end_time']) - started == timedelta(seconds=FOCUS_SECONDS)
+    assert timer.current_session == SessionType.SHORT_BREAK
+    assert timer.session_count == 1
+
+def test_wall_clock_jumps_do_not_move_the_deadline(clock):
+    timer = TimerManager(clock)
+    timer.start_timer(DEFAULT_SETTINGS)
+    clock.advance(60)
+    clock.jump_wall(-3600)
+    assert not timer.update()
+    assert timer.get_remaining_time() == FOCUS_SECONDS - 60
+    clock.jump_wall(2 * 86400)
+    assert not timer.update()
+    assert timer.get_remaining_time() == FOCUS_SECONDS - 60
+    clock.advance(FOCUS_SECONDS - 60)
+    assert timer.update()
+
+def test_long_break_follows_every_fourth_focus_session(clock):
+    timer = TimerManager(clock)
+    queued = []
+    for _ in range(8):
+        timer.start_timer(DEFAULT_SETTINGS)
+        clock.advance(timer.seconds_until_deadline())
+        assert timer.update()
+        queued.append(timer.current_session)
+    assert queued == [
+        SessionType.SHORT_BREAK, SessionType.FOCUS, SessionType.SHORT_BREAK, SessionType.FOCUS,
+        SessionType.SHORT_BREAK, SessionType.FOCUS, SessionType.LONG_BREAK, SessionType.FOCUS
+    ]
@@ -1,114 +1,324 @@
-"""
-Color themes for the Focus Timer application.
-All themes exclude pink colors as per requirements.
-"""
-
-THEMES = {
-    'Ocean Blue': {
-        'primary': '#4A90E2',
-        'secondary': '#7BB3F0',
-        'accent': '#2E86AB',
-        'background': '#F0F4F8',
-        'surface': '#FFFFFF',
-        'success': '#28A745',
-        'warning': '#FFC107',
-        'danger': '#DC3545',
-        'text': '#2C3E50'
-    },
-    
-    'Forest Green': {
-        'primary': '#27AE60',
-        'secondary': '#58D68D',
-        'accent': '#196F3D',
-        'background': '#F1F8E9',
-        'surface': '#FFFFFF',
-        'success': '#2ECC71',
-        'warning': '#F39C12',
-        'danger': '#E74C3C',
-        'text': '#1B4332'
-    },
-    
-    'Purple Haze': {
-        'primary': '#8E44AD',
-        'secondary': '#BB8FCE',
-        'accent': '#5B2C6F',
-        'background': '#F4F1FB',
-        'surface': '#FFFFFF',
-        'success': '#27AE60',
-        'warning': '#F39C12',
-        'danger': '#E74C3C',
-        'text': '#4A235A'
-    },
-    
-    'Sunset Orange': {
-        'primary': '#E67E22',
-        'secondary': '#F5B041',
-        'accent': '#D35400',
-        'background': '#FDF2E9',
-        'surface': '#FFFFFF',
-        'success': '#27AE60',
-        'warning': '#F39C12',
-        'danger': '#E74C3C',
-        'text': '#A04000'
-    },
-    
-    'Midnight Dark': {
-        'primary': '#3498DB',
-        'secondary': '#85C1E9',
-        'accent': '#2980B9',
-        'background': '#2C3E50',
-        'surface': '#34495E',
-        'success': '#27AE60',
-        'warning': '#F39C12',
-        'danger': '#E74C3C',
-        'text': '#ECF0F1'
-    },
-    
-    'Earth Tones': {
-        'primary': '#8D6E63',
-        'secondary': '#BCAAA4',
-        'accent': '#5D4037',
-        'background': '#F5F5DC',
-        'surface': '#FFFFFF',
-        'success': '#689F38',
-        'warning': '#FF8F00',
-        'danger': '#D32F2F',
-        'text': '#3E2723'
-    },
-    
-    'Arctic Blue': {
-        'primary': '#00ACC1',
-        'secondary': '#4DD0E1',
-        'accent': '#0097A7',
-        'background': '#E0F2F1',
-        'surface': '#FFFFFF',
-        'success': '#00C853',
-        'warning': '#FFB300',
-        'danger': '#D50000',
-        'text': '#004D40'
-    },
-    
-    'Monochrome': {
-        'primary': '#424242',
-        'secondary': '#757575',
-        'accent': '#212121',
-        'background': '#FAFAFA',
-        'surface': '#FFFFFF',
-        'success': '#4CAF50',
-        'warning': '#FF9800',
-        'danger': '#F44336',
-        'text': '#212121'
-    }
-}
-
-def get_theme_colors(theme_name: str) -> dict:
-    """Get color scheme for a specific theme"""
-    return THEMES.get(theme_name, THEMES['Ocean Blue'])
-
-def get_available_themes() -> list:
-    """Get list of available theme names"""
-    return list(THEMES.keys())
-
-def validate_theme(theme_name: str) -> bool:
-    """Check if theme name is valid"""
-    return theme_name in THEMES
+"""
+Color themes for the Focus Timer application.
+All themes exclude pink colors as per requirements.
+"""
+
+import re
+from functools import lru_cache
+
+THEMES = {
+    'Ocean Blue': {
+        'primary': '#4A90E2',
+        'secondary': '#7BB3F0',
+        'accent': '#2E86AB',
+        'background': '#F0F4F8',
+        'surface': '#FFFFFF',
+        'success': '#28A745',
+        'warning': '#FFC107',
+        'danger': '#DC3545',
+        'text': '#2C3E50'
+    },
+    
+    'Forest Green': {
+        'primary': '#27AE60',
+        'secondary': '#58D68D',
+        'accent': '#196F3D',
+        'background': '#F1F8E9',
+        'surface': '#FFFFFF',
+        'success': '#2ECC71',
+        'warning': '#F39C12',
+        'danger': '#E74C3C',
+        'text': '#1B4332'
+    },
+    
+    'Purple Haze': {
+        'primary': '#8E44AD',
+        'secondary': '#BB8FCE',
+        'accent': '#5B2C6F',
+        'background': '#F4F1FB',
+        'surface': '#FFFFFF',
+        'success': '#27AE60',
+        'warning': '#F39C12',
+        'danger': '#E74C3C',
+        'text': '#4A235A'
+    },
+    
+    'Sunset Orange': {
+        'primary': '#E67E22',
+        'secondary': '#F5B041',
+        'accent': '#D35400',
+        'background': '#FDF2E9',
+        'surface': '#FFFFFF',
+        'success': '#27AE60',
+        'warning': '#F39C12',
+        'danger': '#E74C3C',
+        'text': '#A04000'
+    },
+    
+    'Midnight Dark': {
+        'primary': '#3498DB',
+        'secondary': '#85C1E9',
+        'accent': '#2980B9',
+        'background': '#2C3E50',
+        'surface': '#34495E',
+        'success': '#27AE60',
+        'warning': '#F39C12',
+        'danger': '#E74C3C',
+        'text': '#ECF0F1'
+    },
+    
+    'Earth Tones': {
+        'primary': '#8D6E63',
+        'secondary': '#BCAAA4',
+        'accent': '#5D4037',
+        'background': '#F5F5DC',
+        'surface': '#FFFFFF',
+        'success': '#689F38',
+        'warning': '#FF8F00',
+        'danger': '#D32F2F',
+        'text': '#3E2723'
+    },
+    
+    'Arctic Blue': {
+        'primary': '#00ACC1',
+        'secondary': '#4DD0E1',
+        'accent': '#0097A7',
+        'background': '#E0F2F1',
+        'surface': '#FFFFFF',
+        'success': '#00C853',
+        'warning': '#FFB300',
+        'danger': '#D50000',
+        'text': '#004D40'
+    },
+    
+    'Monochrome': {
+        'primary': '#424242',
+        'secondary': '#757575',
+        'accent': '#212121',
+        'background': '#FAFAFA',
+        'surface': '#FFFFFF',
+        'success': '#4CAF50',
+        'warning': '#FF9800',
+        'danger': '#F44336',
+        'text': '#212121'
+    }
+}
+
+def get_theme_colors(theme_name: str) -> dict:
+    """Get color scheme for a specific theme"""
+    return THEMES.get(theme_name, THEMES['Ocean Blue'])
+
+def get_available_themes() -> list:
+    """Get list of available theme names"""
+    return list(THEMES.keys())
+
+def validate_theme(theme_name: str) -> bool:
+    """Check if theme name is valid"""
+    return theme_name in THEMES
+
+CSS_TEMPLATE = """
+    <style>
+    /* Mobile-first responsive design */
+    .timer-display {{
+        text-align: center;
+        font-size: clamp(2.5rem, 8vw, 4rem);
+        font-weight: bold;
+        color: {primary};
+        margin: 1rem 0 2rem 0;
+        font-family: 'Courier New', monospace;
+        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
+        line-height: 1.2;
+    }}
+    
+    .session-type {{
+        text-align: center;
+        font-size: clamp(1rem, 4vw, 1.5rem);
+        color: {secondary};
+        margin-bottom: 1rem;
+        text-transform: uppercase;
+        letter-spacing: 1px;
+        word-wrap: break-word;
+    }}
+    
+    .progress-bar {{
+        width: 100%;
+        height: 20px;
+        background-color: {background};
+        border-radius: 10px;
+        margin: 1rem 0;
+        overflow: hidden;
+        box-shadow: inset 0 2px 4px rgba(0,0,0,0.2);
+        touch-action: none;
+    }}
+    
+    .progress-fill {{
+        height: 100%;
+        background: linear-gradient(90deg, {primary}, {accent});
+        border-radius: 10px;
+        transition: width 0.3s ease;
+    }}
+    
+    .stats-card {{
+    background: {background};
+    color: {text};
+    padding: 1rem;
+    border-radius: 10px;
+    margin: 0.5rem 0;
+    border-left: 4px solid {primary};
+    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+    word-wrap: break-word;
+}}
+    
+    .control-button {{
+        margin: 0.25rem;
+        padding: 0.75rem 1rem;
+        border-radius: 8px;
+        border: none;
+        font-weight: bold;
+        cursor: pointer;
+        transition: all 0.3s ease;
+        min-height: 44px;
+        touch-action: manipulation;
+        font-size: 0.9rem;
+    }}
+    
+    .start-button {{
+        background: {success};
+        color: white;
+    }}
+    
+    .pause-button {{
+        background: {warning};
+        color: white;
+    }}
+    
+    .stop-button {{
+        background: {danger};
+        color: white;
+    }}
+    
+    .metric-value {{
+        font-size: clamp(1.2rem, 4vw, 2rem);
+        font-weight: bold;
+        color: {primary};
+    }}
+    
+    .session-history {{
+        max-height: 300px;
+        overflow-y: auto;
+        background: {background};
+        padding: 1rem;
+        border-radius: 10px;
+        margin: 1rem 0;
+        -webkit-overflow-scrolling: touch;
+    }}
+    
+    /* Mobile specific adjustments */
+    @media (max-width: 768px) {{
+        .timer-display {{
+            margin: 0.5rem 0 1.5rem 0;
+        }}
+        
+        .session-type {{
+            font-size: 1.1rem;
+            letter-spacing: 0.5px;
+            margin-bottom: 0.75rem;
+        }}
+        
+        .control-button {{
+            padding: 0.875rem 0.75rem;
+            font-size: 0.85rem;
+            margin: 0.125rem;
+        }}
+        
+        .stats-card {{
+            padding: 0.75rem;
+            margin: 0.25rem 0;
+        }}
+        
+        .session-history {{
+            max-height: 250px;
+            padding: 0.75rem;
+        }}
+        
+        /* Ensure proper spacing on mobile */
+        .stButton > button {{
+            width: 100% !important;
+            margin: 0.125rem 0 !important;
+            min-height: 44px !important;
+            font-size: 0.9rem !important;
+        }}
+        
+        /* Improve metric display on mobile */
+        .metric-value {{
+            font-size: 1.5rem;
+        }}
+        
+        /* Better sidebar on mobile */
+        .css-1d391kg {{
+            padding: 1rem 0.5rem;
+        }}
+    }}
+    
+    /* Very small mobile devices */
+    @media (max-width: 480px) {{
+        .timer-display {{
+            font-size: 2rem;
+            margin: 0.25rem 0 1rem 0;
+        }}
+        
+        .session-type {{
+            font-size: 0.95rem;
+            margin-bottom: 0.5rem;
+        }}
+        
+        .control-button {{
+            font-size: 0.8rem;
+            padding: 0.75rem 0.5rem;
+        }}
+        
+        .stats-card {{
+            padding: 0.5rem;
+            font-size: 0.9rem;
+        }}
+    }}
+    
+    /* Tablet adjustments */
+    @media (min-width: 769px) and (max-width: 1024px) {{
+        .timer-display {{
+            font-size: 3.5rem;
+        }}
+        
+        .session-type {{
+            font-size: 1.3rem;
+        }}
+    }}
+    
+    /* Touch-friendly improvements */
+    button {{
+        touch-action: manipulation;
+        -webkit-tap-highlight-color: transparent;
+    }}
+    
+    /* Prevent zoom on input focus for iOS */
+    input, select, textarea {{
+        font-size: 16px !important;
+    }}
+    
+    /* Smooth scrolling */
+    html {{
+        scroll-behavior: smooth;
+    }}
+    </style>
+    """
+
+def render_theme_css(theme_name: str) -> str:
+    """Render the stylesheet for a theme without minifying it"""
+    return CSS_TEMPLATE.format(**get_theme_colors(theme_name))
+
+@lru_cache(maxsize=None)
+def get_theme_css(theme_name: str) -> str:
+    """Get the minified stylesheet for a theme, built once per process"""
+    css = re.sub(r'/\*.*?\*/', '', render_theme_css(theme_name), flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{}:;,>])\s*', r'\1', css).strip()
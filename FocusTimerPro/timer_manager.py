@@ -1,148 +1,287 @@
-import time
-from datetime import datetime
-from enum import Enum
-
-class SessionType(Enum):
-    FOCUS = "focus"
-    SHORT_BREAK = "short_break"
-    LONG_BREAK = "long_break"
-
-class TimerState(Enum):
-    STOPPED = "stopped"
-    RUNNING = "running"
-    PAUSED = "paused"
-    COMPLETED = "completed"
-
-class TimerManager:
-    def __init__(self):
-        self.state = TimerState.STOPPED
-        self.current_session = SessionType.FOCUS
-        self.session_count = 0
-        self.start_time = None
-        self.pause_time = None
-        self.duration = 0
-        self.remaining_time = 0
-        self.session_start = None
-        
-    def start_timer(self, settings):
-        """Start the timer with current session type"""
-        if self.state == TimerState.PAUSED:
-            pause_duration = time.time() - self.pause_time
-            self.start_time += pause_duration
-        else:
-            self.duration = self._get_session_duration(settings)
-            self.remaining_time = self.duration
-            self.start_time = time.time()
-            self.session_start = datetime.now()
-        
-        self.state = TimerState.RUNNING
-        self.pause_time = None
-    
-    def pause_timer(self):
-        """Pause the current timer"""
-        if self.state == TimerState.RUNNING:
-            self.state = TimerState.PAUSED
-            self.pause_time = time.time()
-    
-    def stop_timer(self):
-        """Stop the current timer"""
-        self.state = TimerState.STOPPED
-        self.start_time = None
-        self.pause_time = None
-        self.remaining_time = 0
-    
-    def reset_timer(self):
-        """Reset timer to initial state"""
-        self.stop_timer()
-        self.current_session = SessionType.FOCUS
-        self.session_count = 0
-    
-    def update(self):
-        """Update timer state and return True if session completed"""
-        if self.state != TimerState.RUNNING:
-            return False
-        
-        elapsed = time.time() - self.start_time
-        self.remaining_time = max(0, self.duration - elapsed)
-        
-        if self.remaining_time <= 0:
-            self._complete_session()
-            return True
-        
-        return False
-    
-    def _complete_session(self):
-        """Mark current session as completed and prepare for next"""
-        self.state = TimerState.COMPLETED
-        
-        if self.current_session == SessionType.FOCUS:
-            self.session_count += 1
-        
-        self._set_next_session()
-    
-    def _set_next_session(self):
-        """Set the next session type based on current state"""
-        if self.current_session == SessionType.FOCUS:
-            if self.session_count % 4 == 0:
-                self.current_session = SessionType.LONG_BREAK
-            else:
-                self.current_session = SessionType.SHORT_BREAK
-        else:
-            self.current_session = SessionType.FOCUS
-    
-    def start_next_session(self, settings):
-        """Start the next session automatically"""
-        self.start_timer(settings)
-    
-    def _get_session_duration(self, settings):
-        """Get duration in seconds for current session type"""
-        if self.current_session == SessionType.FOCUS:
-            return settings['focus_duration'] * 60
-        elif self.current_session == SessionType.SHORT_BREAK:
-            return settings['short_break'] * 60
-        else:
-            return settings['long_break'] * 60
-    
-    def get_remaining_time(self):
-        """Get remaining time in seconds"""
-        return self.remaining_time
-    
-    def get_progress(self):
-        """Get progress as a percentage (0.0 to 1.0)"""
-        if self.duration == 0:
-            return 0.0
-        return max(0.0, (self.duration - self.remaining_time) / self.duration)
-    
-    def get_session_type_display(self):
-        """Get formatted session type for display"""
-        type_map = {
-            SessionType.FOCUS: "🎯 Focus Session",
-            SessionType.SHORT_BREAK: "☕ Short Break",
-            SessionType.LONG_BREAK: "🌟 Long Break"
-        }
-        return type_map.get(self.current_session, "🎯 Focus Session")
-    
-    def get_next_session_type(self):
-        """Get the next session type as string"""
-        if self.current_session == SessionType.FOCUS:
-            return "short_break" if self.session_count % 4 != 0 else "long_break"
-        else:
-            return "focus"
-    
-    def is_running(self):
-        """Check if timer is currently running"""
-        return self.state == TimerState.RUNNING
-    
-    def is_paused(self):
-        """Check if timer is paused"""
-        return self.state == TimerState.PAUSED
-    
-    def get_completed_session_data(self):
-        """Get data for the completed session"""
-        return {
-            'session_type': self.current_session.value,
-            'duration': self.duration,
-            'start_time': self.session_start.isoformat() if self.session_start else None,
-            'end_time': datetime.now().isoformat(),
-            'completed': True
-        }
+import time
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict
+
+NS_PER_SECOND = 1_000_000_000
+
+DEFAULT_SETTINGS = {
+    'focus_duration': 25,
+    'short_break': 5,
+    'long_break': 15,
+    'sessions_until_long_break': 4,
+    'auto_start_breaks': False,
+    'auto_start_focus': False,
+    'notifications_enabled': True
+}
+
+class SessionType(Enum):
+    FOCUS = "focus"
+    SHORT_BREAK = "short_break"
+    LONG_BREAK = "long_break"
+
+class TimerState(Enum):
+    STOPPED = "stopped"
+    RUNNING = "running"
+    PAUSED = "paused"
+    COMPLETED = "completed"
+
+class TimerManager:
+    def __init__(self, clock=time.monotonic_ns, on_transition=None):
+        self.clock = clock
+        # Called with the timer after each state change, never on ticks
+        self.on_transition = on_transition
+        self.state = TimerState.STOPPED
+        self.current_session = SessionType.FOCUS
+        self.session_count = 0
+        self.start_time = None
+        self.pause_time = None
+        self.deadline = None
+        self.duration = 0
+        self.remaining_time = 0
+        self.session_start = None
+        self.session_end = None
+        self.completed_session = None
+        # The settings the timer last started with, kept in checkpoints
+        self.settings = None
+        
+    def start_timer(self, settings):
+        """Start the timer with current session type"""
+        self.settings = dict(settings)
+        now = self.clock()
+        if self.state == TimerState.PAUSED:
+            pause_duration = now - self.pause_time
+            self.start_time += pause_duration
+            self.deadline += pause_duration
+        else:
+            self.duration = self._get_session_duration(settings)
+            self.remaining_time = self.duration
+            self.start_time = now
+            self.deadline = now + round(self.duration * NS_PER_SECOND)
+            self.session_start = datetime.now()
+            self.session_end = None
+        
+        self.state = TimerState.RUNNING
+        self.pause_time = None
+        self._transition()
+    
+    def pause_timer(self):
+        """Pause the current timer"""
+        if self.state == TimerState.RUNNING:
+            now = self.clock()
+            # Past the deadline, leave it running so the next update() completes it
+            if now < self.deadline:
+                self.state = TimerState.PAUSED
+                self.pause_time = now
+                self.remaining_time = (self.deadline - now) / NS_PER_SECOND
+                self._transition()
+    
+    def stop_timer(self):
+        """Stop the current timer"""
+        self._clear()
+        self._transition()
+    
+    def reset_timer(self):
+        """Reset timer to initial state"""
+        self._clear()
+        self.current_session = SessionType.FOCUS
+        self.session_count = 0
+        self._transition()
+    
+    def skip_session(self):
+        """Abandon the current session without logging it and queue the next one"""
+        self._clear()
+        # A skipped focus session does not count towards the long break
+        if self.current_session == SessionType.FOCUS:
+            self.current_session = SessionType.SHORT_BREAK
+        else:
+            self.current_session = SessionType.FOCUS
+        self._transition()
+    
+    def _clear(self):
+        """Drop the running or paused session"""
+        self.state = TimerState.STOPPED
+        self.start_time = None
+        self.pause_time = None
+        self.deadline = None
+        self.remaining_time = 0
+    
+    def _transition(self):
+        """Tell the listener the state changed"""
+        if self.on_transition is not None:
+            self.on_transition(self)
+    
+    def update(self):
+        """Update timer state and return True if session completed"""
+        if self.state != TimerState.RUNNING:
+            return False
+        
+        now = self.clock()
+        self.remaining_time = max(0, (self.deadline - now) / NS_PER_SECOND)
+        
+        if now >= self.deadline:
+            self._complete_session(now)
+            return True
+        
+        return False
+    
+    def next_deadline(self):
+        """Get the monotonic_ns time the running session completes, or None"""
+        if self.state != TimerState.RUNNING:
+            return None
+        return self.deadline
+    
+    def seconds_until_deadline(self):
+        """Get seconds until the running session completes, or None"""
+        if self.state != TimerState.RUNNING:
+            return None
+        return max(0.0, (self.deadline - self.clock()) / NS_PER_SECOND)
+    
+    def _complete_session(self, now=None):
+        """Mark current session as completed and prepare for next"""
+        if now is None:
+            now = self.clock()
+        # Date the end at the deadline itself, however late it was noticed
+        overdue_ns = now - self.deadline if self.deadline is not None else 0
+        self.session_end = datetime.now() - timedelta(microseconds=overdue_ns // 1000)
+        self.state = TimerState.COMPLETED
+        self.remaining_time = 0
+        self.deadline = None
+        self.completed_session = self.current_session
+        
+        if self.current_session == SessionType.FOCUS:
+            self.session_count += 1
+        
+        self._set_next_session()
+        self._transition()
+    
+    def _set_next_session(self):
+        """Set the next session type based on current state"""
+        if self.current_session == SessionType.FOCUS:
+            if self.session_count % 4 == 0:
+                self.current_session = SessionType.LONG_BREAK
+            else:
+                self.current_session = SessionType.SHORT_BREAK
+        else:
+            self.current_session = SessionType.FOCUS
+    
+    def start_next_session(self, settings):
+        """Start the next session automatically"""
+        self.start_timer(settings)
+    
+    def should_auto_start(self, settings):
+        """Check if settings auto-start the session queued after a completion"""
+        if self.current_session == SessionType.FOCUS:
+            return settings['auto_start_focus']
+        return settings['auto_start_breaks']
+    
+    def _get_session_duration(self, settings):
+        """Get duration in seconds for current session type"""
+        if self.current_session == SessionType.FOCUS:
+            return settings['focus_duration'] * 60
+        elif self.current_session == SessionType.SHORT_BREAK:
+            return settings['short_break'] * 60
+        else:
+            return settings['long_break'] * 60
+    
+    def get_remaining_time(self):
+        """Get remaining time in seconds"""
+        return self.remaining_time
+    
+    def get_progress(self):
+        """Get progress as a percentage (0.0 to 1.0)"""
+        if self.duration == 0:
+            return 0.0
+        return max(0.0, (self.duration - self.remaining_time) / self.duration)
+    
+    def get_session_type_display(self):
+        """Get formatted session type for display"""
+        type_map = {
+            SessionType.FOCUS: "🎯 Focus Session",
+            SessionType.SHORT_BREAK: "☕ Short Break",
+            SessionType.LONG_BREAK: "🌟 Long Break"
+        }
+        return type_map.get(self.current_session, "🎯 Focus Session")
+    
+    def get_next_session_type(self):
+        """Get the next session type as string"""
+        if self.current_session == SessionType.FOCUS:
+            return "short_break" if self.session_count % 4 != 0 else "long_break"
+        else:
+            return "focus"
+    
+    def snapshot(self, wall_clock=time.time) -> Dict[str, Any]:
+        """Get a compact copy of the timer state that stays valid across restarts"""
+        snapshot = {
+            'state': self.state.value,
+            'session': self.current_session.value,
+            'count': self.session_count,
+            'duration': self.duration
+        }
+        if self.session_start is not None:
+            snapshot['started'] = self.session_start.isoformat()
+        # Which session just completed, so it can still be logged after a restart
+        if self.completed_session is not None:
+            snapshot['completed'] = self.completed_session.value
+        if self.session_end is not None:
+            snapshot['ended'] = self.session_end.isoformat()
+        if self.settings is not None:
+            snapshot['settings'] = self.settings
+        if self.state == TimerState.RUNNING:
+            # The monotonic clock restarts with the process, so store a wall-clock deadline
+            snapshot['deadline'] = wall_clock() + (self.deadline - self.clock()) / NS_PER_SECOND
+        elif self.state == TimerState.PAUSED:
+            snapshot['remaining'] = self.remaining_time
+        return snapshot
+    
+    @classmethod
+    def restore(cls, snapshot: Dict[str, Any], clock=time.monotonic_ns, wall_clock=time.time,
+                on_transition=None):
+        """
+        Rebuild a timer from a snapshot. A running session keeps its wall-clock
+        deadline, so time spent restarting counts; one that ended meanwhile
+        completes on the next update(), dated at its deadline.
+        """
+        timer = cls(clock)
+        timer.state = TimerState(snapshot['state'])
+        timer.current_session = SessionType(snapshot['session'])
+        timer.session_count = snapshot['count']
+        timer.duration = snapshot['duration']
+        if 'started' in snapshot:
+            timer.session_start = datetime.fromisoformat(snapshot['started'])
+        if 'completed' in snapshot:
+            timer.completed_session = SessionType(snapshot['completed'])
+        if 'ended' in snapshot:
+            timer.session_end = datetime.fromisoformat(snapshot['ended'])
+        timer.settings = snapshot.get('settings')
+        
+        now = clock()
+        if timer.state == TimerState.RUNNING:
+            remaining = snapshot['deadline'] - wall_clock()
+            timer.remaining_time = max(0.0, remaining)
+        elif timer.state == TimerState.PAUSED:
+            remaining = timer.remaining_time = snapshot['remaining']
+            timer.pause_time = now
+        if timer.state in (TimerState.RUNNING, TimerState.PAUSED):
+            timer.deadline = now + round(remaining * NS_PER_SECOND)
+            timer.start_time = timer.deadline - round(timer.duration * NS_PER_SECOND)
+        timer.on_transition = on_transition
+        return timer
+    
+    def is_running(self):
+        """Check if timer is currently running"""
+        return self.state == TimerState.RUNNING
+    
+    def is_paused(self):
+        """Check if timer is paused"""
+        return self.state == TimerState.PAUSED
+    
+    def get_completed_session_data(self):
+        """Get data for the completed session"""
+        return {
+            'session_type': (self.completed_session or self.current_session).value,
+            'duration': round(self.duration),
+            'start_time': self.session_start.isoformat() if self.session_start else None,
+            'end_time': (self.session_end or datetime.now()).isoformat(),
+            'completed': True
+        }